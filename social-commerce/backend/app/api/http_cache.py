@@ -0,0 +1,123 @@
+"""
+HTTP validators and pre-encoded response bodies.
+
+`EncodedBody` holds a JSON document serialized once, plus gzip and (when
+the `brotli` package is installed) brotli variants, each with a strong
+ETag. Serving it is a header check and a bytes return; no model
+validation or serialization happens per request.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+from dataclasses import dataclass
+from typing import Any
+
+from fastapi import Request
+from fastapi.responses import Response
+from pydantic import BaseModel
+
+try:
+    import brotli
+except ImportError:  # optional: only gzip variants are produced without it
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Bodies smaller than this aren't worth compressing
+MIN_COMPRESS_BYTES = 512
+
+
+def etag_matches(if_none_match: str | None, *etags: str) -> bool:
+    """If-None-Match check using weak comparison, as RFC 9110 requires."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return any(etag.removeprefix("W/") in candidates for etag in etags)
+
+
+def _accepted_encodings(accept_encoding: str | None) -> set[str]:
+    """Codings the client accepts (q > 0)."""
+    accepted = set()
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        q = params.strip().removeprefix("q=")
+        try:
+            if params and float(q) <= 0:
+                continue
+        except ValueError:
+            continue
+        if coding:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+@dataclass(frozen=True)
+class EncodedBody:
+    """A JSON body encoded once, with compressed variants and strong ETags."""
+
+    # content-coding ("identity", "gzip", "br") -> (body, ETag)
+    variants: dict[str, tuple[bytes, str]]
+
+    @classmethod
+    def from_bytes(cls, body: bytes, gzip_level: int = 9, brotli_quality: int = 11) -> "EncodedBody":
+        """
+        Build all variants of an already serialized JSON body.
+
+        The default levels give the smallest output and suit bodies encoded
+        once; bodies re-encoded often should pass cheaper levels.
+        """
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        variants = {"identity": (body, f'"{digest}"')}
+        if len(body) >= MIN_COMPRESS_BYTES:
+            # mtime=0 keeps the gzip bytes identical for identical content
+            variants["gzip"] = (gzip.compress(body, compresslevel=gzip_level, mtime=0), f'"{digest}-gzip"')
+            if brotli is not None:
+                variants["br"] = (brotli.compress(body, quality=brotli_quality), f'"{digest}-br"')
+        return cls(variants)
+
+    @classmethod
+    def from_model(cls, model: BaseModel) -> "EncodedBody":
+        """Serialize a response model once."""
+        return cls.from_bytes(model.model_dump_json().encode("utf-8"))
+
+    @classmethod
+    def from_payload(cls, payload: Any) -> "EncodedBody":
+        """Serialize a plain JSON-compatible value once."""
+        return cls.from_bytes(
+            json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        )
+
+    @property
+    def etag(self) -> str:
+        """ETag of the uncompressed representation."""
+        return self.variants["identity"][1]
+
+    def response(self, request: Request, cache_control: str = "no-cache") -> Response:
+        """
+        Serve the best variant for the request's Accept-Encoding.
+
+        Returns 304 when If-None-Match matches any variant's ETag (they all
+        describe the same content).
+        """
+        accepted = _accepted_encodings(request.headers.get("accept-encoding"))
+        coding = next(
+            (c for c in ("br", "gzip") if c in self.variants and c in accepted),
+            "identity",
+        )
+        body, etag = self.variants[coding]
+        headers = {
+            "ETag": etag,
+            "Cache-Control": cache_control,
+            "Vary": "Accept-Encoding",
+        }
+
+        if etag_matches(request.headers.get("if-none-match"), *(tag for _, tag in self.variants.values())):
+            return Response(status_code=304, headers=headers)
+
+        if coding != "identity":
+            headers["Content-Encoding"] = coding
+        return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,97 @@
+"""
+ASGI middleware recording per-route HTTP metrics.
+
+Written as a plain ASGI middleware (not `BaseHTTPMiddleware`) so it adds
+no extra task or body buffering; streaming responses such as SSE and
+chunked TTS pass straight through. Routes are labelled by handler name,
+which the router leaves in `scope["route"]`, so path parameters never
+create new series. Requests no route matched are labelled "unmatched".
+The in-flight gauge is labelled by v1 router, with every path outside
+the known routers as "other", so no request can add a label.
+
+Server-Sent Event streams stay open for as long as a viewer watches, so
+they leave the in-flight gauge once their headers are sent and are kept
+out of the latency histogram; they are still counted and sized.
+WebSocket connections are not HTTP requests and are not recorded.
+"""
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.services.metrics import MetricsRegistry, metrics
+
+
+# Prefixes of the routers mounted in app.api.v1
+V1_ROUTERS = frozenset({"feed", "tts", "comments", "pose"})
+
+
+def _router_of(path: str) -> str:
+    """v1 router a path belongs to ("/api/v1/pose/detect" -> "pose"), else "other"."""
+    if path.startswith("/api/v1/"):
+        router = path[8:].partition("/")[0]
+        if router in V1_ROUTERS:
+            return router
+    return "other"
+
+
+def _is_event_stream(message: Message) -> bool:
+    for name, value in message.get("headers", ()):
+        if name.lower() == b"content-type":
+            return value.startswith(b"text/event-stream")
+    return False
+
+
+def _content_length(scope: Scope) -> int:
+    """Declared request body size (0 when absent, e.g. chunked uploads)."""
+    for name, value in scope["headers"]:
+        if name == b"content-length":
+            try:
+                return int(value)
+            except ValueError:
+                return 0
+    return 0
+
+
+class MetricsMiddleware:
+    """Count, time and size every HTTP request."""
+
+    def __init__(self, app: ASGIApp, registry: MetricsRegistry = metrics):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        registry = self.registry
+        router = _router_of(scope["path"])
+        in_flight = registry.in_flight
+        in_flight[router] = in_flight.get(router, 0) + 1
+
+        status = 500
+        sent = 0
+        streaming = False
+
+        async def send_counting(message: Message) -> None:
+            nonlocal status, sent, streaming
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if _is_event_stream(message):
+                    streaming = True
+                    in_flight[router] -= 1
+            elif message["type"] == "http.response.body":
+                sent += len(message.get("body", b""))
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_counting)
+        finally:
+            elapsed = None if streaming else time.perf_counter() - start
+            if not streaming:
+                in_flight[router] -= 1
+            route = scope.get("route")
+            handler = getattr(route, "name", None) or "unmatched"
+            registry.record_request(handler, scope["method"], status, elapsed, _content_length(scope), sent)
@@ -0,0 +1,50 @@
+"""
+Fast JSON responses.
+
+`FastJSONResponse` is the app's default response class. Plain content
+(dicts, lists) is encoded with orjson, falling back to the standard
+library when it isn't installed.
+
+Handlers that already build a typed response model return
+`model_response(model)` instead of the model itself. pydantic-core
+serializes the model straight to bytes, and because the handler returns a
+`Response`, FastAPI skips re-validating it against `response_model` and
+the `jsonable_encoder` pass. The route's `response_model` still documents
+the schema in OpenAPI.
+"""
+
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse, Response
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the json module
+    orjson = None
+
+
+def json_dumps(content: Any) -> bytes:
+    """Compact UTF-8 JSON, formatted like Starlette's JSONResponse output."""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoding with orjson; models are serialized by pydantic-core."""
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content)
+        return json_dumps(content)
+
+
+def model_response(model: BaseModel, status_code: int = 200) -> Response:
+    """A ready JSON response for a model the handler built itself."""
+    return Response(
+        content=model.__pydantic_serializer__.to_json(model),
+        status_code=status_code,
+        media_type="application/json",
+    )
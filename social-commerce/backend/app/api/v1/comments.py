@@ -1,7 +1,13 @@
+import asyncio
+import base64
+import binascii
 import uuid
 from datetime import datetime
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+
+from app.api.responses import model_response
 
 from app.schemas.comment import (
     Comment,
@@ -9,15 +15,59 @@ from app.schemas.comment import (
     CommentResponse,
     CommentsListResponse,
 )
+from app.services.comment_events import broadcaster
+from app.services.comment_repository import Cursor
+from app.services.comment_store import CommentStore
+from app.services.feed_ranking import feed_ranker
 
 router = APIRouter()
 
-# In-memory storage for comments (in production, use a database)
-comments_store: dict[str, list[Comment]] = {}
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+# Idle SSE streams get a comment line this often so proxies keep them open
+SSE_HEARTBEAT_SECONDS = 15.0
+
+
+def encode_cursor(comment: Comment) -> str:
+    """Opaque keyset cursor for a comment: base64url of created_at and id."""
+    raw = f"{comment.created_at.isoformat()}|{comment.id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Cursor:
+    """
+    Parse a cursor produced by `encode_cursor`.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+    except (binascii.Error, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+    created_at, sep, comment_id = raw.partition("|")
+    if not sep or not comment_id:
+        raise ValueError("Invalid cursor")
+    timestamp = datetime.fromisoformat(created_at)
+    # Comments carry naive timestamps, which don't compare with aware ones
+    if timestamp.tzinfo is not None:
+        raise ValueError("Invalid cursor")
+    return timestamp, comment_id
+
+
+def get_comment_store(request: Request) -> CommentStore:
+    """Dependency returning the comment store created in the app lifespan."""
+    store = getattr(request.app.state, "comment_store", None)
+    if store is None:
+        raise HTTPException(status_code=503, detail="Comment store not initialized")
+    return store
 
 
 @router.post("", response_model=CommentResponse)
-async def create_comment(comment_data: CommentCreate) -> CommentResponse:
+async def create_comment(
+        comment_data: CommentCreate,
+        store: CommentStore = Depends(get_comment_store),
+) -> Response:
     """Create a new comment for a feed item."""
     comment = Comment(
         id=str(uuid.uuid4()),
@@ -27,39 +77,87 @@ async def create_comment(comment_data: CommentCreate) -> CommentResponse:
         created_at=datetime.now(),
     )
 
-    if comment_data.feed_id not in comments_store:
-        comments_store[comment_data.feed_id] = []
+    await store.add(comment)
+    broadcaster.comment_created(comment)
+    feed_ranker.comment_added(comment.feed_id)
 
-    comments_store[comment_data.feed_id].append(comment)
-
-    return CommentResponse(
+    return model_response(CommentResponse(
         success=True,
         data=comment,
         message="Bình luận đã được thêm thành công",
-    )
+    ))
 
 
 @router.get("/{feed_id}", response_model=CommentsListResponse)
-async def get_comments(feed_id: str) -> CommentsListResponse:
-    """Get all comments for a feed item."""
-    comments = comments_store.get(feed_id, [])
-    # Return newest first
-    sorted_comments = sorted(comments, key=lambda c: c.created_at, reverse=True)
+async def get_comments(
+        feed_id: str,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        before: str | None = Query(None, description="Cursor from a previous page's next_cursor"),
+        store: CommentStore = Depends(get_comment_store),
+) -> Response:
+    """Get one page of comments for a feed item, newest first."""
+    try:
+        cursor = decode_cursor(before) if before else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor không hợp lệ")
 
-    return CommentsListResponse(success=True, data=sorted_comments)
+    comments, has_more = await store.page(feed_id, limit, before=cursor)
+    next_cursor = encode_cursor(comments[-1]) if has_more else None
 
+    return model_response(CommentsListResponse(success=True, data=comments, next_cursor=next_cursor))
 
-@router.delete("/{comment_id}")
-async def delete_comment(comment_id: str) -> CommentResponse:
+
+@router.get("/{feed_id}/events")
+async def stream_comment_events(feed_id: str) -> StreamingResponse:
+    """
+    Server-Sent Events stream of comment changes for a feed item.
+
+    Events are deltas: `comment_created` carries the new comment and
+    `comment_deleted` its id. A client that falls too far behind receives
+    `reset` and is disconnected; it should refetch the list and reconnect.
+    """
+    subscription = broadcaster.subscribe(feed_id)
+
+    async def frames():
+        try:
+            yield b"retry: 3000\n\n"
+            while True:
+                try:
+                    frame = await asyncio.wait_for(subscription.next(), SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield b": ping\n\n"
+                    continue
+                yield frame
+                if subscription.dropped:
+                    return
+        finally:
+            broadcaster.unsubscribe(subscription)
+
+    return StreamingResponse(
+        frames(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # Stop nginx from buffering the stream
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+@router.delete("/{comment_id}", response_model=CommentResponse)
+async def delete_comment(
+        comment_id: str,
+        store: CommentStore = Depends(get_comment_store),
+) -> Response:
     """Delete a comment by ID."""
-    for feed_id, comments in comments_store.items():
-        for i, comment in enumerate(comments):
-            if comment.id == comment_id:
-                deleted = comments.pop(i)
-                return CommentResponse(
-                    success=True,
-                    data=deleted,
-                    message="Bình luận đã được xóa",
-                )
-
-    raise HTTPException(status_code=404, detail="Không tìm thấy bình luận")
+    deleted = await store.delete(comment_id)
+    if deleted is None:
+        raise HTTPException(status_code=404, detail="Không tìm thấy bình luận")
+    broadcaster.comment_deleted(deleted)
+    feed_ranker.comment_removed(deleted.feed_id)
+
+    return model_response(CommentResponse(
+        success=True,
+        data=deleted,
+        message="Bình luận đã được xóa",
+    ))
@@ -1,9 +1,23 @@
-from fastapi import APIRouter
+import base64
+import binascii
+import json
+import math
+from datetime import datetime
 
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response
+
+from app.api.http_cache import EncodedBody
+from app.api.v1.tts import audio_url
 from app.schemas.feed import FeedItem, FeedResponse
+from app.services.feed_ranking import RankKey, feed_ranker
+from app.services.tts_prefetch import greeting_params, prefetcher
 
 router = APIRouter()
 
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
 MOCK_FEED_DATA: list[FeedItem] = [
     FeedItem(
         id="101",
@@ -12,6 +26,7 @@ MOCK_FEED_DATA: list[FeedItem] = [
         background_color="#f1c40f",
         greeting="Sáng ra làm ly cà phê, ngồi ngẫm chuyện đời thấy cũng vui ha.",
         creator="@chu_nam_saigon",
+        published_at=datetime(2025, 1, 6, 7, 0),
     ),
     FeedItem(
         id="102",
@@ -20,6 +35,7 @@ MOCK_FEED_DATA: list[FeedItem] = [
         background_color="#ff7675",
         greeting="Không biết có chuyện gì, mà tự nhiên thấy đời nhẹ tênh à!",
         creator="@co_ut_mien_tay",
+        published_at=datetime(2025, 1, 6, 9, 30),
     ),
     FeedItem(
         id="103",
@@ -28,6 +44,7 @@ MOCK_FEED_DATA: list[FeedItem] = [
         background_color="#55efc4",
         greeting="Nghe người ta nói vậy mà tui còn bán tín bán nghi à nghen.",
         creator="@chu_bay_bentre",
+        published_at=datetime(2025, 1, 6, 11, 0),
     ),
     FeedItem(
         id="104",
@@ -36,6 +53,7 @@ MOCK_FEED_DATA: list[FeedItem] = [
         background_color="#fab1a0",
         greeting="Sống tới giờ mà giờ mới biết, đúng là đời còn nhiều cái lạ!",
         creator="@co_sau_cantho",
+        published_at=datetime(2025, 1, 6, 13, 15),
     ),
     FeedItem(
         id="105",
@@ -44,6 +62,7 @@ MOCK_FEED_DATA: list[FeedItem] = [
         background_color="#ffeaa7",
         greeting="Chiều ngồi trước hiên, gió thổi nhẹ, thấy bình yên ghê.",
         creator="@chu_tu_quan9",
+        published_at=datetime(2025, 1, 6, 17, 0),
     ),
     FeedItem(
         id="106",
@@ -52,6 +71,7 @@ MOCK_FEED_DATA: list[FeedItem] = [
         background_color="#fd79a8",
         greeting="Mấy bữa nay thiên hạ bàn tán xôm tụ, tò mò ghê!",
         creator="@co_bay_saigon",
+        published_at=datetime(2025, 1, 6, 18, 30),
     ),
     FeedItem(
         id="107",
@@ -60,6 +80,7 @@ MOCK_FEED_DATA: list[FeedItem] = [
         background_color="#74b9ff",
         greeting="Tui thắc mắc lâu rồi mà chưa có dịp hỏi nè.",
         creator="@chu_nam_longan",
+        published_at=datetime(2025, 1, 6, 20, 0),
     ),
     FeedItem(
         id="108",
@@ -68,11 +89,140 @@ MOCK_FEED_DATA: list[FeedItem] = [
         background_color="#e17055",
         greeting="Tưởng chuyện nhỏ, ai dè nghe xong muốn đứng hình luôn!",
         creator="@co_chin_tiengiang",
+        published_at=datetime(2025, 1, 6, 21, 45),
     ),
 ]
 
 
+def prepare_feed(items: list[FeedItem]) -> list[FeedItem]:
+    """
+    Attach greeting audio URLs and queue the greetings for pre-synthesis.
+    """
+    params = [greeting_params(item.greeting, item.mood) for item in items]
+    prefetcher.schedule(params)
+    return [
+        item.model_copy(update={"audio_url": audio_url(p)})
+        for item, p in zip(items, params)
+    ]
+
+
+class _CachedPage:
+    """An encoded page and the rank keys it depends on."""
+
+    __slots__ = ("body", "version", "after", "through")
+
+    def __init__(self, body: EncodedBody, version: int, after: RankKey | None, through: RankKey | None):
+        self.body = body
+        # Ranking version the page is known to be current for
+        self.version = version
+        # Keys in (after, through] decide the page; None means unbounded
+        self.after = after
+        self.through = through
+
+    def covers(self, key: RankKey) -> bool:
+        return (self.after is None or key > self.after) and (self.through is None or key <= self.through)
+
+    def current(self) -> bool:
+        """Whether no ranking change since the page was built touched its keys."""
+        if self.version == feed_ranker.version:
+            return True
+        changed = feed_ranker.changed_since(self.version)
+        if changed is None or any(self.covers(key) for key in changed):
+            return False
+        self.version = feed_ranker.version
+        return True
+
+
+# Encoded pages, keyed by (after, limit)
+_page_cache: dict[tuple[str | None, int], _CachedPage] = {}
+# Bound on cached pages
+PAGE_CACHE_SIZE = 256
+# Pages are re-encoded whenever comments move their items, so compress
+# them at levels close to the best ratio for a fraction of the CPU
+PAGE_GZIP_LEVEL = 6
+PAGE_BROTLI_QUALITY = 5
+
+
+def load_feed(items: list[FeedItem]) -> None:
+    """Replace the feed's items; call whenever content is loaded or replaced."""
+    feed_ranker.load(prepare_feed(items))
+
+
+load_feed(MOCK_FEED_DATA)
+
+
+def encode_cursor(key: RankKey) -> str:
+    """Opaque cursor for a rank position: base64url of score and id."""
+    raw = f"{key[0]!r}|{key[1]}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> RankKey:
+    """
+    Parse a cursor produced by `encode_cursor`.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+    except (binascii.Error, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+    score, sep, item_id = raw.partition("|")
+    if not sep or not item_id:
+        raise ValueError("Invalid cursor")
+    rank = float(score)
+    # float() also parses "nan" and "inf", which no ranked item can have
+    if not math.isfinite(rank):
+        raise ValueError("Invalid cursor")
+    return rank, item_id
+
+
+def _encode_page(limit: int, after: RankKey | None) -> _CachedPage:
+    """Assemble a FeedResponse body from the items' pre-encoded JSON."""
+    version = feed_ranker.version
+    # One extra entry tells whether more remain and bounds the page's keys
+    entries, _ = feed_ranker.page(limit + 1, after=after)
+    has_more = len(entries) > limit
+    through = entries[limit].key if has_more else None
+    entries = entries[:limit]
+    next_cursor = encode_cursor(entries[-1].key) if has_more else None
+    body = b"".join((
+        b'{"success":true,"data":[',
+        b",".join(entry.body for entry in entries),
+        b'],"next_cursor":',
+        json.dumps(next_cursor).encode("ascii"),
+        b"}",
+    ))
+    return _CachedPage(
+        EncodedBody.from_bytes(body, gzip_level=PAGE_GZIP_LEVEL, brotli_quality=PAGE_BROTLI_QUALITY),
+        version,
+        after,
+        through,
+    )
+
+
 @router.get("", response_model=FeedResponse)
-async def get_feed() -> FeedResponse:
-    """Lấy danh sách feed với dữ liệu giả lập."""
-    return FeedResponse(success=True, data=MOCK_FEED_DATA)
+async def get_feed(
+        request: Request,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        after: str | None = Query(None, description="Cursor from a previous page's next_cursor"),
+) -> Response:
+    """
+    Lấy một trang feed, xếp hạng theo độ mới, tâm trạng và lượt bình luận.
+
+    Each page is encoded once and then served as bytes (gzip/brotli when
+    accepted) with a strong ETag; a matching If-None-Match gets 304. A
+    ranking change only re-encodes the pages whose items it moved.
+    """
+    try:
+        cursor = decode_cursor(after) if after else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor không hợp lệ")
+
+    page = _page_cache.get((after, limit))
+    if page is None or not page.current():
+        if page is None and len(_page_cache) >= PAGE_CACHE_SIZE:
+            _page_cache.clear()
+        page = _page_cache[(after, limit)] = _encode_page(limit, cursor)
+    return page.body.response(request)
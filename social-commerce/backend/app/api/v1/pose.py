@@ -1,22 +1,67 @@
 """Pose detection API endpoints."""
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import Response
+import asyncio
 import logging
+import time
 
+import numpy as np
+from pydantic import ValidationError
+
+from app.api.responses import json_dumps, model_response
 from app.schemas.pose import (
+    PoseBatchDetectionRequest,
+    PoseBatchDetectionResponse,
     PoseDetectionRequest,
     PoseDetectionResponse,
     GestureResponse,
 )
-from app.services.pose_detection import detect_gesture, Gesture
+from app.services.gesture_tracking import TemporalGestureDetector, sessions
+from app.services.metrics import metrics
+from app.services.pose_codec import MEDIA_TYPE as POSE_FRAMES_MEDIA_TYPE, decode_frames
+from app.services.pose_pool import pose_pool
+from app.services.pose_detection import (
+    DetailLevel,
+    detect_gesture_batch,
+    detector,
+    landmarks_from_array,
+    validate_landmark_array,
+    Gesture,
+    Landmark,
+)
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+_FRAME_SECONDS = metrics.histogram(
+    "pose_ws_frame_duration_seconds",
+    "Time to parse and evaluate one streamed pose frame.",
+)
+_FRAMES_DROPPED = metrics.histogram(
+    "pose_ws_dropped_frames",
+    "Stale frames replaced before evaluation, per connection.",
+    buckets=(0, 1, 10, 100, 1000),
+)
+
+# Debugging details are opt-in; the hot path skips building them entirely
+DetailsQuery = Query(
+    DetailLevel.NONE,
+    description="Details to include: none, arms (wrist/shoulder positions) or full (all 33 landmarks)",
+)
+
+
+def _landmarks(request: PoseDetectionRequest) -> list[Landmark]:
+    """Landmarks of a validated request, read straight off the schema objects."""
+    return [Landmark(lm.x, lm.y, lm.z, lm.visibility) for lm in request.landmarks]
+
 
 @router.post("/detect", response_model=PoseDetectionResponse)
-async def detect_pose_gesture(request: PoseDetectionRequest) -> PoseDetectionResponse:
+async def detect_pose_gesture(
+        request: PoseDetectionRequest,
+        details: DetailLevel = DetailsQuery,
+) -> Response:
     """
     Detect gesture from pose landmarks.
 
@@ -31,21 +76,219 @@ async def detect_pose_gesture(request: PoseDetectionRequest) -> PoseDetectionRes
     - pointing_left: Left arm extended to the side
     - pointing_right: Right arm extended to the side
     - neutral: No specific gesture detected
+
+    With a `session_id`, frames from the same client are tracked over time,
+    which adds waving and arms_crossed and debounces gesture changes.
+    Session history is kept by the worker process that handles the frame;
+    with several backend workers, stream tracked frames over /ws instead,
+    since one connection stays on one worker.
+
+    Without a session, frames are evaluated in the pose worker pool when
+    POSE_EXECUTION=pool.
     """
     try:
-        landmarks_dict = [lm.model_dump() for lm in request.landmarks]
-        result = detect_gesture(landmarks_dict)
+        if request.session_id:
+            session = sessions.get(request.session_id)
+            result = session.update(_landmarks(request), details).to_dict()
+        elif pose_pool is not None and pose_pool.running:
+            frame = np.array(
+                [[[lm.x, lm.y, lm.z, lm.visibility] for lm in request.landmarks]],
+                dtype=np.float64,
+            )
+            result = (await pose_pool.detect(frame, details))[0].to_dict()
+        else:
+            result = detector.detect(_landmarks(request), details).to_dict()
 
-        return PoseDetectionResponse(
+        return model_response(PoseDetectionResponse(
             success=True,
             data=GestureResponse(**result),
             message=f"Detected: {result['gesture']}"
-        )
+        ))
     except Exception as e:
         logger.error(f"Pose detection failed: {e}")
         raise HTTPException(status_code=500, detail="Gesture detection failed")
 
 
+@router.post("/detect/batch", response_model=PoseBatchDetectionResponse)
+async def detect_pose_gesture_batch(
+        request: PoseBatchDetectionRequest,
+        details: DetailLevel = DetailsQuery,
+) -> Response:
+    """
+    Detect gestures for a batch of frames in one call.
+
+    Accepts N frames of 33 landmarks packed as [x, y, z, visibility] rows
+    and returns one result per frame, in order. Results are identical to
+    calling /detect once per frame.
+    """
+    frames = np.asarray(request.frames, dtype=np.float64)
+    try:
+        validate_landmark_array(frames)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    return await _detect_frames(frames, details)
+
+
+@router.post(
+    "/detect/binary",
+    response_model=PoseBatchDetectionResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {POSE_FRAMES_MEDIA_TYPE: {"schema": {"type": "string", "format": "binary"}}},
+        }
+    },
+)
+async def detect_pose_gesture_binary(
+        request: Request,
+        details: DetailLevel = DetailsQuery,
+) -> Response:
+    """
+    Detect gestures from frames in the compact binary format.
+
+    The body is an 8-byte header followed by N x 33 x 4 little-endian
+    float32, float16 or quantized uint16 values (see app.services.pose_codec).
+    Frames are range-checked like the JSON endpoints and go through the same
+    batch detector.
+    """
+    try:
+        frames = decode_frames(await request.body())
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    return await _detect_frames(frames, details)
+
+
+async def _detect_frames(frames: np.ndarray, details: DetailLevel) -> Response:
+    """Run validated (N, 33, 4) frames through the batch detector (or the pool)."""
+    try:
+        if pose_pool is not None and pose_pool.running:
+            results = [result.to_dict() for result in await pose_pool.detect(frames, details)]
+        else:
+            results = detect_gesture_batch(frames, details)
+
+        return model_response(PoseBatchDetectionResponse(
+            success=True,
+            data=[GestureResponse(**result) for result in results],
+            message=f"Processed {len(results)} frames",
+        ))
+    except Exception as e:
+        logger.error(f"Batch pose detection failed: {e}")
+        raise HTTPException(status_code=500, detail="Gesture detection failed")
+
+
+class _LatestFrameSlot:
+    """
+    Single-slot mailbox holding only the newest unprocessed frame.
+
+    A new frame replaces any frame still waiting, so a client that sends
+    faster than we detect never builds up a backlog of stale frames.
+    """
+
+    def __init__(self) -> None:
+        self._frame: str | bytes | None = None
+        self._ready = asyncio.Event()
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, frame: str | bytes) -> None:
+        if self._frame is not None:
+            self.dropped += 1
+        self._frame = frame
+        self._ready.set()
+
+    def close(self) -> None:
+        self._closed = True
+        self._ready.set()
+
+    async def take(self) -> str | bytes | None:
+        """Wait for the next frame; returns None once closed and drained."""
+        while self._frame is None:
+            if self._closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+        frame, self._frame = self._frame, None
+        return frame
+
+
+async def _receive_frames(websocket: WebSocket, slot: _LatestFrameSlot) -> None:
+    """Read frames off the socket into the slot until the client goes away."""
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            frame = message.get("bytes")
+            slot.put(frame if frame is not None else message.get("text") or "")
+    except WebSocketDisconnect:
+        pass
+    finally:
+        slot.close()
+
+
+def _parse_stream_frame(frame: str | bytes) -> list[Landmark]:
+    """Decode one streamed JSON or binary frame into landmarks."""
+    if isinstance(frame, bytes):
+        return landmarks_from_array(decode_frames(frame)[-1])
+
+    try:
+        request = PoseDetectionRequest.model_validate_json(frame)
+    except ValidationError as e:
+        raise ValueError(f"{e.error_count()} validation errors")
+    return _landmarks(request)
+
+
+@router.websocket("/ws")
+async def stream_pose_gestures(
+        websocket: WebSocket,
+        details: DetailLevel = DetailsQuery,
+) -> None:
+    """
+    Stream pose frames over one long-lived connection.
+
+    Each client message is either a JSON text frame with the same shape as
+    the /detect request body, or a binary frame in the /detect/binary format
+    (only its newest frame is used). The server replies with a `gesture`
+    message only when the detected gesture changes, and an `error` message
+    for invalid frames. Frames that arrive while a previous one is being
+    processed replace each other, so only the newest frame is ever evaluated.
+
+    The connection is its own session, so temporal gestures (waving,
+    arms_crossed) and debouncing are always on.
+    """
+    await websocket.accept()
+
+    tracker = TemporalGestureDetector()
+    slot = _LatestFrameSlot()
+    receiver = asyncio.create_task(_receive_frames(websocket, slot))
+    last_gesture: str | None = None
+
+    try:
+        while (frame := await slot.take()) is not None:
+            started = time.perf_counter()
+            try:
+                landmarks = _parse_stream_frame(frame)
+            except ValueError as e:
+                await websocket.send_text(json_dumps({"type": "error", "message": f"Invalid frame: {e}"}).decode())
+                continue
+
+            result = tracker.update(landmarks, details).to_dict()
+            _FRAME_SECONDS.observe(time.perf_counter() - started)
+
+            if result["gesture"] != last_gesture:
+                last_gesture = result["gesture"]
+                await websocket.send_text(json_dumps({"type": "gesture", "data": result}).decode())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+        _FRAMES_DROPPED.observe(slot.dropped)
+        if slot.dropped:
+            logger.debug(f"Pose stream closed, dropped {slot.dropped} stale frames")
+
+
 @router.get("/gestures")
 async def list_supported_gestures() -> dict:
     """List all supported gestures."""
@@ -61,8 +304,8 @@ async def list_supported_gestures() -> dict:
                 Gesture.T_POSE.value: "Arms extended horizontally",
                 Gesture.POINTING_LEFT.value: "Left arm extended to the side",
                 Gesture.POINTING_RIGHT.value: "Right arm extended to the side",
-                Gesture.WAVING.value: "Hand moving side to side (requires sequence)",
-                Gesture.ARMS_CROSSED.value: "Arms crossed over chest",
+                Gesture.WAVING.value: "Hand moving side to side (requires session_id or /ws)",
+                Gesture.ARMS_CROSSED.value: "Arms crossed over chest (requires session_id or /ws)",
                 Gesture.NEUTRAL.value: "No specific gesture detected",
             }
         }
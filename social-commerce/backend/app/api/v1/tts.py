@@ -1,16 +1,30 @@
+import asyncio
+import dataclasses
 import os
 import logging
+import math
+import re
+from typing import AsyncIterator
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import Response
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import RedirectResponse, Response, StreamingResponse
 from pydantic import BaseModel, Field
 
-from app.services.tts import GoogleTTSService, VietnameseVoice, VOICE_PRESETS
+from app.api.http_cache import etag_matches
+from app.services.resilience import UpstreamUnavailable
+from app.services.tts import (
+    GoogleTTSService,
+    SynthesisParams,
+    VietnameseVoice,
+)
+from app.services.tts_cache import audio_cache
+from app.services.tts_chunking import split_sentences
+from app.services.tts_prefetch import prefetcher
+from app.services.voice_catalog import voice_catalog
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-# Initialize service (in production, use dependency injection)
 GOOGLE_TTS_API_KEY = os.getenv("GOOGLE_TTS_API_KEY", "")
 # Verify API key is loaded (without exposing it)
 if GOOGLE_TTS_API_KEY:
@@ -18,6 +32,52 @@ if GOOGLE_TTS_API_KEY:
 else:
     logger.warning("GOOGLE_TTS_API_KEY not found in environment variables")
 
+# Concurrent chunk syntheses per streaming request
+TTS_STREAM_PARALLELISM = int(os.getenv("TTS_STREAM_PARALLELISM", "4"))
+# Longest text sent to Google in one streamed chunk
+TTS_STREAM_CHUNK_CHARS = int(os.getenv("TTS_STREAM_CHUNK_CHARS", "300"))
+# Retries of a shed chunk after the stream has started
+TTS_STREAM_CHUNK_RETRIES = int(os.getenv("TTS_STREAM_CHUNK_RETRIES", "2"))
+# Audio URLs are addressed by SynthesisParams.cache_key (SHA-256 hex)
+_CACHE_KEY = re.compile(r"[0-9a-f]{64}")
+# A single byte range: "bytes=first-last", "bytes=first-" or "bytes=-suffix"
+_BYTE_RANGE = re.compile(r"\s*bytes\s*=\s*([0-9]*)\s*-\s*([0-9]*)\s*", re.IGNORECASE)
+# Seconds browsers and the CDN may reuse the voice list without revalidating
+VOICES_MAX_AGE = int(os.getenv("TTS_VOICES_MAX_AGE", "300"))
+
+
+def create_tts_service() -> GoogleTTSService | None:
+    """Create the app-lifetime TTS service, or None when no API key is set."""
+    if not GOOGLE_TTS_API_KEY:
+        return None
+    return GoogleTTSService.from_env(GOOGLE_TTS_API_KEY)
+
+
+def get_tts_service(request: Request) -> GoogleTTSService:
+    """Dependency returning the shared service created in the app lifespan."""
+    service = getattr(request.app.state, "tts_service", None)
+    if service is None:
+        raise HTTPException(
+            status_code=503,
+            detail="TTS service not configured. Set GOOGLE_TTS_API_KEY environment variable."
+        )
+    return service
+
+
+def _unavailable(e: UpstreamUnavailable) -> HTTPException:
+    """503 for a call shed by the limiter or circuit breaker, with Retry-After."""
+    logger.warning(f"TTS upstream unavailable: {e}")
+    return HTTPException(
+        status_code=503,
+        detail="TTS service temporarily unavailable",
+        headers={"Retry-After": str(math.ceil(e.retry_after))},
+    )
+
+
+def audio_url(params: SynthesisParams) -> str:
+    """Stable URL serving the audio for params (see `get_audio`)."""
+    return f"/api/v1/tts/audio/{params.cache_key}"
+
 
 class TTSRequest(BaseModel):
     text: str = Field(..., min_length=1, max_length=5000)
@@ -31,74 +91,267 @@ class TTSRequest(BaseModel):
 
 
 @router.post("/synthesize")
-async def synthesize_speech(request: TTSRequest) -> Response:
+async def synthesize_speech(
+        request: TTSRequest,
+        redirect: bool = False,
+        service: GoogleTTSService = Depends(get_tts_service),
+) -> Response:
     """
     Synthesize Vietnamese speech using Google Cloud TTS.
 
-    Returns MP3 audio bytes.
+    Returns MP3 audio bytes, with Content-Location pointing at the cacheable
+    `GET /audio/{key}` URL for the same audio. With `redirect=true` the
+    response is a 303 to that URL instead, so repeat plays are served by
+    browser and CDN caches.
     """
-    if not GOOGLE_TTS_API_KEY:
-        raise HTTPException(
-            status_code=503,
-            detail="TTS service not configured. Set GOOGLE_TTS_API_KEY environment variable."
-        )
-
     try:
-        service = GoogleTTSService(GOOGLE_TTS_API_KEY)
-
         # Apply preset if specified
-        voice = request.voice
-        speaking_rate = request.speaking_rate
-        pitch = request.pitch
-
-        if request.preset and request.preset in VOICE_PRESETS:
-            preset = VOICE_PRESETS[request.preset]
-            voice = voice or preset["voice"]
-            speaking_rate = preset["speaking_rate"]
-            pitch = preset["pitch"]
-
-        audio_bytes = await service.synthesize(
+        params = SynthesisParams.resolve(
             text=request.text,
-            voice=voice,
-            speaking_rate=speaking_rate,
-            pitch=pitch,
+            voice=request.voice,
+            preset=request.preset,
+            speaking_rate=request.speaking_rate,
+            pitch=request.pitch,
         )
 
-        return Response(
-            content=audio_bytes,
-            media_type="audio/mpeg",
-            headers={
-                "Content-Disposition": "inline",
-                "Cache-Control": "public, max-age=3600",
-            },
-        )
+        audio_bytes = await audio_cache.synthesize(service, params)
 
+    except UpstreamUnavailable as e:
+        raise _unavailable(e)
     except Exception as e:
         logger.error(f"TTS synthesis failed: {e}")
         raise HTTPException(status_code=500, detail="Failed to synthesize speech")
 
+    location = audio_url(params)
+    if redirect:
+        return RedirectResponse(location, status_code=303)
 
-@router.get("/voices")
-async def list_voices() -> dict:
-    """List available Vietnamese voices."""
-    if not GOOGLE_TTS_API_KEY:
-        raise HTTPException(
-            status_code=503,
-            detail="TTS service not configured"
-        )
+    return Response(
+        content=audio_bytes,
+        media_type="audio/mpeg",
+        headers={
+            "Content-Disposition": "inline",
+            "Content-Location": location,
+            "Cache-Control": "public, max-age=3600",
+        },
+    )
+
+
+@router.post("/synthesize/stream")
+async def synthesize_speech_stream(
+        request: TTSRequest,
+        service: GoogleTTSService = Depends(get_tts_service),
+) -> StreamingResponse:
+    """
+    Synthesize long text sentence by sentence and stream the MP3 segments.
 
+    Chunks are synthesized concurrently (bounded by TTS_STREAM_PARALLELISM)
+    and cached individually, but always sent in text order. The response
+    starts as soon as the first sentence is ready; the rest are started
+    with the body. A later chunk shed by
+    the upstream limiter is retried; if it still fails, the response is
+    aborted mid-body instead of ending early.
+    """
+    params = SynthesisParams.resolve(
+        text=request.text,
+        voice=request.voice,
+        preset=request.preset,
+        speaking_rate=request.speaking_rate,
+        pitch=request.pitch,
+    )
+    chunks = [
+        dataclasses.replace(params, text=chunk)
+        for chunk in split_sentences(params.text, max_chars=TTS_STREAM_CHUNK_CHARS)
+    ]
+    if not chunks:
+        raise HTTPException(status_code=422, detail="Text has nothing to speak")
+
+    semaphore = asyncio.Semaphore(TTS_STREAM_PARALLELISM)
+
+    async def synthesize_chunk(chunk: SynthesisParams, retries: int) -> bytes:
+        for attempt in range(retries + 1):
+            try:
+                async with semaphore:
+                    return await audio_cache.synthesize(service, chunk)
+            except UpstreamUnavailable as e:
+                if attempt == retries:
+                    raise
+                await asyncio.sleep(min(e.retry_after, 1.0))
+
+    # Synthesize the first segment here so a failure still maps to a 500/503;
+    # it fails fast, later ones are retried since the 200 is sent by then
     try:
-        service = GoogleTTSService(GOOGLE_TTS_API_KEY)
-        voices = await service.list_voices()
+        first = await synthesize_chunk(chunks[0], 0)
+    except UpstreamUnavailable as e:
+        raise _unavailable(e)
+    except Exception as e:
+        logger.error(f"TTS streaming synthesis failed: {e}")
+        raise HTTPException(status_code=500, detail="Failed to synthesize speech")
+
+    async def segments() -> AsyncIterator[bytes]:
+        # Started only once the body is sent: a response that is never
+        # streamed leaves nothing running
+        tasks = [
+            asyncio.create_task(synthesize_chunk(chunk, TTS_STREAM_CHUNK_RETRIES))
+            for chunk in chunks[1:]
+        ]
+        try:
+            yield first
+            for i, task in enumerate(tasks, start=2):
+                try:
+                    yield await task
+                except Exception as e:
+                    # Headers are already sent: abort the response rather than
+                    # end it cleanly, so the client sees a failed transfer
+                    # instead of a complete but clipped MP3
+                    logger.error(f"TTS chunk {i}/{len(chunks)} failed: {e}")
+                    raise
+        finally:
+            # Client went away or a chunk failed: drop chunks still waiting
+            # for a slot. Syntheses already running are single-flight work
+            # shared with other callers; they finish and fill the cache.
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(
+        segments(),
+        media_type="audio/mpeg",
+        headers={
+            "Content-Disposition": "inline",
+            "Cache-Control": "public, max-age=3600",
+            "X-TTS-Chunks": str(len(chunks)),
+        },
+    )
+
+
+@router.api_route("/audio/{key}", methods=["GET", "HEAD"])
+async def get_audio(key: str, request: Request) -> Response:
+    """
+    Serve synthesized audio by its cache key.
+
+    The URL is content-addressed, so responses are immutable and carry the
+    key as their strong ETag. Supports If-None-Match (304) and a
+    single byte Range (206/416) for seeking. Audio that was evicted is
+    synthesized again when the key's parameters are still known; unknown
+    keys are 404.
+    """
+    if not _CACHE_KEY.fullmatch(key):
+        raise HTTPException(status_code=404, detail="Audio not found")
+
+    # The URL already addresses the content: the key is the ETag, and a
+    # revalidation is answered without loading the audio
+    etag = f'"{key}"'
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "Content-Disposition": "inline",
+    }
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    audio = None
+    params = audio_cache.params_for(key)
+    if params is None or getattr(request.app.state, "tts_service", None) is None:
+        # Nothing to synthesize with: only cached audio can be served
+        audio = await audio_cache.get(key)
+        if audio is None and params is None:
+            raise HTTPException(status_code=404, detail="Audio not found")
+    if audio is None:
+        # synthesize() looks the key up itself, so a miss is counted once
+        service = get_tts_service(request)
+        try:
+            audio = await audio_cache.synthesize(service, params)
+        except UpstreamUnavailable as e:
+            raise _unavailable(e)
+        except Exception as e:
+            logger.error(f"TTS synthesis failed: {e}")
+            raise HTTPException(status_code=500, detail="Failed to synthesize speech")
 
-        return {
-            "success": True,
-            "data": {
-                "voices": voices,
-                "presets": list(VOICE_PRESETS.keys()),
-            },
-        }
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    # A stale If-Range means the client's partial copy is outdated: send it all
+    if range_header and (if_range is None or if_range.strip() == etag):
+        byte_range = _parse_range(range_header, len(audio))
+        if byte_range == "unsatisfiable":
+            headers["Content-Range"] = f"bytes */{len(audio)}"
+            return Response(status_code=416, headers=headers)
+        if byte_range is not None:
+            first, last = byte_range
+            headers["Content-Range"] = f"bytes {first}-{last}/{len(audio)}"
+            return Response(
+                content=audio[first:last + 1],
+                status_code=206,
+                media_type="audio/mpeg",
+                headers=headers,
+            )
 
+    return Response(content=audio, media_type="audio/mpeg", headers=headers)
+
+
+def _parse_range(header: str, size: int) -> tuple[int, int] | str | None:
+    """
+    Parse a Range header against a body of `size` bytes.
+
+    Returns:
+        (first, last) inclusive byte positions, "unsatisfiable", or None
+        when the header should be ignored (malformed, multiple ranges, or
+        a last position before the first).
+    """
+    match = _BYTE_RANGE.fullmatch(header)
+    if match is None:
+        return None
+    start, end = match.groups()
+    if start:
+        first = int(start)
+        last = int(end) if end else size - 1
+        if first > last:
+            return None
+    elif end:
+        # Suffix range: the final N bytes
+        length = int(end)
+        if length == 0:
+            return "unsatisfiable"
+        first, last = max(size - length, 0), size - 1
+    else:
+        return None
+
+    if first >= size:
+        return "unsatisfiable"
+    return first, min(last, size - 1)
+
+
+@router.get("/voices")
+async def list_voices(
+        request: Request,
+        service: GoogleTTSService = Depends(get_tts_service),
+) -> Response:
+    """
+    List available Vietnamese voices.
+
+    Served from the in-process catalog with a strong ETag; clients sending
+    a matching If-None-Match get 304. If Google is unreachable, the last
+    known catalog is served.
+    """
+    try:
+        snapshot = await voice_catalog.get(service.list_voices)
+    except UpstreamUnavailable as e:
+        raise _unavailable(e)
     except Exception as e:
         logger.error(f"Failed to list voices: {e}")
         raise HTTPException(status_code=500, detail="Failed to list voices")
+
+    headers = {
+        "ETag": snapshot.etag,
+        "Cache-Control": f"public, max-age={VOICES_MAX_AGE}, stale-while-revalidate={VOICES_MAX_AGE}",
+    }
+    if etag_matches(request.headers.get("if-none-match"), snapshot.etag):
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
+
+
+@router.get("/cache")
+async def get_cache_stats() -> dict:
+    """Synthesis cache hit/miss/eviction counters and prefetch queue state."""
+    return {"success": True, "data": {**audio_cache.stats(), "prefetch": prefetcher.stats()}}
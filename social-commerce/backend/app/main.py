@@ -1,17 +1,107 @@
 import os
+from contextlib import asynccontextmanager
+
 from dotenv import load_dotenv
 
 load_dotenv()  # Load .env BEFORE any app imports
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 
+from app.api.metrics import MetricsMiddleware
+from app.api.responses import FastJSONResponse
 from app.api.v1 import router as v1_router
+from app.api.v1.tts import create_tts_service
+from app.services.comment_events import broadcaster
+from app.services.comment_relay import CommentEventRelay
+from app.services.comment_sqlite import SQLiteCommentStore
+from app.services.comment_store import create_comment_store
+from app.services.feed_ranking import feed_ranker
+from app.services.metrics import metrics
+from app.services.pose_pool import pose_pool
+from app.services.tts_cache import audio_cache
+from app.services.tts_prefetch import prefetcher
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create app-lifetime services on startup and close them on shutdown."""
+    app.state.comment_store = create_comment_store()
+    # Rank the feed by comment activity already in the store
+    await feed_ranker.sync_activity(app.state.comment_store)
+    # Other workers sharing the store: replay their comment changes here
+    relay = None
+    if isinstance(app.state.comment_store, SQLiteCommentStore):
+        relay = CommentEventRelay.from_env(app.state.comment_store)
+        await relay.start()
+        metrics.register_collector(
+            "comments_relay",
+            "Comment changes replayed from other workers.",
+            relay.stats,
+            counters=("relayed", "resyncs"),
+        )
+    # Pose rule evaluation off the event loop (POSE_EXECUTION=pool)
+    if pose_pool is not None:
+        await pose_pool.start()
+        metrics.register_collector(
+            "pose_pool",
+            "Pose worker pool state.",
+            pose_pool.stats,
+            counters=("batches", "frames", "restarts"),
+        )
+    app.state.tts_service = create_tts_service()
+    if app.state.tts_service is not None:
+        # Synthesize queued feed greetings in the background
+        prefetcher.start(app.state.tts_service)
+        metrics.register_collector(
+            "tts_service",
+            "Google TTS breaker and limiter state.",
+            app.state.tts_service.stats,
+            counters=("breaker_rejected", "limiter_waited", "limiter_rejected"),
+        )
+
+    metrics.register_collector(
+        "tts_cache",
+        "Synthesis cache state.",
+        audio_cache.stats,
+        counters=(
+            "hits", "memory_hits", "disk_hits", "misses", "evictions", "expirations",
+            "disk_evictions", "disk_sweeps", "disk_lock_waits", "coalesced",
+        ),
+    )
+    metrics.register_collector(
+        "tts_prefetch",
+        "Greeting pre-synthesis queue state.",
+        prefetcher.stats,
+        counters=("completed", "failed"),
+    )
+    metrics.register_collector(
+        "comments_sse",
+        "Live comment stream state.",
+        lambda: {"subscribers": broadcaster.subscriber_count(), "published": broadcaster.published},
+        counters=("published",),
+    )
+    metrics.register_collector("feed", "Ranked feed state.", lambda: {"items": len(feed_ranker)})
+    try:
+        yield
+    finally:
+        if relay is not None:
+            await relay.stop()
+        await prefetcher.stop()
+        if pose_pool is not None:
+            await pose_pool.stop()
+        if app.state.tts_service is not None:
+            await app.state.tts_service.aclose()
+        await app.state.comment_store.aclose()
+
 
 app = FastAPI(
     title="Voice-First Social Feed API",
     description="Backend API for the voice-first social feed application",
     version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
 
 # CORS configuration - allow origins from environment or use defaults
@@ -39,10 +129,30 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so timings include CORS handling
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(v1_router, prefix="/api")
 
 
 @app.get("/health")
 async def health_check() -> dict[str, str]:
-    """Health check endpoint."""
-    return {"status": "healthy"}
+    """
+    Health check endpoint.
+
+    Reports "degraded" while the TTS circuit breaker is not closed. The
+    status code stays 200: restarting the container does not fix upstream.
+    """
+    service = app.state.tts_service
+    if service is None:
+        return {"status": "healthy", "tts": "disabled"}
+
+    tts_state = service.breaker.state.value
+    status = "healthy" if tts_state == "closed" else "degraded"
+    return {"status": status, "tts": tts_state}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics() -> Response:
+    """Prometheus scrape endpoint."""
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
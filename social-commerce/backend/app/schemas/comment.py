@@ -27,3 +27,7 @@ class CommentResponse(BaseModel):
 class CommentsListResponse(BaseModel):
     success: bool
     data: list[Comment]
+    next_cursor: Optional[str] = Field(
+        default=None,
+        description="Pass as `before` to fetch the next (older) page; null on the last page",
+    )
@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import Literal
 
 from pydantic import BaseModel, Field
@@ -16,8 +17,11 @@ class FeedItem(BaseModel):
     )
     greeting: str = Field(..., min_length=1, max_length=500)
     creator: str = Field(..., pattern=r"^@[\w]+$", description="Creator username with @ prefix")
+    audio_url: str | None = Field(default=None, description="Pre-synthesized greeting audio URL")
+    published_at: datetime = Field(default_factory=datetime.now, description="Publication time, used for ranking")
 
 
 class FeedResponse(BaseModel):
     success: bool
     data: list[FeedItem]
+    next_cursor: str | None = Field(default=None, description="Pass as `after` to get the next page")
@@ -1,7 +1,15 @@
 """Pydantic schemas for pose detection API."""
 
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Annotated, Optional
+
+# Maximum frames accepted per batch request (~4 seconds at 30 fps)
+MAX_BATCH_FRAMES = 120
+
+# One landmark as a packed [x, y, z, visibility] row
+LandmarkRow = Annotated[list[float], Field(min_length=4, max_length=4)]
+# One frame of 33 landmark rows
+LandmarkFrame = Annotated[list[LandmarkRow], Field(min_length=33, max_length=33)]
 
 
 class LandmarkSchema(BaseModel):
@@ -20,6 +28,22 @@ class PoseDetectionRequest(BaseModel):
         max_length=33,
         description="33 MediaPipe pose landmarks"
     )
+    session_id: Optional[str] = Field(
+        None,
+        min_length=1,
+        max_length=64,
+        description="Client session id; enables temporal gestures (waving) and debouncing"
+    )
+
+
+class PoseBatchDetectionRequest(BaseModel):
+    """Request body for batched pose gesture detection."""
+    frames: list[LandmarkFrame] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_BATCH_FRAMES,
+        description="N frames of 33 landmarks, each landmark as [x, y, z, visibility]"
+    )
 
 
 class GestureResponse(BaseModel):
@@ -34,3 +58,10 @@ class PoseDetectionResponse(BaseModel):
     success: bool = True
     data: GestureResponse
     message: Optional[str] = None
+
+
+class PoseBatchDetectionResponse(BaseModel):
+    """API response for batched pose detection."""
+    success: bool = True
+    data: list[GestureResponse]
+    message: Optional[str] = None
@@ -0,0 +1,147 @@
+"""
+Per-feed-item fan-out of comment changes to live subscribers.
+
+Each event is serialized once into a ready-to-send Server-Sent Events
+frame and appended to the feed item's bounded ring of recent frames. Every
+subscriber keeps its own cursor into that ring, so publishing costs O(1)
+plus one wake-up, no matter how many subscribers there are. A subscriber
+can fall at most `max_pending` frames behind. A slower consumer finds its
+cursor has left the ring: it gets a final "reset" event telling the client
+to refetch and is then disconnected, so a stalled client never holds
+memory or slows the publisher.
+"""
+
+import asyncio
+import json
+import logging
+from collections import deque
+from typing import Any
+
+from app.schemas.comment import Comment
+
+logger = logging.getLogger(__name__)
+
+# Sent to a subscriber that fell behind, just before it is dropped
+RESET_FRAME = b"event: reset\ndata: {}\n\n"
+
+
+def encode_event(event: str, data: dict[str, Any]) -> bytes:
+    """Serialize one SSE frame."""
+    payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str)
+    return f"event: {event}\ndata: {payload}\n\n".encode("utf-8")
+
+
+class _Channel:
+    """Recent frames of one feed item plus the event subscribers wait on."""
+
+    __slots__ = ("frames", "seq", "wakeup", "subscribers")
+
+    def __init__(self, max_pending: int):
+        self.frames: deque[bytes] = deque(maxlen=max_pending)
+        # Total frames ever published; frames[-1] has sequence seq - 1
+        self.seq = 0
+        self.wakeup = asyncio.Event()
+        self.subscribers = 0
+
+
+class Subscription:
+    """One subscriber's position in a feed item's event stream."""
+
+    __slots__ = ("feed_id", "_channel", "_next", "dropped")
+
+    def __init__(self, feed_id: str, channel: _Channel):
+        self.feed_id = feed_id
+        self._channel = channel
+        self._next = channel.seq
+        self.dropped = False
+
+    @property
+    def pending(self) -> int:
+        """Frames published but not yet read."""
+        return self._channel.seq - self._next
+
+    async def next(self) -> bytes:
+        """
+        Wait for the next frame.
+
+        Returns `RESET_FRAME` (and marks the subscription dropped) if the
+        subscriber fell further behind than the ring holds.
+        """
+        channel = self._channel
+        while self._next >= channel.seq:
+            await channel.wakeup.wait()
+
+        behind = channel.seq - self._next
+        if behind > len(channel.frames):
+            self.dropped = True
+            return RESET_FRAME
+        self._next += 1
+        return channel.frames[-behind]
+
+
+class CommentBroadcaster:
+    """Publish comment created/deleted events to subscribers of a feed item."""
+
+    def __init__(self, max_pending: int = 64):
+        """
+        Initialize the broadcaster.
+
+        Args:
+            max_pending: Frames a subscriber may lag behind before it is
+                treated as a slow consumer and disconnected.
+        """
+        self.max_pending = max_pending
+        self._channels: dict[str, _Channel] = {}
+        self.published = 0
+
+    def subscriber_count(self, feed_id: str | None = None) -> int:
+        """Subscribers of one feed item, or of all of them."""
+        if feed_id is not None:
+            channel = self._channels.get(feed_id)
+            return channel.subscribers if channel else 0
+        return sum(channel.subscribers for channel in self._channels.values())
+
+    def subscribe(self, feed_id: str) -> Subscription:
+        """Register a subscriber starting at the next event; pair with `unsubscribe`."""
+        channel = self._channels.get(feed_id)
+        if channel is None:
+            channel = self._channels[feed_id] = _Channel(self.max_pending)
+        channel.subscribers += 1
+        return Subscription(feed_id, channel)
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        channel = self._channels.get(subscription.feed_id)
+        if channel is None or channel is not subscription._channel:
+            return
+        channel.subscribers -= 1
+        if channel.subscribers == 0:
+            del self._channels[subscription.feed_id]
+
+    def publish(self, feed_id: str, event: str, data: dict[str, Any]) -> int:
+        """
+        Send an event to every subscriber of a feed item.
+
+        Returns:
+            Number of subscribers at the time of publishing.
+        """
+        channel = self._channels.get(feed_id)
+        if channel is None:
+            return 0
+
+        channel.frames.append(encode_event(event, data))
+        channel.seq += 1
+        # Wake current waiters; later waits use a fresh event
+        wakeup, channel.wakeup = channel.wakeup, asyncio.Event()
+        wakeup.set()
+        self.published += 1
+        return channel.subscribers
+
+    def comment_created(self, comment: Comment) -> int:
+        return self.publish(comment.feed_id, "comment_created", comment.model_dump(mode="json"))
+
+    def comment_deleted(self, comment: Comment) -> int:
+        return self.publish(comment.feed_id, "comment_deleted", {"id": comment.id})
+
+
+# Shared broadcaster for the comments API
+broadcaster = CommentBroadcaster()
@@ -0,0 +1,116 @@
+"""
+Replay comment changes made by other worker processes.
+
+With several uvicorn workers, a comment posted through one worker must
+still reach SSE subscribers and the feed ranking held by every other
+worker. Workers share the SQLite store, whose writes also append to a
+change log (`comment_events`). Each worker polls that log and applies the
+changes written by other processes to its local broadcaster and ranker;
+its own changes were already applied by the API handler that made them.
+
+SQLite serializes writers, so events become visible in sequence order and
+polling `seq > last seen` never skips one. The only way to miss events is
+to fall behind the log's retention; the ranking is then reloaded from the
+store.
+"""
+
+import asyncio
+import logging
+import os
+
+from app.services.comment_events import CommentBroadcaster, broadcaster
+from app.services.comment_sqlite import COMMENT_CREATED, COMMENT_DELETED, SQLiteCommentStore
+from app.services.feed_ranking import FeedRanker, feed_ranker
+
+logger = logging.getLogger(__name__)
+
+
+class CommentEventRelay:
+    """Background task tailing a shared store's change log."""
+
+    def __init__(
+            self,
+            store: SQLiteCommentStore,
+            interval: float = 0.1,
+            batch: int = 500,
+            events: CommentBroadcaster = broadcaster,
+            ranker: FeedRanker = feed_ranker,
+    ):
+        """
+        Initialize the relay.
+
+        Args:
+            store: Store shared with the other workers.
+            interval: Seconds between polls while the log is idle; bounds
+                how late other workers' changes show up here.
+            batch: Most events read per poll.
+            events: Broadcaster other workers' changes are published to.
+            ranker: Feed ranking kept in step with comment counts.
+        """
+        self.store = store
+        self.interval = interval
+        self.batch = batch
+        self.events = events
+        self.ranker = ranker
+        self.seq = 0
+        self.relayed = 0
+        self.resyncs = 0
+        self._task: asyncio.Task | None = None
+
+    @classmethod
+    def from_env(cls, store: SQLiteCommentStore) -> "CommentEventRelay":
+        """Build a relay from COMMENT_EVENTS_POLL_SECONDS."""
+        return cls(store, interval=float(os.getenv("COMMENT_EVENTS_POLL_SECONDS", "0.1")))
+
+    async def start(self) -> None:
+        """Start tailing from the newest event; call from inside the running event loop."""
+        self.seq = await self.store.last_event_seq()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def stats(self) -> dict:
+        return {"seq": self.seq, "relayed": self.relayed, "resyncs": self.resyncs}
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                caught_up = await self.poll()
+            except Exception as e:
+                logger.warning(f"Comment event relay poll failed: {e}")
+                caught_up = True
+            if caught_up:
+                await asyncio.sleep(self.interval)
+
+    async def poll(self) -> bool:
+        """
+        Apply one batch of new events.
+
+        Returns:
+            Whether the log has been read to the end.
+        """
+        events = await self.store.events_since(self.seq, self.batch)
+        if events and events[0][0] > self.seq + 1:
+            # Events we had not read yet were trimmed: start over from the store
+            self.resyncs += 1
+            logger.warning(f"Comment event relay fell behind at seq {self.seq}; reloading comment counts")
+            self.seq = await self.store.last_event_seq()
+            await self.ranker.sync_activity(self.store)
+            return True
+
+        for seq, origin, kind, comment in events:
+            self.seq = seq
+            if origin == self.store.origin:
+                continue
+            if kind == COMMENT_CREATED:
+                self.events.comment_created(comment)
+                self.ranker.comment_added(comment.feed_id)
+            elif kind == COMMENT_DELETED:
+                self.events.comment_deleted(comment)
+                self.ranker.comment_removed(comment.feed_id)
+            self.relayed += 1
+        return len(events) < self.batch
@@ -0,0 +1,173 @@
+"""
+In-memory comment storage with an id index.
+
+Each feed item's comments are kept in a list sorted by (created_at, id),
+so reads walk it backwards for newest-first without sorting. New comments
+normally sort last and are appended; one that does not (a shared
+timestamp with a smaller id, or the clock stepping back) is inserted at
+its place.
+A secondary index maps comment id -> (feed_id, position), making lookups
+and deletes O(1). Deleted slots become tombstones; a feed's list is
+compacted once tombstones outnumber live comments, which keeps reads
+proportional to live comments and deletes amortized O(1).
+
+Pages are addressed by a (created_at, id) keyset cursor. Because slots
+are in key order, the cursor's position is found through the id index,
+or by binary search over the per-slot keys if that comment has since
+been deleted, so a page costs O(page size) regardless of how many
+comments the feed item has.
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+
+from app.schemas.comment import Comment
+
+# Keyset cursor: (created_at, id) of the last comment on the previous page
+Cursor = tuple[datetime, str]
+
+
+class _FeedComments:
+    """(created_at, id)-ordered slots for one feed item; None marks a deleted comment."""
+
+    __slots__ = ("slots", "keys", "live")
+
+    def __init__(self) -> None:
+        self.slots: list[Comment | None] = []
+        # Sort key of every slot, kept for tombstones too so cursors can bisect
+        self.keys: list[Cursor] = []
+        self.live = 0
+
+
+class CommentRepository:
+    """Comments grouped by feed item, with O(1) lookup and delete by id."""
+
+    def __init__(self, compact_ratio: float = 0.5):
+        """
+        Initialize an empty repository.
+
+        Args:
+            compact_ratio: Fraction of tombstones in a feed's list that
+                triggers compaction.
+        """
+        self.compact_ratio = compact_ratio
+        self._feeds: dict[str, _FeedComments] = {}
+        self._index: dict[str, tuple[str, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def add(self, comment: Comment) -> Comment:
+        """Add a comment to its feed item at its (created_at, id) position."""
+        feed = self._feeds.get(comment.feed_id)
+        if feed is None:
+            feed = self._feeds[comment.feed_id] = _FeedComments()
+
+        key = (comment.created_at, comment.id)
+        feed.live += 1
+        if not feed.keys or key > feed.keys[-1]:
+            self._index[comment.id] = (comment.feed_id, len(feed.slots))
+            feed.slots.append(comment)
+            feed.keys.append(key)
+            return comment
+
+        # Out of order: insert, then re-point the comments that moved up
+        position = bisect_right(feed.keys, key)
+        feed.slots.insert(position, comment)
+        feed.keys.insert(position, key)
+        for moved in range(position, len(feed.slots)):
+            if feed.slots[moved] is not None:
+                self._index[feed.slots[moved].id] = (comment.feed_id, moved)
+        return comment
+
+    def get(self, comment_id: str) -> Comment | None:
+        """Look up a comment by id."""
+        location = self._index.get(comment_id)
+        if location is None:
+            return None
+        feed_id, position = location
+        return self._feeds[feed_id].slots[position]
+
+    def list_comments(self, feed_id: str) -> list[Comment]:
+        """All comments of a feed item, newest first."""
+        feed = self._feeds.get(feed_id)
+        if feed is None:
+            return []
+        return [c for c in reversed(feed.slots) if c is not None]
+
+    def page(
+            self,
+            feed_id: str,
+            limit: int,
+            before: Cursor | None = None,
+    ) -> tuple[list[Comment], bool]:
+        """
+        One page of a feed item's comments, newest first.
+
+        Args:
+            feed_id: Feed item id.
+            limit: Maximum comments to return.
+            before: Cursor of the last comment already seen; the page starts
+                with the next older comment. None starts from the newest.
+
+        Returns:
+            (comments, whether older comments remain).
+        """
+        feed = self._feeds.get(feed_id)
+        if feed is None:
+            return [], False
+
+        end = len(feed.slots) if before is None else self._position(feed_id, feed, before)
+        page: list[Comment] = []
+        slots = feed.slots
+        for position in range(end - 1, -1, -1):
+            comment = slots[position]
+            if comment is None:
+                continue
+            if len(page) == limit:
+                return page, True
+            page.append(comment)
+        return page, False
+
+    def count(self, feed_id: str) -> int:
+        """Number of comments on a feed item."""
+        feed = self._feeds.get(feed_id)
+        return feed.live if feed else 0
+
+    def delete(self, comment_id: str) -> Comment | None:
+        """
+        Remove a comment by id.
+
+        Returns:
+            The removed comment, or None if no comment has that id.
+        """
+        location = self._index.pop(comment_id, None)
+        if location is None:
+            return None
+
+        feed_id, position = location
+        feed = self._feeds[feed_id]
+        comment = feed.slots[position]
+        feed.slots[position] = None
+        feed.live -= 1
+
+        if feed.live == 0:
+            del self._feeds[feed_id]
+        elif len(feed.slots) - feed.live > len(feed.slots) * self.compact_ratio:
+            self._compact(feed_id, feed)
+        return comment
+
+    def _position(self, feed_id: str, feed: _FeedComments, cursor: Cursor) -> int:
+        """Slot position of the cursor's comment, or where it would be."""
+        location = self._index.get(cursor[1])
+        if location is not None and location[0] == feed_id:
+            return location[1]
+        return bisect_left(feed.keys, cursor)
+
+    def _compact(self, feed_id: str, feed: _FeedComments) -> None:
+        """Drop tombstones and re-point the index at the new positions."""
+        feed.slots = [c for c in feed.slots if c is not None]
+        feed.keys = [(c.created_at, c.id) for c in feed.slots]
+        for position, comment in enumerate(feed.slots):
+            self._index[comment.id] = (feed_id, position)
+
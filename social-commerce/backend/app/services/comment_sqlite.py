@@ -0,0 +1,347 @@
+"""
+SQLite comment store in WAL mode with group commit.
+
+Readers and the single writer never block each other in WAL mode, so
+reads run on a small thread pool with one connection per thread. All
+writes go through one writer thread: it takes every write queued while the
+previous transaction was committing and applies them in a single
+transaction (group commit), so a burst of N inserts costs far fewer than N
+fsyncs. Each write runs under its own savepoint, so one failing write
+(e.g. a duplicate id) does not fail the rest of its batch. Nothing here
+runs on the event loop thread.
+
+Every insert and delete also appends a row to `comment_events` in the same
+savepoint, tagged with the writing store's `origin`. Worker processes
+sharing the database tail that log (see `comment_relay`) to learn about
+changes made by the others. The log is trimmed to the newest
+`events_keep` rows as batches commit.
+"""
+
+import asyncio
+import logging
+import queue
+import sqlite3
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable
+
+from app.schemas.comment import Comment
+from app.services.comment_repository import Cursor
+from app.services.comment_store import CommentStore
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS comments (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    feed_id TEXT NOT NULL,
+    content TEXT NOT NULL,
+    creator TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_comments_feed_created
+    ON comments (feed_id, created_at, id);
+CREATE TABLE IF NOT EXISTS comment_events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    origin TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    comment TEXT NOT NULL
+);
+"""
+
+_COLUMNS = "id, feed_id, content, creator, created_at"
+
+# Trim the event log once every this many committed batches
+_TRIM_EVERY = 64
+
+COMMENT_CREATED = "created"
+COMMENT_DELETED = "deleted"
+
+# A logged change: (seq, origin, kind, comment)
+CommentEvent = tuple[int, str, str, Comment]
+
+# A write: (operation, args, loop, future)
+_Write = tuple[Callable[..., Any], tuple, asyncio.AbstractEventLoop, asyncio.Future]
+
+
+def _timestamp(value: datetime) -> str:
+    """Fixed-width ISO timestamp, so text order matches time order."""
+    return value.isoformat(timespec="microseconds")
+
+
+def _row_to_comment(row: tuple) -> Comment:
+    comment_id, feed_id, content, creator, created_at = row
+    return Comment(
+        id=comment_id,
+        feed_id=feed_id,
+        content=content,
+        creator=creator,
+        created_at=datetime.fromisoformat(created_at),
+    )
+
+
+def _log_event(conn: sqlite3.Connection, origin: str, kind: str, comment: Comment) -> None:
+    conn.execute(
+        "INSERT INTO comment_events (origin, kind, comment) VALUES (?, ?, ?)",
+        (origin, kind, comment.model_dump_json()),
+    )
+
+
+def _insert(conn: sqlite3.Connection, origin: str, comment: Comment) -> Comment:
+    conn.execute(
+        f"INSERT INTO comments ({_COLUMNS}) VALUES (?, ?, ?, ?, ?)",
+        (comment.id, comment.feed_id, comment.content, comment.creator, _timestamp(comment.created_at)),
+    )
+    _log_event(conn, origin, COMMENT_CREATED, comment)
+    return comment
+
+
+def _delete(conn: sqlite3.Connection, origin: str, comment_id: str) -> Comment | None:
+    row = conn.execute(
+        f"DELETE FROM comments WHERE id = ? RETURNING {_COLUMNS}",
+        (comment_id,),
+    ).fetchone()
+    if row is None:
+        return None
+    comment = _row_to_comment(row)
+    _log_event(conn, origin, COMMENT_DELETED, comment)
+    return comment
+
+
+def _resolve(future: asyncio.Future, result: Any, error: BaseException | None) -> None:
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+class SQLiteCommentStore(CommentStore):
+    """Durable comment store shared safely between worker processes."""
+
+    def __init__(
+            self,
+            path: str | Path,
+            batch_max: int = 256,
+            readers: int = 4,
+            events_keep: int = 10_000,
+    ):
+        """
+        Open (and if needed create) the database.
+
+        Args:
+            path: Database file; parent directories are created.
+            batch_max: Most writes committed in one transaction.
+            readers: Reader threads (each with its own connection).
+            events_keep: Newest change events kept for other processes.
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_max = batch_max
+        self.events_keep = events_keep
+        # Tags this store's events, so its own changes can be told apart
+        self.origin = uuid.uuid4().hex
+        self.batches = 0
+        self.writes = 0
+
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+        self._local = threading.local()
+        self._reader_conns: list[sqlite3.Connection] = []
+        self._readers = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="comment-reader")
+        self._queue: queue.SimpleQueue[_Write | None] = queue.SimpleQueue()
+        self._writer = threading.Thread(target=self._write_loop, name="comment-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # WAL + NORMAL: durable across process crashes, fsync only at checkpoints
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    # Reads
+
+    async def _read(self, query: Callable[[sqlite3.Connection], Any]) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._readers, self._run_read, query)
+
+    def _run_read(self, query: Callable[[sqlite3.Connection], Any]) -> Any:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+            self._reader_conns.append(conn)
+        return query(conn)
+
+    async def get(self, comment_id: str) -> Comment | None:
+        def query(conn: sqlite3.Connection) -> Comment | None:
+            row = conn.execute(
+                f"SELECT {_COLUMNS} FROM comments WHERE id = ?",
+                (comment_id,),
+            ).fetchone()
+            return _row_to_comment(row) if row else None
+
+        return await self._read(query)
+
+    async def page(
+            self,
+            feed_id: str,
+            limit: int,
+            before: Cursor | None = None,
+    ) -> tuple[list[Comment], bool]:
+        def query(conn: sqlite3.Connection) -> list[tuple]:
+            if before is None:
+                return conn.execute(
+                    f"SELECT {_COLUMNS} FROM comments WHERE feed_id = ? "
+                    "ORDER BY created_at DESC, id DESC LIMIT ?",
+                    (feed_id, limit + 1),
+                ).fetchall()
+            created_at, comment_id = before
+            return conn.execute(
+                f"SELECT {_COLUMNS} FROM comments "
+                "WHERE feed_id = ? AND (created_at, id) < (?, ?) "
+                "ORDER BY created_at DESC, id DESC LIMIT ?",
+                (feed_id, _timestamp(created_at), comment_id, limit + 1),
+            ).fetchall()
+
+        rows = await self._read(query)
+        return [_row_to_comment(row) for row in rows[:limit]], len(rows) > limit
+
+    async def count(self, feed_id: str) -> int:
+        def query(conn: sqlite3.Connection) -> int:
+            return conn.execute(
+                "SELECT COUNT(*) FROM comments WHERE feed_id = ?",
+                (feed_id,),
+            ).fetchone()[0]
+
+        return await self._read(query)
+
+    # Change events
+
+    async def last_event_seq(self) -> int:
+        """Sequence number of the newest logged change (0 if none)."""
+
+        def query(conn: sqlite3.Connection) -> int:
+            return conn.execute("SELECT COALESCE(MAX(seq), 0) FROM comment_events").fetchone()[0]
+
+        return await self._read(query)
+
+    async def events_since(self, seq: int, limit: int = 500) -> list[CommentEvent]:
+        """Logged changes after `seq`, oldest first, from every process."""
+
+        def query(conn: sqlite3.Connection) -> list[tuple]:
+            return conn.execute(
+                "SELECT seq, origin, kind, comment FROM comment_events "
+                "WHERE seq > ? ORDER BY seq LIMIT ?",
+                (seq, limit),
+            ).fetchall()
+
+        rows = await self._read(query)
+        return [
+            (event_seq, origin, kind, Comment.model_validate_json(comment))
+            for event_seq, origin, kind, comment in rows
+        ]
+
+    # Writes
+
+    async def _write(self, operation: Callable[..., Any], *args: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put((operation, args, loop, future))
+        return await future
+
+    async def add(self, comment: Comment) -> Comment:
+        return await self._write(_insert, self.origin, comment)
+
+    async def delete(self, comment_id: str) -> Comment | None:
+        return await self._write(_delete, self.origin, comment_id)
+
+    def _write_loop(self) -> None:
+        conn = self._connect()
+        try:
+            while True:
+                first = self._queue.get()
+                if first is None:
+                    return
+                batch = [first]
+                stop = False
+                # Group commit: take whatever queued up during the last commit
+                while len(batch) < self.batch_max:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        stop = True
+                        break
+                    batch.append(item)
+
+                try:
+                    self._commit(conn, batch)
+                except Exception as e:
+                    # The writer must outlive any batch: if it died, every
+                    # pending and future write would wait forever
+                    logger.exception(f"Comment writer failed on a batch of {len(batch)}")
+                    self._settle(batch, [(None, e)] * len(batch))
+                if stop:
+                    return
+        finally:
+            conn.close()
+
+    def _commit(self, conn: sqlite3.Connection, batch: list[_Write]) -> None:
+        outcomes: list[tuple[Any, BaseException | None]] = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for operation, args, _, _ in batch:
+                conn.execute("SAVEPOINT write")
+                try:
+                    outcomes.append((operation(conn, *args), None))
+                except Exception as e:
+                    conn.execute("ROLLBACK TO write")
+                    outcomes.append((None, e))
+                conn.execute("RELEASE write")
+            if self.batches % _TRIM_EVERY == 0:
+                conn.execute(
+                    "DELETE FROM comment_events WHERE seq <= "
+                    "(SELECT MAX(seq) FROM comment_events) - ?",
+                    (self.events_keep,),
+                )
+            conn.execute("COMMIT")
+        except Exception as e:
+            logger.error(f"Comment batch of {len(batch)} failed: {e}")
+            try:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+            except sqlite3.Error as rollback_error:
+                logger.error(f"Comment batch rollback failed: {rollback_error}")
+            outcomes = [(None, e)] * len(batch)
+
+        self.batches += 1
+        self.writes += len(batch)
+        self._settle(batch, outcomes)
+
+    @staticmethod
+    def _settle(batch: list[_Write], outcomes: list[tuple[Any, BaseException | None]]) -> None:
+        """Hand each write's outcome to the event loop that awaits it."""
+        for (_, _, loop, future), (result, error) in zip(batch, outcomes):
+            try:
+                loop.call_soon_threadsafe(_resolve, future, result, error)
+            except RuntimeError:
+                # That loop is closed: nobody is waiting any more
+                pass
+
+    async def aclose(self) -> None:
+        """Flush queued writes, then stop the writer and reader threads and close their connections."""
+        self._queue.put(None)
+        await asyncio.to_thread(self._writer.join)
+        self._readers.shutdown(wait=True)
+        for conn in self._reader_conns:
+            conn.close()
+        self._reader_conns.clear()
@@ -0,0 +1,105 @@
+"""
+Pluggable persistence for comments.
+
+`CommentStore` is the async interface the comments API talks to. The
+in-memory backend wraps `CommentRepository`; the SQLite backend (see
+`comment_sqlite`) survives restarts and can be shared by several worker
+processes. `create_comment_store` picks one from COMMENT_STORE.
+"""
+
+import logging
+import os
+from abc import ABC, abstractmethod
+
+from app.schemas.comment import Comment
+from app.services.comment_repository import CommentRepository, Cursor
+
+logger = logging.getLogger(__name__)
+
+
+class CommentStore(ABC):
+    """Async comment storage backend."""
+
+    @abstractmethod
+    async def add(self, comment: Comment) -> Comment:
+        """Persist a new comment."""
+
+    @abstractmethod
+    async def get(self, comment_id: str) -> Comment | None:
+        """Look up a comment by id."""
+
+    @abstractmethod
+    async def page(
+            self,
+            feed_id: str,
+            limit: int,
+            before: Cursor | None = None,
+    ) -> tuple[list[Comment], bool]:
+        """
+        One page of a feed item's comments, newest first.
+
+        Returns:
+            (comments, whether older comments remain).
+        """
+
+    @abstractmethod
+    async def delete(self, comment_id: str) -> Comment | None:
+        """Remove a comment; returns it, or None if no comment has that id."""
+
+    @abstractmethod
+    async def count(self, feed_id: str) -> int:
+        """Number of comments on a feed item."""
+
+    async def aclose(self) -> None:
+        """Release resources; the store must not be used afterwards."""
+
+
+class MemoryCommentStore(CommentStore):
+    """Process-local store; comments are lost on restart."""
+
+    def __init__(self, repository: CommentRepository | None = None):
+        self.repository = repository or CommentRepository()
+
+    async def add(self, comment: Comment) -> Comment:
+        return self.repository.add(comment)
+
+    async def get(self, comment_id: str) -> Comment | None:
+        return self.repository.get(comment_id)
+
+    async def page(
+            self,
+            feed_id: str,
+            limit: int,
+            before: Cursor | None = None,
+    ) -> tuple[list[Comment], bool]:
+        return self.repository.page(feed_id, limit, before=before)
+
+    async def delete(self, comment_id: str) -> Comment | None:
+        return self.repository.delete(comment_id)
+
+    async def count(self, feed_id: str) -> int:
+        return self.repository.count(feed_id)
+
+
+def create_comment_store() -> CommentStore:
+    """
+    Build the backend selected by COMMENT_STORE ("memory" or "sqlite").
+
+    The SQLite backend reads COMMENT_DB_PATH, COMMENT_BATCH_MAX,
+    COMMENT_DB_READERS and COMMENT_EVENTS_KEEP.
+    """
+    backend = os.getenv("COMMENT_STORE", "memory").lower()
+    if backend == "memory":
+        if int(os.getenv("BACKEND_WORKERS", "1")) > 1:
+            logger.warning("COMMENT_STORE=memory with several workers: each worker only sees its own comments")
+        return MemoryCommentStore()
+    if backend == "sqlite":
+        from app.services.comment_sqlite import SQLiteCommentStore
+
+        return SQLiteCommentStore(
+            os.getenv("COMMENT_DB_PATH", "data/comments.db"),
+            batch_max=int(os.getenv("COMMENT_BATCH_MAX", "256")),
+            readers=int(os.getenv("COMMENT_DB_READERS", "4")),
+            events_keep=int(os.getenv("COMMENT_EVENTS_KEEP", "10000")),
+        )
+    raise ValueError(f"Unknown COMMENT_STORE '{backend}'")
@@ -0,0 +1,215 @@
+"""
+Ranked feed with keyset pagination.
+
+Every item gets a score from its recency, its mood and how much it is
+being commented on:
+
+    score = published_at / RECENCY_SECONDS
+            + MOOD_WEIGHTS[mood]
+            + ACTIVITY_WEIGHT * log1p(comment count)
+
+Recency enters as a timestamp rather than an age, so the ranking doesn't
+drift as time passes and nothing has to be rescored on a timer. Publishing
+an item 6 hours later is worth one point, as is going from 0 to about 2
+comments. A score only changes when its item's comment count changes.
+
+Items are kept in a sorted index of (-score, id) keys. Adding, removing or
+rescoring an item costs a binary search plus a list insert. A page is a
+binary search for the cursor plus a slice, so it costs O(page size)
+however many items there are.
+
+Every change bumps `version` and records the rank keys it touched, so a
+cached page only has to be rebuilt when one of those keys falls inside
+the key range it was built from (see `changed_since`).
+"""
+
+import logging
+import math
+import os
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+from typing import Iterable
+
+from app.schemas.feed import FeedItem
+from app.services.comment_store import CommentStore
+
+logger = logging.getLogger(__name__)
+
+# Rank position: (-score, item id); ascending order is best first
+RankKey = tuple[float, str]
+
+MOOD_WEIGHTS: dict[str, float] = {
+    "excited": 0.6,
+    "surprised": 0.5,
+    "happy": 0.4,
+    "curious": 0.3,
+}
+ACTIVITY_WEIGHT = 1.0
+# Recent versions whose touched keys are remembered for `changed_since`
+CHANGES_KEPT = 1024
+
+
+class _Ranked:
+    """An item, its encoded JSON and its current rank key."""
+
+    __slots__ = ("item", "body", "key")
+
+    def __init__(self, item: FeedItem, key: RankKey):
+        self.item = item
+        # Encoded once, so pages are assembled from ready bytes
+        self.body = item.model_dump_json().encode("utf-8")
+        self.key = key
+
+
+class FeedRanker:
+    """Feed items in rank order, rescored incrementally on comment activity."""
+
+    def __init__(
+            self,
+            recency_seconds: float = 6 * 3600,
+            mood_weights: dict[str, float] | None = None,
+            activity_weight: float = ACTIVITY_WEIGHT,
+    ):
+        """
+        Initialize an empty feed.
+
+        Args:
+            recency_seconds: How much newer an item must be to gain one
+                point of score.
+            mood_weights: Score bonus per mood; unknown moods get 0.
+            activity_weight: Weight of log1p(comment count).
+        """
+        self.recency_seconds = recency_seconds
+        self.mood_weights = MOOD_WEIGHTS if mood_weights is None else mood_weights
+        self.activity_weight = activity_weight
+        self._items: dict[str, _Ranked] = {}
+        self._keys: list[RankKey] = []
+        # Comment counts, also for items not (yet) in the feed
+        self._activity: dict[str, int] = {}
+        # Bumped on every change to the ranking; lets callers cache pages
+        self.version = 0
+        # (version, rank keys it added or removed), oldest first
+        self._changes: deque[tuple[int, tuple[RankKey, ...]]] = deque(maxlen=CHANGES_KEPT)
+
+    @classmethod
+    def from_env(cls) -> "FeedRanker":
+        """Build a ranker from FEED_RECENCY_HOURS."""
+        return cls(recency_seconds=float(os.getenv("FEED_RECENCY_HOURS", "6")) * 3600)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def score(self, item: FeedItem) -> float:
+        """Current score of an item."""
+        return (
+            item.published_at.timestamp() / self.recency_seconds
+            + self.mood_weights.get(item.mood, 0.0)
+            + self.activity_weight * math.log1p(self._activity.get(item.id, 0))
+        )
+
+    # Catalog
+
+    def load(self, items: Iterable[FeedItem]) -> None:
+        """Replace all items (e.g. after reloading content)."""
+        ranked = [_Ranked(item, (-self.score(item), item.id)) for item in items]
+        self._items = {entry.item.id: entry for entry in ranked}
+        self._keys = sorted(entry.key for entry in self._items.values())
+        self.version += 1
+        # Everything changed: no earlier version can be patched up
+        self._changes.clear()
+
+    def upsert(self, item: FeedItem) -> None:
+        """Add an item, or replace the one with the same id."""
+        old = self._unlink(item.id)
+        entry = self._items[item.id] = _Ranked(item, (-self.score(item), item.id))
+        insort(self._keys, entry.key)
+        self._changed(entry.key, *((old.key,) if old else ()))
+
+    def remove(self, item_id: str) -> FeedItem | None:
+        """Remove an item; returns it, or None if it isn't in the feed."""
+        entry = self._unlink(item_id)
+        if entry is None:
+            return None
+        del self._items[item_id]
+        self._changed(entry.key)
+        return entry.item
+
+    def changed_since(self, version: int) -> list[RankKey] | None:
+        """
+        Rank keys added or removed after `version`.
+
+        A page built at `version` is still current unless one of these keys
+        lies within the keys it covered.
+
+        Returns:
+            The keys, or None when that is no longer known (the version
+            predates a `load` or the remembered changes).
+        """
+        if version == self.version:
+            return []
+        if not self._changes or self._changes[0][0] > version + 1:
+            return None
+        return [key for changed, keys in self._changes if changed > version for key in keys]
+
+    def _changed(self, *keys: RankKey) -> None:
+        self.version += 1
+        self._changes.append((self.version, keys))
+
+    def get(self, item_id: str) -> FeedItem | None:
+        entry = self._items.get(item_id)
+        return entry.item if entry else None
+
+    def _unlink(self, item_id: str) -> _Ranked | None:
+        """Take an item's key out of the index (the item stays in `_items`)."""
+        entry = self._items.get(item_id)
+        if entry is not None:
+            del self._keys[bisect_left(self._keys, entry.key)]
+        return entry
+
+    # Comment activity
+
+    def set_activity(self, item_id: str, comments: int) -> None:
+        """Set an item's comment count and move it to its new rank."""
+        if self._activity.get(item_id, 0) == comments:
+            return
+        self._activity[item_id] = comments
+        entry = self._unlink(item_id)
+        if entry is None:
+            return
+        old_key, entry.key = entry.key, (-self.score(entry.item), item_id)
+        insort(self._keys, entry.key)
+        self._changed(old_key, entry.key)
+
+    def comment_added(self, item_id: str) -> None:
+        self.set_activity(item_id, self._activity.get(item_id, 0) + 1)
+
+    def comment_removed(self, item_id: str) -> None:
+        self.set_activity(item_id, max(self._activity.get(item_id, 0) - 1, 0))
+
+    async def sync_activity(self, store: CommentStore) -> None:
+        """Load every item's comment count from the store (e.g. on startup)."""
+        for item_id in list(self._items):
+            self.set_activity(item_id, await store.count(item_id))
+        logger.info(f"Feed ranked: {len(self._items)} items")
+
+    # Reads
+
+    def page(self, limit: int, after: RankKey | None = None) -> tuple[list[_Ranked], bool]:
+        """
+        One page of items, best first.
+
+        Args:
+            limit: Maximum items to return.
+            after: Rank key (`.key`) of the last item already seen;
+                None starts from the top.
+
+        Returns:
+            (entries with `.item` and pre-encoded `.body`, whether more remain).
+        """
+        start = 0 if after is None else bisect_right(self._keys, after)
+        keys = self._keys[start:start + limit + 1]
+        return [self._items[item_id] for _, item_id in keys[:limit]], len(keys) > limit
+
+
+# Shared feed for the feed API
+feed_ranker = FeedRanker.from_env()
@@ -0,0 +1,292 @@
+"""
+Declarative gesture rules and their compiled evaluation plan.
+
+A rule table lists named features (comparisons between two landmark
+coordinates), optional metrics for graded confidence, and gesture rules
+that combine features by name. `compile_rule_table` turns the table into a
+`RulePlan` once: unused and duplicate features are dropped, every landmark
+coordinate is read once per frame, every feature is evaluated once per
+frame no matter how many rules use it, and rules are checked in priority
+order. The same plan serves single frames and (N, 33, 4) batches.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Literal, Sequence
+
+import numpy as np
+
+Axis = Literal["x", "y"]
+# A landmark coordinate: (landmark index, axis)
+Point = tuple[int, Axis]
+
+_AXIS_COLUMNS = {"x": 0, "y": 1}
+_LT, _GT, _ABS_LT = range(3)
+_OPS = {"lt": _LT, "gt": _GT, "abs_lt": _ABS_LT}
+
+
+@dataclass(frozen=True)
+class Feature:
+    """
+    Named boolean comparison between two landmark coordinates.
+
+    The offset is `thresholds * detector threshold + constant`, and `op` is:
+    - "lt": a < b + offset
+    - "gt": a > b + offset
+    - "abs_lt": |a - b| < offset
+    """
+    name: str
+    a: Point
+    op: Literal["lt", "gt", "abs_lt"]
+    b: Point
+    thresholds: float = 0.0
+    constant: float = 0.0
+
+
+@dataclass(frozen=True)
+class Metric:
+    """
+    Named number used to grade confidence.
+
+    kind "count": how many of `features` hold.
+    kind "span_ratio": |numerator| / |denominator| where each is the
+    difference of two coordinates; 0 when the denominator is 0.
+    """
+    name: str
+    kind: Literal["count", "span_ratio"]
+    features: tuple[str, ...] = ()
+    numerator: tuple[Point, Point] | None = None
+    denominator: tuple[Point, Point] | None = None
+
+
+@dataclass(frozen=True)
+class TieredConfidence:
+    """Confidence picked by the first tier whose bound the metric exceeds."""
+    metric: str
+    tiers: tuple[tuple[float, float], ...]
+    default: float
+
+
+@dataclass(frozen=True)
+class GestureRule:
+    """Gesture that matches when all `when` features hold and no `unless` feature does."""
+    gesture: Any
+    priority: int
+    when: tuple[str, ...] = ()
+    unless: tuple[str, ...] = ()
+    confidence: float | TieredConfidence = 0.5
+
+
+@dataclass(frozen=True)
+class GestureRuleTable:
+    """Complete rule configuration for a detector."""
+    features: tuple[Feature, ...]
+    rules: tuple[GestureRule, ...]
+    fallback: Any
+    fallback_confidence: float
+    metrics: tuple[Metric, ...] = field(default_factory=tuple)
+
+
+@dataclass(frozen=True)
+class _CompiledRule:
+    when: tuple[int, ...]
+    unless: tuple[int, ...]
+    confidence: float | tuple[int, tuple[tuple[float, float], ...], float]
+
+
+class RulePlan:
+    """
+    Evaluation plan compiled from a `GestureRuleTable`.
+
+    Feature, metric and point references are resolved to list positions at
+    compile time. Single frames run through closures bound to those
+    positions; batches run the same comparisons as numpy array operations.
+    """
+
+    def __init__(self, table: GestureRuleTable, threshold: float):
+        features = {f.name: f for f in table.features}
+        metrics = {m.name: m for m in table.metrics}
+        rules = sorted(table.rules, key=lambda r: r.priority)
+
+        points: dict[Point, int] = {}
+        compiled_features: dict[tuple, int] = {}
+        feature_slots: dict[str, int] = {}
+
+        def point_slot(point: Point) -> int:
+            return points.setdefault(point, len(points))
+
+        def feature_slot(name: str) -> int:
+            if name not in feature_slots:
+                if name not in features:
+                    raise ValueError(f"Unknown gesture feature '{name}'")
+                f = features[name]
+                offset = f.thresholds * threshold + f.constant
+                key = (point_slot(f.a), _OPS[f.op], point_slot(f.b), offset)
+                # Identical comparisons under different names share one slot
+                feature_slots[name] = compiled_features.setdefault(key, len(compiled_features))
+            return feature_slots[name]
+
+        metric_slots: dict[str, int] = {}
+        compiled_metrics: list[tuple] = []
+
+        def metric_slot(name: str) -> int:
+            if name not in metric_slots:
+                if name not in metrics:
+                    raise ValueError(f"Unknown gesture metric '{name}'")
+                m = metrics[name]
+                if m.kind == "count":
+                    spec = ("count", tuple(feature_slot(n) for n in m.features))
+                else:
+                    (na, nb), (da, db) = m.numerator, m.denominator
+                    spec = (
+                        "span_ratio",
+                        (point_slot(na), point_slot(nb), point_slot(da), point_slot(db)),
+                    )
+                metric_slots[name] = len(compiled_metrics)
+                compiled_metrics.append(spec)
+            return metric_slots[name]
+
+        self._rules: list[_CompiledRule] = []
+        for rule in rules:
+            confidence = rule.confidence
+            if isinstance(confidence, TieredConfidence):
+                confidence = (metric_slot(confidence.metric), confidence.tiers, confidence.default)
+            self._rules.append(_CompiledRule(
+                when=tuple(feature_slot(n) for n in rule.when),
+                unless=tuple(feature_slot(n) for n in rule.unless),
+                confidence=confidence,
+            ))
+
+        self.outcomes: list[Any] = [rule.gesture for rule in rules] + [table.fallback]
+        self.fallback_confidence = table.fallback_confidence
+        self._points: list[tuple[int, str]] = list(points)
+        self._columns: list[tuple[int, int]] = [(i, _AXIS_COLUMNS[axis]) for i, axis in points]
+        self._features: list[tuple] = list(compiled_features)
+        self._metrics = compiled_metrics
+        self._evaluate = self._compile_scalar()
+
+    @property
+    def feature_count(self) -> int:
+        """Distinct comparisons evaluated per frame."""
+        return len(self._features)
+
+    def evaluate(self, landmarks: Sequence[Any]) -> tuple[int, float]:
+        """
+        Evaluate one frame of landmark objects with `.x` / `.y` attributes.
+
+        Returns:
+            (index into `outcomes`, confidence).
+        """
+        return self._evaluate(landmarks)
+
+    def evaluate_batch(self, frames: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Evaluate an (N, 33, 4) array of frames with whole-array operations.
+
+        Returns:
+            (indices into `outcomes`, confidences), one entry per frame.
+        """
+        # Compare in float64 like the scalar path, whatever the input dtype
+        values = [frames[:, i, c].astype(np.float64, copy=False) for i, c in self._columns]
+
+        states = []
+        for a, op, b, offset in self._features:
+            if op == _LT:
+                states.append(values[a] < values[b] + offset)
+            elif op == _GT:
+                states.append(values[a] > values[b] + offset)
+            else:
+                states.append(np.abs(values[a] - values[b]) < offset)
+
+        matches = []
+        confidences = []
+        for rule in self._rules:
+            mask = np.ones(len(frames), dtype=np.bool_)
+            for i in rule.when:
+                mask &= states[i]
+            for i in rule.unless:
+                mask &= ~states[i]
+            matches.append(mask)
+            confidences.append(self._batch_confidence(rule.confidence, values, states))
+
+        codes = np.select(matches, list(range(len(self._rules))), default=len(self._rules))
+        confidence = np.select(matches, confidences, default=self.fallback_confidence)
+        return codes, confidence
+
+    def _compile_scalar(self) -> Callable[[Sequence[Any]], tuple[int, float]]:
+        """
+        Build the single-frame evaluator from closures over the plan's tables.
+
+        Every point is read once per frame and every feature is compared
+        once; rules then only index into the feature states.
+        """
+        points = [(index, axis) for index, axis in self._points]
+        features = self._features
+        rules = [
+            (code, rule.when, rule.unless, self._scalar_confidence(rule.confidence))
+            for code, rule in enumerate(self._rules)
+        ]
+        fallback = (len(self._rules), self.fallback_confidence)
+
+        def evaluate(landmarks: Sequence[Any]) -> tuple[int, float]:
+            values = [getattr(landmarks[index], axis) for index, axis in points]
+            states = [
+                values[a] < values[b] + offset if op == _LT
+                else values[a] > values[b] + offset if op == _GT
+                else abs(values[a] - values[b]) < offset
+                for a, op, b, offset in features
+            ]
+            state = states.__getitem__
+            for code, when, unless, confidence in rules:
+                if all(map(state, when)) and not any(map(state, unless)):
+                    return code, confidence(values, states)
+            return fallback
+
+        return evaluate
+
+    def _scalar_confidence(self, spec) -> Callable[[list[float], list[bool]], float]:
+        if not isinstance(spec, tuple):
+            return lambda values, states: spec
+        slot, tiers, default = spec
+        kind, refs = self._metrics[slot]
+        if kind == "count":
+            def metric(values, states):
+                return sum(states[i] for i in refs)
+        else:
+            na, nb, da, db = refs
+
+            def metric(values, states):
+                d = abs(values[da] - values[db])
+                return abs(values[na] - values[nb]) / d if d > 0 else 0
+
+        def confidence(values, states):
+            m = metric(values, states)
+            for bound, tier in tiers:
+                if m > bound:
+                    return tier
+            return default
+
+        return confidence
+
+    def _batch_confidence(self, spec, values: list[np.ndarray], states: list[np.ndarray]):
+        if not isinstance(spec, tuple):
+            return spec
+        slot, tiers, default = spec
+        kind, refs = self._metrics[slot]
+        if kind == "count":
+            metric = np.sum([states[i] for i in refs], axis=0)
+        else:
+            na, nb, da, db = refs
+            denominator = np.abs(values[da] - values[db])
+            numerator = np.abs(values[na] - values[nb])
+            metric = np.divide(
+                numerator,
+                denominator,
+                out=np.zeros_like(numerator),
+                where=denominator > 0,
+            )
+        return np.select([metric > bound for bound, _ in tiers], [c for _, c in tiers], default=default)
+
+
+def compile_rule_table(table: GestureRuleTable, threshold: float) -> RulePlan:
+    """Compile a rule table for the given position threshold."""
+    return RulePlan(table, threshold)
@@ -0,0 +1,306 @@
+"""
+Temporal gesture detection over a stream of pose frames.
+
+The rule-based `PoseGestureDetector` only ever sees one frame, so it cannot
+recognise motion (waving) and its output flickers at rule boundaries. This
+module keeps a short per-session history of wrist and shoulder positions
+and layers oscillation detection and debouncing on top of the static rules.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Callable
+
+import numpy as np
+
+from app.services.pose_detection import (
+    DetailLevel,
+    Gesture,
+    GestureResult,
+    Landmark,
+    LandmarkIndex,
+    PoseGestureDetector,
+    detector as static_detector,
+)
+
+# Tracked points, in ring buffer column order
+_TRACKED = (
+    LandmarkIndex.LEFT_WRIST,
+    LandmarkIndex.RIGHT_WRIST,
+    LandmarkIndex.LEFT_SHOULDER,
+    LandmarkIndex.RIGHT_SHOULDER,
+)
+_LW, _RW, _LS, _RS = range(len(_TRACKED))
+
+# Static gestures a raised, oscillating hand would otherwise be reported as
+_WAVE_OVERRIDES = frozenset({
+    Gesture.HANDS_UP,
+    Gesture.LEFT_HAND_UP,
+    Gesture.RIGHT_HAND_UP,
+    Gesture.NEUTRAL,
+})
+
+
+class TemporalGestureDetector:
+    """
+    Stateful gesture detector for a single client session.
+
+    Keeps the last `history` frames of wrist and shoulder positions in a
+    fixed-size float32 ring buffer. The buffer is written twice (at i and
+    i + history) so the most recent window is always a contiguous view and
+    each update is O(1) with no allocation.
+    """
+
+    def __init__(
+            self,
+            detector: PoseGestureDetector = static_detector,
+            history: int = 24,
+            min_hold_frames: int = 3,
+            wave_min_reversals: int = 2,
+            wave_min_amplitude: float = 0.08,
+            wave_min_step: float = 0.01,
+    ):
+        """
+        Initialize a session detector.
+
+        Args:
+            detector: Static rule detector evaluated on every frame.
+            history: Number of frames kept for motion analysis (~0.8 s at 30 fps).
+            min_hold_frames: Consecutive frames a new gesture must persist
+                before it replaces the current one.
+            wave_min_reversals: Direction changes needed to start waving.
+                One fewer keeps an ongoing wave alive (hysteresis).
+            wave_min_amplitude: Minimum peak-to-peak wrist travel, in
+                normalized x, for a wave.
+            wave_min_step: Per-frame x movement below this is treated as jitter.
+        """
+        self.detector = detector
+        self.history = history
+        self.min_hold_frames = min_hold_frames
+        self.wave_min_reversals = wave_min_reversals
+        self.wave_min_amplitude = wave_min_amplitude
+        self.wave_min_step = wave_min_step
+
+        self._positions = np.zeros((2 * history, len(_TRACKED), 2), dtype=np.float32)
+        self._raised = np.zeros((2 * history, 2), dtype=np.bool_)
+        self._next = 0
+        self._count = 0
+
+        self._current = GestureResult(gesture=Gesture.NEUTRAL, confidence=0.5, details={})
+        self._candidate: Gesture | None = None
+        self._candidate_frames = 0
+
+    def update(
+            self,
+            landmarks: list[Landmark],
+            detail: DetailLevel = DetailLevel.NONE,
+    ) -> GestureResult:
+        """
+        Feed one frame and return the debounced gesture for the session.
+
+        Args:
+            landmarks: List of 33 MediaPipe pose landmarks.
+            detail: Debugging data to include in the result.
+
+        Returns:
+            GestureResult for the stable gesture after this frame.
+        """
+        raw = self.detector.detect(landmarks, detail)
+        if len(landmarks) < 33:
+            return raw
+
+        self._push(landmarks)
+        raw = self._apply_temporal_rules(raw, landmarks, detail)
+
+        if raw.gesture == self._current.gesture:
+            self._candidate = None
+            self._candidate_frames = 0
+            self._current = raw
+            return raw
+
+        if raw.gesture == self._candidate:
+            self._candidate_frames += 1
+        else:
+            self._candidate = raw.gesture
+            self._candidate_frames = 1
+
+        if self._candidate_frames >= self.min_hold_frames:
+            self._candidate = None
+            self._candidate_frames = 0
+            self._current = raw
+            return raw
+
+        # Still debouncing: keep reporting the previous gesture
+        return GestureResult(
+            gesture=self._current.gesture,
+            confidence=self._current.confidence,
+            details=raw.details,
+        )
+
+    def _push(self, landmarks: list[Landmark]) -> None:
+        """Append tracked points to the ring buffer."""
+        threshold = self.detector.threshold
+        row = [(landmarks[idx].x, landmarks[idx].y) for idx in _TRACKED]
+        raised = (
+            row[_LW][1] < row[_LS][1] - threshold,
+            row[_RW][1] < row[_RS][1] - threshold,
+        )
+
+        i = self._next
+        self._positions[i] = row
+        self._positions[i + self.history] = row
+        self._raised[i] = raised
+        self._raised[i + self.history] = raised
+
+        self._next = (i + 1) % self.history
+        self._count = min(self._count + 1, self.history)
+
+    def _window(self) -> tuple[np.ndarray, np.ndarray]:
+        """Contiguous, oldest-first views over the buffered frames."""
+        end = self._next + self.history
+        start = end - self._count
+        return self._positions[start:end], self._raised[start:end]
+
+    def _apply_temporal_rules(
+            self,
+            raw: GestureResult,
+            landmarks: list[Landmark],
+            detail: DetailLevel,
+    ) -> GestureResult:
+        """Upgrade the static result with motion and multi-landmark rules."""
+        if raw.gesture in _WAVE_OVERRIDES:
+            reversals = self._wave_reversals()
+            needed = self.wave_min_reversals
+            if self._current.gesture == Gesture.WAVING:
+                needed -= 1
+            if reversals >= needed:
+                confidence = min(0.95, 0.7 + 0.05 * (reversals - self.wave_min_reversals))
+                details = raw.details
+                if detail != DetailLevel.NONE:
+                    details = {**details, "reversals": reversals}
+                return GestureResult(
+                    gesture=Gesture.WAVING,
+                    confidence=confidence,
+                    details=details,
+                )
+
+        if raw.gesture == Gesture.NEUTRAL and self._is_arms_crossed(landmarks):
+            return GestureResult(
+                gesture=Gesture.ARMS_CROSSED,
+                confidence=0.75,
+                details=raw.details,
+            )
+
+        return raw
+
+    def _wave_reversals(self) -> int:
+        """Most side-to-side direction changes of a raised wrist in the window."""
+        if self._count < 3:
+            return 0
+
+        positions, raised = self._window()
+        best = 0
+        for wrist, side in ((_LW, 0), (_RW, 1)):
+            # The hand must be up now and for most of the window
+            if not raised[-1, side] or raised[:, side].mean() < 0.6:
+                continue
+
+            xs = positions[:, wrist, 0]
+            if float(xs.max() - xs.min()) < self.wave_min_amplitude:
+                continue
+
+            steps = np.diff(xs)
+            directions = np.sign(steps[np.abs(steps) >= self.wave_min_step])
+            if directions.size < 2:
+                continue
+            best = max(best, int(np.count_nonzero(directions[1:] != directions[:-1])))
+
+        return best
+
+    def _is_arms_crossed(self, landmarks: list[Landmark]) -> bool:
+        """Wrists swapped sides in front of the chest, between shoulders and hips."""
+        left_wrist = landmarks[LandmarkIndex.LEFT_WRIST]
+        right_wrist = landmarks[LandmarkIndex.RIGHT_WRIST]
+        left_shoulder = landmarks[LandmarkIndex.LEFT_SHOULDER]
+        right_shoulder = landmarks[LandmarkIndex.RIGHT_SHOULDER]
+        left_hip = landmarks[LandmarkIndex.LEFT_HIP]
+        right_hip = landmarks[LandmarkIndex.RIGHT_HIP]
+
+        shoulder_y = max(left_shoulder.y, right_shoulder.y)
+        hip_y = min(left_hip.y, right_hip.y)
+
+        crossed = left_wrist.x > right_wrist.x + self.detector.threshold / 2
+        at_chest = (
+            shoulder_y < left_wrist.y < hip_y and
+            shoulder_y < right_wrist.y < hip_y
+        )
+        return crossed and at_chest
+
+
+class GestureSessionStore:
+    """
+    Temporal detectors keyed by session id, with idle eviction.
+
+    Sessions are kept in least-recently-used order, so expired entries are
+    always at the front and eviction costs O(1) per removed session.
+    """
+
+    def __init__(
+            self,
+            idle_timeout: float = 30.0,
+            max_sessions: int = 10_000,
+            factory: Callable[[], TemporalGestureDetector] = TemporalGestureDetector,
+            clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the store.
+
+        Args:
+            idle_timeout: Seconds without frames before a session is dropped.
+            max_sessions: Hard cap; the least recently used session is
+                dropped when exceeded.
+            factory: Creates the detector for a new session.
+            clock: Monotonic time source.
+        """
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self._factory = factory
+        self._clock = clock
+        self._sessions: OrderedDict[str, tuple[float, TemporalGestureDetector]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, session_id: str) -> TemporalGestureDetector:
+        """Return the session's detector, creating it if needed."""
+        now = self._clock()
+        self.evict_idle(now)
+
+        entry = self._sessions.pop(session_id, None)
+        session = entry[1] if entry else self._factory()
+        self._sessions[session_id] = (now, session)
+
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+        return session
+
+    def evict_idle(self, now: float | None = None) -> int:
+        """Drop sessions idle for longer than the timeout; returns how many."""
+        now = self._clock() if now is None else now
+        evicted = 0
+        while self._sessions:
+            last_seen, _ = next(iter(self._sessions.values()))
+            if now - last_seen <= self.idle_timeout:
+                break
+            self._sessions.popitem(last=False)
+            evicted += 1
+        return evicted
+
+    def discard(self, session_id: str) -> None:
+        """Forget a session explicitly."""
+        self._sessions.pop(session_id, None)
+
+
+# Shared store for HTTP callers that pass a session id
+sessions = GestureSessionStore()
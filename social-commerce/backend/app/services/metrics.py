@@ -0,0 +1,321 @@
+"""
+In-process metrics with Prometheus text exposition.
+
+Recording must stay cheap enough to leave on for every pose frame, so an
+observation is only appended to a buffer (no locks: everything runs on the
+event loop thread). Buffers are folded into fixed-bucket counts with numpy
+in batches of `FOLD_SIZE`, and before every scrape. A value lands in the
+first bucket whose upper bound is >= the value, as Prometheus' `le`
+buckets expect.
+
+Three kinds of data end up on /metrics:
+
+- per-route HTTP stats recorded by `app.api.metrics.MetricsMiddleware`;
+- histogram families recorded directly by services (e.g. upstream TTS
+  latency, pose frame processing time);
+- collectors: callables returning a stats dict (the same dicts the
+  JSON stats endpoints return), read only when /metrics is scraped; the
+  keys they name as counters are exported as counters, the rest as gauges.
+"""
+
+import math
+from array import array
+from typing import Callable, Iterable
+
+import numpy as np
+
+# Seconds; covers sub-millisecond pose detection up to slow TTS calls
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+# Bytes
+SIZE_BUCKETS = (
+    128, 512, 1024, 4096, 16384, 65536,
+    262144, 1048576, 4194304,
+)
+
+# Buffered observations are folded into bucket counts this many at a time
+FOLD_SIZE = 1024
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class Histogram:
+    """Fixed-bucket histogram: per-bucket counts plus sum and count."""
+
+    __slots__ = ("bounds", "counts", "sum", "pending")
+
+    def __init__(self, bounds: Iterable[float]):
+        self.bounds = np.asarray(tuple(bounds), dtype=np.float64)
+        # One extra slot for values above the last bound (+Inf)
+        self.counts = np.zeros(len(self.bounds) + 1, dtype=np.int64)
+        self.sum = 0.0
+        self.pending = array("d")
+
+    def observe(self, value: float) -> None:
+        pending = self.pending
+        pending.append(value)
+        if len(pending) >= FOLD_SIZE:
+            self.fold()
+
+    def fold(self) -> None:
+        """Move buffered observations into the bucket counts."""
+        if self.pending:
+            values, self.pending = self.pending, array("d")
+            self.add_many(np.frombuffer(values, dtype=np.float64))
+
+    def add_many(self, values: np.ndarray) -> None:
+        buckets = np.searchsorted(self.bounds, values, side="left")
+        self.counts += np.bincount(buckets, minlength=len(self.counts))
+        self.sum += float(values.sum())
+
+    @property
+    def count(self) -> int:
+        self.fold()
+        return int(self.counts.sum())
+
+
+class RouteStats:
+    """HTTP stats of one (handler, method) pair."""
+
+    __slots__ = (
+        "status_counts", "latency", "request_bytes", "response_bytes",
+        "_statuses", "_seconds", "_request_bytes", "_response_bytes",
+    )
+
+    def __init__(self) -> None:
+        # Requests by status code (index = status)
+        self.status_counts = np.zeros(600, dtype=np.int64)
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.request_bytes = Histogram(SIZE_BUCKETS)
+        self.response_bytes = Histogram(SIZE_BUCKETS)
+        self._reset_buffers()
+
+    def _reset_buffers(self) -> None:
+        # Requests recorded but not yet folded, one column per array
+        self._statuses = array("H")
+        self._seconds = array("d")
+        self._request_bytes = array("q")
+        self._response_bytes = array("q")
+
+    def record(self, status: int, seconds: float | None, request_bytes: int, response_bytes: int) -> None:
+        statuses = self._statuses
+        statuses.append(status)
+        self._seconds.append(math.nan if seconds is None else seconds)
+        self._request_bytes.append(request_bytes)
+        self._response_bytes.append(response_bytes)
+        if len(statuses) >= FOLD_SIZE:
+            self.fold()
+
+    def fold(self) -> None:
+        """Move buffered requests into the counters and histograms."""
+        if not self._statuses:
+            return
+        statuses, seconds = self._statuses, self._seconds
+        request_bytes, response_bytes = self._request_bytes, self._response_bytes
+        self._reset_buffers()
+
+        self.status_counts += np.bincount(
+            np.frombuffer(statuses, dtype=np.uint16), minlength=len(self.status_counts)
+        )[:len(self.status_counts)]
+        latency = np.frombuffer(seconds, dtype=np.float64)
+        # NaN marks requests without a meaningful duration (event streams)
+        self.latency.add_many(latency[~np.isnan(latency)])
+        self.request_bytes.add_many(np.frombuffer(request_bytes, dtype=np.int64))
+        self.response_bytes.add_many(np.frombuffer(response_bytes, dtype=np.int64))
+
+    def statuses(self) -> dict[int, int]:
+        """Request count per status code seen."""
+        self.fold()
+        return {int(status): int(self.status_counts[status]) for status in np.flatnonzero(self.status_counts)}
+
+
+class _Family:
+    """Histograms sharing a name, one per label set."""
+
+    __slots__ = ("help", "buckets", "series")
+
+    def __init__(self, help_text: str, buckets: tuple[float, ...]):
+        self.help = help_text
+        self.buckets = buckets
+        self.series: dict[Labels, Histogram] = {}
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: Labels, **extra: str) -> str:
+    pairs = [*labels, *extra.items()]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in pairs) + "}"
+
+
+def _number(value: float) -> str:
+    if isinstance(value, float):
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        if value.is_integer() and abs(value) < 1e15:
+            return str(int(value))
+        return repr(value)
+    return str(value)
+
+
+def _flatten(stats: dict, prefix: str = "") -> Iterable[tuple[str, object]]:
+    for key, value in stats.items():
+        name = f"{prefix}_{key}" if prefix else str(key)
+        if isinstance(value, dict):
+            yield from _flatten(value, name)
+        else:
+            yield name, value
+
+
+class MetricsRegistry:
+    """All metrics of this process."""
+
+    def __init__(self) -> None:
+        self.routes: dict[tuple[str, str], RouteStats] = {}
+        # Requests being handled, by v1 router ("feed", "pose", ...)
+        self.in_flight: dict[str, int] = {}
+        self._families: dict[str, _Family] = {}
+        self._collectors: dict[str, tuple[str, Callable[[], dict], frozenset[str]]] = {}
+
+    # Recording
+
+    def record_request(
+            self,
+            handler: str,
+            method: str,
+            status: int,
+            seconds: float | None,
+            request_bytes: int,
+            response_bytes: int,
+    ) -> None:
+        """Record one finished HTTP request; `seconds=None` leaves it out of the latency histogram."""
+        stats = self.routes.get((handler, method))
+        if stats is None:
+            stats = self.routes[(handler, method)] = RouteStats()
+        stats.record(status, seconds, request_bytes, response_bytes)
+
+    def histogram(
+            self,
+            name: str,
+            help_text: str,
+            buckets: Iterable[float] = LATENCY_BUCKETS,
+            **labels: str,
+    ) -> Histogram:
+        """
+        Get (or create) the histogram of a family for one label set.
+
+        Look it up once and keep the returned object; observing it is the
+        cheap part.
+        """
+        family = self._families.get(name)
+        if family is None:
+            family = self._families[name] = _Family(help_text, tuple(buckets))
+        key = tuple(sorted(labels.items()))
+        histogram = family.series.get(key)
+        if histogram is None:
+            histogram = family.series[key] = Histogram(family.buckets)
+        return histogram
+
+    def register_collector(
+            self,
+            prefix: str,
+            help_text: str,
+            collect: Callable[[], dict],
+            counters: Iterable[str] = (),
+    ) -> None:
+        """
+        Export a stats dict at scrape time.
+
+        Numbers become `<prefix>_<key>` gauges (nested dicts join keys
+        with "_"); strings become `<prefix>_<key>{value="..."} 1`. Keys
+        listed in `counters` only ever grow and are exported as
+        `<prefix>_<key>_total` counters, so `rate()` works on them.
+        Registering a prefix again replaces its collector.
+        """
+        self._collectors[prefix] = (help_text, collect, frozenset(counters))
+
+    # Exposition
+
+    def render(self) -> str:
+        """Everything in Prometheus text exposition format (0.0.4)."""
+        lines: list[str] = []
+        for stats in self.routes.values():
+            stats.fold()
+        self._render_routes(lines)
+        for name, family in self._families.items():
+            lines.append(f"# HELP {name} {family.help}")
+            lines.append(f"# TYPE {name} histogram")
+            for labels, histogram in family.series.items():
+                self._render_histogram(lines, name, labels, histogram)
+        for prefix, (help_text, collect, counters) in self._collectors.items():
+            self._render_collector(lines, prefix, help_text, collect(), counters)
+        lines.append("")
+        return "\n".join(lines)
+
+    def _render_routes(self, lines: list[str]) -> None:
+        lines.append("# HELP http_requests_total HTTP requests by handler, method and status.")
+        lines.append("# TYPE http_requests_total counter")
+        for (handler, method), stats in self.routes.items():
+            labels = (("handler", handler), ("method", method))
+            for status, count in stats.statuses().items():
+                lines.append(f"http_requests_total{_labels(labels, status=str(status))} {count}")
+
+        lines.append("# HELP http_requests_in_flight HTTP requests being handled, by router.")
+        lines.append("# TYPE http_requests_in_flight gauge")
+        for router, count in self.in_flight.items():
+            lines.append(f"http_requests_in_flight{_labels((('router', router),))} {count}")
+
+        for metric, attr, help_text in (
+                ("http_request_duration_seconds", "latency", "Time to handle a request, until the last body byte."),
+                ("http_request_size_bytes", "request_bytes", "Request body size."),
+                ("http_response_size_bytes", "response_bytes", "Response body size, as sent (compressed if so)."),
+        ):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} histogram")
+            for (handler, method), stats in self.routes.items():
+                labels = (("handler", handler), ("method", method))
+                self._render_histogram(lines, metric, labels, getattr(stats, attr))
+
+    @staticmethod
+    def _render_histogram(lines: list[str], name: str, labels: Labels, histogram: Histogram) -> None:
+        histogram.fold()
+        cumulative = 0
+        for bound, count in zip((*histogram.bounds.tolist(), math.inf), histogram.counts.tolist()):
+            cumulative += count
+            lines.append(f"{name}_bucket{_labels(labels, le=_number(float(bound)))} {cumulative}")
+        lines.append(f"{name}_sum{_labels(labels)} {_number(histogram.sum)}")
+        lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+
+    @staticmethod
+    def _render_collector(
+            lines: list[str],
+            prefix: str,
+            help_text: str,
+            stats: dict,
+            counters: frozenset[str],
+    ) -> None:
+        for key, value in _flatten(stats):
+            name = f"{prefix}_{key}"
+            kind = "gauge"
+            if isinstance(value, bool):
+                sample = f"{name} {int(value)}"
+            elif isinstance(value, (int, float)):
+                if key in counters:
+                    name, kind = f"{name}_total", "counter"
+                sample = f"{name} {_number(value)}"
+            elif isinstance(value, str):
+                sample = f'{name}{{value="{_escape(value)}"}} 1'
+            else:
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(sample)
+
+
+# Process-wide registry
+metrics = MetricsRegistry()
@@ -0,0 +1,126 @@
+"""
+Compact binary wire format for pose landmark frames.
+
+Layout (all little-endian):
+
+    offset  size  field
+    0       2     magic b"PF"
+    2       1     version (1)
+    3       1     encoding: 0 = float32, 1 = float16, 2 = uint16 quantized
+    4       2     frame count N
+    6       2     reserved (0)
+    8       ...   N x 33 x 4 values (x, y, z, visibility)
+
+A single float32 frame is 536 bytes versus roughly 3-4 KB of JSON. float32
+and float16 bodies are decoded with `np.frombuffer`, so the detector reads
+the request buffer directly without copying. Quantized uint16 maps x, y and
+visibility onto 0-1 and z onto [-Z_RANGE, Z_RANGE].
+"""
+
+import struct
+from enum import IntEnum
+
+import numpy as np
+
+from app.schemas.pose import MAX_BATCH_FRAMES
+from app.services.pose_detection import (
+    LANDMARK_COUNT,
+    LANDMARK_FIELDS,
+    Z,
+    validate_landmark_array,
+)
+
+MAGIC = b"PF"
+VERSION = 1
+HEADER = struct.Struct("<2sBBHH")
+HEADER_SIZE = HEADER.size
+
+# Media type clients send binary frames with
+MEDIA_TYPE = "application/x-pose-frames"
+
+# Depth range covered by the uint16 encoding
+Z_RANGE = 2.0
+_QUANT_MAX = np.iinfo(np.uint16).max
+
+
+class FrameEncoding(IntEnum):
+    """Element encodings supported by the binary format."""
+    FLOAT32 = 0
+    FLOAT16 = 1
+    UINT16 = 2
+
+
+_DTYPES = {
+    FrameEncoding.FLOAT32: np.dtype("<f4"),
+    FrameEncoding.FLOAT16: np.dtype("<f2"),
+    FrameEncoding.UINT16: np.dtype("<u2"),
+}
+
+
+def decode_frames(body: bytes) -> np.ndarray:
+    """
+    Decode a binary pose body into an (N, 33, 4) array.
+
+    Args:
+        body: Raw request body.
+
+    Returns:
+        Read-only array of landmark frames. For float encodings this is a
+        view over `body`; quantized bodies are dequantized to float32.
+
+    Raises:
+        ValueError: If the header is malformed, the length does not match
+            the frame count, or any value fails the landmark range checks.
+    """
+    if len(body) < HEADER_SIZE:
+        raise ValueError("Body too short for pose frame header")
+
+    magic, version, encoding, count, _ = HEADER.unpack_from(body)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Unsupported pose frame format")
+    if encoding not in _DTYPES:
+        raise ValueError(f"Unknown frame encoding {encoding}")
+    if not 1 <= count <= MAX_BATCH_FRAMES:
+        raise ValueError(f"Frame count must be between 1 and {MAX_BATCH_FRAMES}")
+
+    dtype = _DTYPES[FrameEncoding(encoding)]
+    expected = HEADER_SIZE + count * LANDMARK_COUNT * LANDMARK_FIELDS * dtype.itemsize
+    if len(body) != expected:
+        raise ValueError(f"Expected {expected} bytes for {count} frames, got {len(body)}")
+
+    frames = np.frombuffer(body, dtype=dtype, offset=HEADER_SIZE)
+    frames = frames.reshape(count, LANDMARK_COUNT, LANDMARK_FIELDS)
+
+    if encoding == FrameEncoding.UINT16:
+        frames = frames.astype(np.float32) / _QUANT_MAX
+        frames[..., Z] = frames[..., Z] * (2 * Z_RANGE) - Z_RANGE
+
+    validate_landmark_array(frames)
+    return frames
+
+
+def encode_frames(
+        frames: np.ndarray,
+        encoding: FrameEncoding = FrameEncoding.FLOAT32,
+) -> bytes:
+    """
+    Encode (N, 33, 4) landmark frames into the binary wire format.
+
+    Args:
+        frames: Landmark frames with x, y, z, visibility per landmark.
+        encoding: Element encoding to use.
+
+    Returns:
+        Header plus packed frame data.
+    """
+    frames = np.asarray(frames, dtype=np.float64).reshape(-1, LANDMARK_COUNT, LANDMARK_FIELDS)
+
+    if encoding == FrameEncoding.UINT16:
+        scaled = frames.copy()
+        scaled[..., Z] = (np.clip(scaled[..., Z], -Z_RANGE, Z_RANGE) + Z_RANGE) / (2 * Z_RANGE)
+        data = np.rint(np.clip(scaled, 0, 1) * _QUANT_MAX).astype(_DTYPES[encoding])
+    else:
+        data = frames.astype(_DTYPES[encoding])
+
+    header = HEADER.pack(MAGIC, VERSION, encoding, len(frames), 0)
+    return header + data.tobytes()
@@ -10,6 +10,17 @@ from dataclasses import dataclass
 from enum import Enum
 from typing import Optional
 
+import numpy as np
+
+from app.services.gesture_rules import (
+    Feature,
+    GestureRule,
+    GestureRuleTable,
+    Metric,
+    TieredConfidence,
+    compile_rule_table,
+)
+
 
 class Gesture(str, Enum):
     """Supported gestures for detection."""
@@ -25,6 +36,13 @@ class Gesture(str, Enum):
     NEUTRAL = "neutral"
 
 
+class DetailLevel(str, Enum):
+    """How much debugging data to attach to a detection result."""
+    NONE = "none"
+    ARMS = "arms"
+    FULL = "full"
+
+
 # MediaPipe Pose Landmark Indices
 class LandmarkIndex:
     """MediaPipe pose landmark indices (33 landmarks total)."""
@@ -63,6 +81,12 @@ class LandmarkIndex:
     RIGHT_FOOT_INDEX = 32
 
 
+# Column layout of landmark arrays used by the batch path: (x, y, z, visibility)
+LANDMARK_COUNT = 33
+LANDMARK_FIELDS = 4
+X, Y, Z, VISIBILITY = range(LANDMARK_FIELDS)
+
+
 @dataclass
 class Landmark:
     """A single pose landmark with coordinates and visibility."""
@@ -79,6 +103,99 @@ class GestureResult:
     confidence: float
     details: dict
 
+    def to_dict(self) -> dict:
+        """Plain dict form used by the API layer."""
+        return {
+            "gesture": self.gesture.value,
+            "confidence": self.confidence,
+            "details": self.details,
+        }
+
+
+# Shorthand for rule table coordinates
+_NOSE = LandmarkIndex.NOSE
+_L_SHOULDER, _R_SHOULDER = LandmarkIndex.LEFT_SHOULDER, LandmarkIndex.RIGHT_SHOULDER
+_L_ELBOW, _R_ELBOW = LandmarkIndex.LEFT_ELBOW, LandmarkIndex.RIGHT_ELBOW
+_L_WRIST, _R_WRIST = LandmarkIndex.LEFT_WRIST, LandmarkIndex.RIGHT_WRIST
+_L_HIP, _R_HIP = LandmarkIndex.LEFT_HIP, LandmarkIndex.RIGHT_HIP
+
+# Declarative gesture rules. Y is inverted: smaller Y = higher position.
+# Offsets are in units of the detector threshold unless given as a constant.
+GESTURE_RULES = GestureRuleTable(
+    features=(
+        # Wrists above shoulders
+        Feature("left_up", (_L_WRIST, "y"), "lt", (_L_SHOULDER, "y"), thresholds=-1),
+        Feature("right_up", (_R_WRIST, "y"), "lt", (_R_SHOULDER, "y"), thresholds=-1),
+        # Wrists below hips
+        Feature("left_down", (_L_WRIST, "y"), "gt", (_L_HIP, "y"), thresholds=1),
+        Feature("right_down", (_R_WRIST, "y"), "gt", (_R_HIP, "y"), thresholds=1),
+        # Wrists and elbows at roughly shoulder height
+        Feature("left_horizontal", (_L_WRIST, "y"), "abs_lt", (_L_SHOULDER, "y"), thresholds=2),
+        Feature("right_horizontal", (_R_WRIST, "y"), "abs_lt", (_R_SHOULDER, "y"), thresholds=2),
+        Feature("left_elbow_horizontal", (_L_ELBOW, "y"), "abs_lt", (_L_SHOULDER, "y"), thresholds=2),
+        Feature("right_elbow_horizontal", (_R_ELBOW, "y"), "abs_lt", (_R_SHOULDER, "y"), thresholds=2),
+        # Wrists extended outward from shoulders
+        Feature("left_extended", (_L_WRIST, "x"), "lt", (_L_SHOULDER, "x"), thresholds=-1),
+        Feature("right_extended", (_R_WRIST, "x"), "gt", (_R_SHOULDER, "x"), thresholds=1),
+        Feature("left_pointing", (_L_WRIST, "x"), "lt", (_L_SHOULDER, "x"), constant=-0.2),
+        Feature("right_pointing", (_R_WRIST, "x"), "gt", (_R_SHOULDER, "x"), constant=0.2),
+        # Other arm resting near or below the hip
+        Feature("left_arm_down", (_L_WRIST, "y"), "gt", (_L_HIP, "y"), thresholds=-1),
+        Feature("right_arm_down", (_R_WRIST, "y"), "gt", (_R_HIP, "y"), thresholds=-1),
+        # Wrists above the head
+        Feature("left_above_head", (_L_WRIST, "y"), "lt", (_NOSE, "y")),
+        Feature("right_above_head", (_R_WRIST, "y"), "lt", (_NOSE, "y")),
+    ),
+    metrics=(
+        Metric("hands_above_head", "count", features=("left_above_head", "right_above_head")),
+        # T-pose typically has arm span ~3x shoulder width
+        Metric(
+            "extension_ratio",
+            "span_ratio",
+            numerator=((_R_WRIST, "x"), (_L_WRIST, "x")),
+            denominator=((_R_SHOULDER, "x"), (_L_SHOULDER, "x")),
+        ),
+    ),
+    rules=(
+        GestureRule(
+            Gesture.HANDS_UP, priority=10,
+            when=("left_up", "right_up"),
+            confidence=TieredConfidence("hands_above_head", ((1, 0.95), (0, 0.85)), 0.7),
+        ),
+        GestureRule(
+            Gesture.T_POSE, priority=20,
+            when=(
+                "left_horizontal", "right_horizontal",
+                "left_extended", "right_extended",
+                "left_elbow_horizontal", "right_elbow_horizontal",
+            ),
+            confidence=TieredConfidence("extension_ratio", ((2.5, 0.95), (2.0, 0.85)), 0.7),
+        ),
+        GestureRule(Gesture.LEFT_HAND_UP, priority=30, when=("left_up",), unless=("right_up",), confidence=0.8),
+        GestureRule(Gesture.RIGHT_HAND_UP, priority=40, when=("right_up",), unless=("left_up",), confidence=0.8),
+        GestureRule(
+            Gesture.POINTING_LEFT, priority=50,
+            when=("left_horizontal", "left_pointing", "right_arm_down"),
+            confidence=0.7,
+        ),
+        GestureRule(
+            Gesture.POINTING_RIGHT, priority=60,
+            when=("right_horizontal", "right_pointing", "left_arm_down"),
+            confidence=0.7,
+        ),
+        GestureRule(Gesture.HANDS_DOWN, priority=70, when=("left_down", "right_down"), confidence=0.9),
+    ),
+    fallback=Gesture.NEUTRAL,
+    fallback_confidence=0.5,
+)
+
+_ARM_LANDMARKS = (
+    ("left_wrist", LandmarkIndex.LEFT_WRIST),
+    ("right_wrist", LandmarkIndex.RIGHT_WRIST),
+    ("left_shoulder", LandmarkIndex.LEFT_SHOULDER),
+    ("right_shoulder", LandmarkIndex.RIGHT_SHOULDER),
+)
+
 
 class PoseGestureDetector:
     """
@@ -88,21 +205,30 @@ class PoseGestureDetector:
     All coordinates are normalized (0-1) with Y-axis inverted (0 = top).
     """
 
-    def __init__(self, threshold: float = 0.1):
+    def __init__(self, threshold: float = 0.1, rules: GestureRuleTable | None = None):
         """
         Initialize detector with position threshold.
 
         Args:
             threshold: Minimum distance ratio for position comparisons.
+            rules: Gesture rule table; defaults to GESTURE_RULES. It is
+                compiled once here into the plan used for every frame.
         """
         self.threshold = threshold
-
-    def detect(self, landmarks: list[Landmark]) -> GestureResult:
+        self.rules = rules or GESTURE_RULES
+        self.plan = compile_rule_table(self.rules, threshold)
+
+    def detect(
+            self,
+            landmarks: list[Landmark],
+            detail: DetailLevel = DetailLevel.NONE,
+    ) -> GestureResult:
         """
         Detect gesture from pose landmarks.
 
         Args:
             landmarks: List of 33 MediaPipe pose landmarks.
+            detail: Debugging data to include; built only when requested.
 
         Returns:
             GestureResult with detected gesture and confidence.
@@ -114,207 +240,100 @@ class PoseGestureDetector:
                 details={"error": "Insufficient landmarks"}
             )
 
-        # Check gestures in order of specificity
-        if self._is_hands_up(landmarks):
-            return GestureResult(
-                gesture=Gesture.HANDS_UP,
-                confidence=self._calculate_hands_up_confidence(landmarks),
-                details=self._get_arm_positions(landmarks)
-            )
+        code, confidence = self.plan.evaluate(landmarks)
+        return GestureResult(
+            gesture=self.plan.outcomes[code],
+            confidence=confidence,
+            details=self._get_details(landmarks, detail)
+        )
 
-        if self._is_t_pose(landmarks):
-            return GestureResult(
-                gesture=Gesture.T_POSE,
-                confidence=self._calculate_t_pose_confidence(landmarks),
-                details=self._get_arm_positions(landmarks)
-            )
+    def detect_batch(
+            self,
+            frames: np.ndarray,
+            detail: DetailLevel = DetailLevel.NONE,
+    ) -> list[GestureResult]:
+        """
+        Detect gestures for many frames at once.
 
-        if self._is_left_hand_up(landmarks):
-            return GestureResult(
-                gesture=Gesture.LEFT_HAND_UP,
-                confidence=0.8,
-                details=self._get_arm_positions(landmarks)
-            )
+        The compiled rule plan is evaluated with whole-array comparisons over
+        the batch, so the per-frame Python work is limited to building the
+        result objects. Results are identical to calling `detect` per frame.
 
-        if self._is_right_hand_up(landmarks):
-            return GestureResult(
-                gesture=Gesture.RIGHT_HAND_UP,
-                confidence=0.8,
-                details=self._get_arm_positions(landmarks)
-            )
+        Args:
+            frames: Array of shape (N, 33, 4) holding x, y, z, visibility.
+                Float arrays (e.g. float32 views over a binary request
+                body) are read in place without copying.
+            detail: Debugging data to include; built only when requested.
 
-        if self._is_pointing_left(landmarks):
-            return GestureResult(
-                gesture=Gesture.POINTING_LEFT,
-                confidence=0.7,
-                details=self._get_arm_positions(landmarks)
+        Returns:
+            One GestureResult per frame, in input order.
+        """
+        frames = np.asarray(frames)
+        if not np.issubdtype(frames.dtype, np.floating):
+            frames = frames.astype(np.float64)
+        if frames.ndim != 3 or frames.shape[1:] != (LANDMARK_COUNT, LANDMARK_FIELDS):
+            raise ValueError(
+                f"Expected frames of shape (N, {LANDMARK_COUNT}, {LANDMARK_FIELDS}), "
+                f"got {frames.shape}"
             )
 
-        if self._is_pointing_right(landmarks):
-            return GestureResult(
-                gesture=Gesture.POINTING_RIGHT,
-                confidence=0.7,
-                details=self._get_arm_positions(landmarks)
-            )
+        codes, confidences = self.plan.evaluate_batch(frames)
+        return self.batch_results(frames, codes, confidences, detail)
 
-        if self._is_hands_down(landmarks):
-            return GestureResult(
-                gesture=Gesture.HANDS_DOWN,
-                confidence=0.9,
-                details=self._get_arm_positions(landmarks)
-            )
+    def batch_results(
+            self,
+            frames: np.ndarray,
+            codes: np.ndarray,
+            confidences: np.ndarray,
+            detail: DetailLevel = DetailLevel.NONE,
+    ) -> list[GestureResult]:
+        """
+        Build results from an evaluated batch.
 
-        return GestureResult(
-            gesture=Gesture.NEUTRAL,
-            confidence=0.5,
-            details=self._get_arm_positions(landmarks)
-        )
+        Args:
+            frames: The (N, 33, 4) frames that were evaluated; only read
+                when details are requested.
+            codes: Outcome index per frame, as from `plan.evaluate_batch`.
+            confidences: Confidence per frame.
+            detail: Debugging data to include.
+
+        Returns:
+            One GestureResult per frame, in input order.
+        """
+        outcomes = self.plan.outcomes
+
+        if detail == DetailLevel.NONE:
+            details = [{} for _ in range(len(frames))]
+        else:
+            arm_rows = frames[:, [idx for _, idx in _ARM_LANDMARKS], :2].tolist()
+            details = [_arm_positions_from_rows(rows) for rows in arm_rows]
+            if detail == DetailLevel.FULL:
+                for frame_details, frame in zip(details, frames.tolist()):
+                    frame_details["landmarks"] = _landmark_echo(frame)
+
+        return [
+            GestureResult(
+                gesture=outcomes[code],
+                confidence=confidence,
+                details=frame_details,
+            )
+            for code, confidence, frame_details in zip(
+                codes.tolist(), confidences.tolist(), details
+            )
+        ]
 
-    def _is_hands_up(self, landmarks: list[Landmark]) -> bool:
-        """Both wrists above shoulders."""
-        left_wrist = landmarks[LandmarkIndex.LEFT_WRIST]
-        right_wrist = landmarks[LandmarkIndex.RIGHT_WRIST]
-        left_shoulder = landmarks[LandmarkIndex.LEFT_SHOULDER]
-        right_shoulder = landmarks[LandmarkIndex.RIGHT_SHOULDER]
-
-        # Y is inverted: smaller Y = higher position
-        left_up = left_wrist.y < left_shoulder.y - self.threshold
-        right_up = right_wrist.y < right_shoulder.y - self.threshold
-
-        return left_up and right_up
-
-    def _is_hands_down(self, landmarks: list[Landmark]) -> bool:
-        """Both wrists below hips."""
-        left_wrist = landmarks[LandmarkIndex.LEFT_WRIST]
-        right_wrist = landmarks[LandmarkIndex.RIGHT_WRIST]
-        left_hip = landmarks[LandmarkIndex.LEFT_HIP]
-        right_hip = landmarks[LandmarkIndex.RIGHT_HIP]
-
-        left_down = left_wrist.y > left_hip.y + self.threshold
-        right_down = right_wrist.y > right_hip.y + self.threshold
-
-        return left_down and right_down
-
-    def _is_left_hand_up(self, landmarks: list[Landmark]) -> bool:
-        """Left wrist above left shoulder, right is not."""
-        left_wrist = landmarks[LandmarkIndex.LEFT_WRIST]
-        right_wrist = landmarks[LandmarkIndex.RIGHT_WRIST]
-        left_shoulder = landmarks[LandmarkIndex.LEFT_SHOULDER]
-        right_shoulder = landmarks[LandmarkIndex.RIGHT_SHOULDER]
-
-        left_up = left_wrist.y < left_shoulder.y - self.threshold
-        right_up = right_wrist.y < right_shoulder.y - self.threshold
-
-        return left_up and not right_up
-
-    def _is_right_hand_up(self, landmarks: list[Landmark]) -> bool:
-        """Right wrist above right shoulder, left is not."""
-        left_wrist = landmarks[LandmarkIndex.LEFT_WRIST]
-        right_wrist = landmarks[LandmarkIndex.RIGHT_WRIST]
-        left_shoulder = landmarks[LandmarkIndex.LEFT_SHOULDER]
-        right_shoulder = landmarks[LandmarkIndex.RIGHT_SHOULDER]
-
-        left_up = left_wrist.y < left_shoulder.y - self.threshold
-        right_up = right_wrist.y < right_shoulder.y - self.threshold
-
-        return right_up and not left_up
-
-    def _is_t_pose(self, landmarks: list[Landmark]) -> bool:
-        """Arms extended horizontally (T-pose)."""
-        left_wrist = landmarks[LandmarkIndex.LEFT_WRIST]
-        right_wrist = landmarks[LandmarkIndex.RIGHT_WRIST]
-        left_shoulder = landmarks[LandmarkIndex.LEFT_SHOULDER]
-        right_shoulder = landmarks[LandmarkIndex.RIGHT_SHOULDER]
-        left_elbow = landmarks[LandmarkIndex.LEFT_ELBOW]
-        right_elbow = landmarks[LandmarkIndex.RIGHT_ELBOW]
-
-        # Wrists should be at roughly shoulder height
-        left_horizontal = abs(left_wrist.y - left_shoulder.y) < self.threshold * 2
-        right_horizontal = abs(right_wrist.y - right_shoulder.y) < self.threshold * 2
-
-        # Wrists should be extended outward from shoulders
-        left_extended = left_wrist.x < left_shoulder.x - self.threshold
-        right_extended = right_wrist.x > right_shoulder.x + self.threshold
-
-        # Elbows should also be roughly at shoulder height
-        left_elbow_horizontal = abs(left_elbow.y - left_shoulder.y) < self.threshold * 2
-        right_elbow_horizontal = abs(right_elbow.y - right_shoulder.y) < self.threshold * 2
-
-        return (left_horizontal and right_horizontal and
-                left_extended and right_extended and
-                left_elbow_horizontal and right_elbow_horizontal)
-
-    def _is_pointing_left(self, landmarks: list[Landmark]) -> bool:
-        """Left arm extended to the left side."""
-        left_wrist = landmarks[LandmarkIndex.LEFT_WRIST]
-        left_shoulder = landmarks[LandmarkIndex.LEFT_SHOULDER]
-        left_elbow = landmarks[LandmarkIndex.LEFT_ELBOW]
-        right_wrist = landmarks[LandmarkIndex.RIGHT_WRIST]
-        right_hip = landmarks[LandmarkIndex.RIGHT_HIP]
-
-        # Left arm extended horizontally
-        arm_horizontal = abs(left_wrist.y - left_shoulder.y) < self.threshold * 2
-        arm_extended = left_wrist.x < left_shoulder.x - 0.2
-
-        # Right arm is down
-        right_down = right_wrist.y > right_hip.y - self.threshold
-
-        return arm_horizontal and arm_extended and right_down
-
-    def _is_pointing_right(self, landmarks: list[Landmark]) -> bool:
-        """Right arm extended to the right side."""
-        right_wrist = landmarks[LandmarkIndex.RIGHT_WRIST]
-        right_shoulder = landmarks[LandmarkIndex.RIGHT_SHOULDER]
-        left_wrist = landmarks[LandmarkIndex.LEFT_WRIST]
-        left_hip = landmarks[LandmarkIndex.LEFT_HIP]
-
-        # Right arm extended horizontally
-        arm_horizontal = abs(right_wrist.y - right_shoulder.y) < self.threshold * 2
-        arm_extended = right_wrist.x > right_shoulder.x + 0.2
-
-        # Left arm is down
-        left_down = left_wrist.y > left_hip.y - self.threshold
-
-        return arm_horizontal and arm_extended and left_down
-
-    def _calculate_hands_up_confidence(self, landmarks: list[Landmark]) -> float:
-        """Calculate confidence for hands up gesture."""
-        left_wrist = landmarks[LandmarkIndex.LEFT_WRIST]
-        right_wrist = landmarks[LandmarkIndex.RIGHT_WRIST]
-        left_shoulder = landmarks[LandmarkIndex.LEFT_SHOULDER]
-        right_shoulder = landmarks[LandmarkIndex.RIGHT_SHOULDER]
-        nose = landmarks[LandmarkIndex.NOSE]
-
-        # Higher confidence if hands are above head
-        left_above_head = left_wrist.y < nose.y
-        right_above_head = right_wrist.y < nose.y
-
-        base_confidence = 0.7
-        if left_above_head and right_above_head:
-            return 0.95
-        elif left_above_head or right_above_head:
-            return 0.85
-        return base_confidence
-
-    def _calculate_t_pose_confidence(self, landmarks: list[Landmark]) -> float:
-        """Calculate confidence for T-pose gesture."""
-        left_wrist = landmarks[LandmarkIndex.LEFT_WRIST]
-        right_wrist = landmarks[LandmarkIndex.RIGHT_WRIST]
-        left_shoulder = landmarks[LandmarkIndex.LEFT_SHOULDER]
-        right_shoulder = landmarks[LandmarkIndex.RIGHT_SHOULDER]
-
-        # More extended = higher confidence
-        shoulder_width = abs(right_shoulder.x - left_shoulder.x)
-        arm_span = abs(right_wrist.x - left_wrist.x)
-
-        extension_ratio = arm_span / shoulder_width if shoulder_width > 0 else 0
+    def _get_details(self, landmarks: list[Landmark], detail: DetailLevel) -> dict:
+        """Build the requested level of debugging details."""
+        if detail == DetailLevel.NONE:
+            return {}
 
-        # T-pose typically has arm span ~3x shoulder width
-        if extension_ratio > 2.5:
-            return 0.95
-        elif extension_ratio > 2.0:
-            return 0.85
-        return 0.7
+        details = self._get_arm_positions(landmarks)
+        if detail == DetailLevel.FULL:
+            details["landmarks"] = [
+                {"x": lm.x, "y": lm.y, "z": lm.z, "visibility": lm.visibility}
+                for lm in landmarks
+            ]
+        return details
 
     def _get_arm_positions(self, landmarks: list[Landmark]) -> dict:
         """Get arm position details for debugging."""
@@ -338,21 +357,34 @@ class PoseGestureDetector:
         }
 
 
+def _arm_positions_from_rows(rows: list[list[float]]) -> dict:
+    """Build `_get_arm_positions` output from (x, y) rows ordered as `_ARM_LANDMARKS`."""
+    return {
+        name: {"x": x, "y": y}
+        for (name, _), (x, y) in zip(_ARM_LANDMARKS, rows)
+    }
+
+
+def _landmark_echo(rows: list[list[float]]) -> list[dict]:
+    """Echo (x, y, z, visibility) rows back as landmark dicts."""
+    return [
+        {"x": x, "y": y, "z": z, "visibility": visibility}
+        for x, y, z, visibility in rows
+    ]
+
+
 # Singleton detector instance
 detector = PoseGestureDetector()
 
 
-def detect_gesture(landmarks: list[dict]) -> dict:
-    """
-    Detect gesture from raw landmark data.
+def landmarks_from_array(frame: np.ndarray) -> list[Landmark]:
+    """Convert one (33, 4) landmark array into Landmark dataclasses."""
+    return [Landmark(x, y, z, visibility) for x, y, z, visibility in frame.tolist()]
 
-    Args:
-        landmarks: List of 33 landmark dicts with x, y, z, visibility keys.
 
-    Returns:
-        Dict with gesture, confidence, and details.
-    """
-    parsed_landmarks = [
+def parse_landmarks(landmarks: list[dict]) -> list[Landmark]:
+    """Convert raw landmark dicts into Landmark dataclasses."""
+    return [
         Landmark(
             x=lm.get("x", 0),
             y=lm.get("y", 0),
@@ -362,10 +394,51 @@ def detect_gesture(landmarks: list[dict]) -> dict:
         for lm in landmarks
     ]
 
-    result = detector.detect(parsed_landmarks)
 
-    return {
-        "gesture": result.gesture.value,
-        "confidence": result.confidence,
-        "details": result.details,
-    }
+def detect_gesture(landmarks: list[dict], detail: DetailLevel = DetailLevel.NONE) -> dict:
+    """
+    Detect gesture from raw landmark data.
+
+    Args:
+        landmarks: List of 33 landmark dicts with x, y, z, visibility keys.
+        detail: Debugging data to include in details.
+
+    Returns:
+        Dict with gesture, confidence, and details.
+    """
+    return detector.detect(parse_landmarks(landmarks), detail).to_dict()
+
+
+def validate_landmark_array(frames: np.ndarray) -> None:
+    """
+    Apply the `LandmarkSchema` range checks to a landmark array.
+
+    Args:
+        frames: Array whose last axis is (x, y, z, visibility).
+
+    Raises:
+        ValueError: If any value is non-finite or x, y, visibility fall outside 0-1.
+    """
+    if not np.isfinite(frames).all():
+        raise ValueError("Landmark values must be finite numbers")
+
+    bounded = frames[..., [X, Y, VISIBILITY]]
+    if (bounded < 0).any() or (bounded > 1).any():
+        raise ValueError("Landmark x, y and visibility must be between 0 and 1")
+
+
+def detect_gesture_batch(
+        frames: np.ndarray,
+        detail: DetailLevel = DetailLevel.NONE,
+) -> list[dict]:
+    """
+    Detect gestures for a batch of frames.
+
+    Args:
+        frames: Array of shape (N, 33, 4) with x, y, z, visibility per landmark.
+        detail: Debugging data to include in details.
+
+    Returns:
+        List of dicts with gesture, confidence, and details, one per frame.
+    """
+    return [result.to_dict() for result in detector.detect_batch(frames, detail)]
@@ -0,0 +1,304 @@
+"""
+Pose rule evaluation in a process pool, fed by micro-batches.
+
+Evaluating gesture rules is pure CPU work. Run inline, a burst of pose
+frames holds the event loop and every TTS or comment request waits behind
+it. In pool mode the loop only queues frames: a dispatcher task packs the
+frames of all pending requests into one batch, copies it into a
+shared-memory slot and hands the slot's name to a worker process, which
+runs the vectorized rule plan over it in place. Only the slot name goes
+to the worker and only the per-frame codes and confidences come back, so
+no landmark data is pickled.
+
+The number of slots bounds the batches in flight. When all are busy,
+frames keep queueing and the next batch simply gets bigger, up to
+`batch_max`.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from app.services.pose_detection import (
+    LANDMARK_COUNT,
+    LANDMARK_FIELDS,
+    DetailLevel,
+    GestureResult,
+    detector,
+)
+
+logger = logging.getLogger(__name__)
+
+_FRAME_SHAPE = (LANDMARK_COUNT, LANDMARK_FIELDS)
+
+# Worker side: slots attached so far, by shared memory name
+_attached: dict[str, tuple[SharedMemory, np.ndarray]] = {}
+
+
+def _evaluate_slot(name: str, count: int, capacity: int) -> tuple[np.ndarray, np.ndarray]:
+    """Run the rule plan over the first `count` frames of a slot (in a worker)."""
+    entry = _attached.get(name)
+    if entry is None:
+        shm = SharedMemory(name=name)
+        entry = _attached[name] = (shm, np.ndarray((capacity, *_FRAME_SHAPE), dtype=np.float64, buffer=shm.buf))
+    return detector.plan.evaluate_batch(entry[1][:count])
+
+
+class _Slot:
+    """A shared-memory frame buffer owned by the event loop side."""
+
+    __slots__ = ("shm", "frames")
+
+    def __init__(self, capacity: int):
+        self.shm = SharedMemory(create=True, size=capacity * LANDMARK_COUNT * LANDMARK_FIELDS * 8)
+        self.frames = np.ndarray((capacity, *_FRAME_SHAPE), dtype=np.float64, buffer=self.shm.buf)
+
+    def release(self) -> None:
+        self.frames = None
+        self.shm.close()
+        self.shm.unlink()
+
+
+class _Pending:
+    """Frames of one request awaiting their batch."""
+
+    __slots__ = ("frames", "future")
+
+    def __init__(self, frames: np.ndarray, future: asyncio.Future):
+        self.frames = frames
+        self.future = future
+
+
+class PoseWorkerPool:
+    """Micro-batching front end of a process pool evaluating pose frames."""
+
+    def __init__(
+            self,
+            workers: int = 2,
+            batch_max: int = 256,
+            max_wait: float = 0.002,
+            slots: int | None = None,
+    ):
+        """
+        Initialize a stopped pool.
+
+        Args:
+            workers: Worker processes.
+            batch_max: Most frames evaluated in one batch (slot capacity).
+            max_wait: Seconds the dispatcher waits for more frames before
+                sending a batch that is not full; 0 sends immediately.
+            slots: Shared-memory slots (batches in flight); defaults to
+                twice the workers, so every worker has its next batch ready.
+        """
+        self.workers = workers
+        self.batch_max = batch_max
+        self.max_wait = max_wait
+        self.slot_count = slots or 2 * workers
+        self._executor: ProcessPoolExecutor | None = None
+        self._slots: list[_Slot] = []
+        self._free: asyncio.Queue[_Slot] | None = None
+        self._pending: deque[_Pending] = deque()
+        self._pending_frames = 0
+        self._wakeup: asyncio.Event | None = None
+        self._dispatcher: asyncio.Task | None = None
+        self._in_flight: set[asyncio.Task] = set()
+        self.batches = 0
+        self.frames = 0
+        self.restarts = 0
+
+    @classmethod
+    def from_env(cls) -> "PoseWorkerPool":
+        """
+        Build a pool from POSE_POOL_WORKERS, POSE_BATCH_MAX and POSE_BATCH_WAIT_MS.
+
+        Every server process gets its own pool, so the default splits the
+        CPUs between the BACKEND_WORKERS processes.
+        """
+        server_workers = max(1, int(os.getenv("BACKEND_WORKERS", "1")))
+        default_workers = max(1, (os.cpu_count() or 1) // server_workers)
+        return cls(
+            workers=int(os.getenv("POSE_POOL_WORKERS", str(default_workers))),
+            batch_max=int(os.getenv("POSE_BATCH_MAX", "256")),
+            max_wait=float(os.getenv("POSE_BATCH_WAIT_MS", "2")) / 1000,
+        )
+
+    @property
+    def running(self) -> bool:
+        return self._dispatcher is not None
+
+    async def start(self) -> None:
+        """Spawn the workers and the dispatcher; call from inside the running event loop."""
+        self._executor = self._new_executor()
+        try:
+            for _ in range(self.slot_count):
+                self._slots.append(_Slot(self.batch_max))
+            self._free = asyncio.Queue()
+            for slot in self._slots:
+                self._free.put_nowait(slot)
+            self._wakeup = asyncio.Event()
+            # Start every worker (spawn imports the app code) before traffic arrives
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(*(
+                loop.run_in_executor(self._executor, _evaluate_slot, slot.shm.name, 0, self.batch_max)
+                for slot in self._slots
+            ))
+        except BaseException:
+            # Shared memory outlives the process unless unlinked
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            for slot in self._slots:
+                slot.release()
+            self._slots = []
+            self._free = None
+            raise
+        self._dispatcher = asyncio.create_task(self._dispatch())
+        logger.info(f"Pose worker pool started: {self.workers} workers, {self.slot_count} slots")
+
+    async def stop(self) -> None:
+        """Finish batches in flight, then stop the workers and free the slots."""
+        if self._dispatcher is None:
+            return
+        self._dispatcher.cancel()
+        await asyncio.gather(self._dispatcher, return_exceptions=True)
+        self._dispatcher = None
+        await asyncio.gather(*self._in_flight, return_exceptions=True)
+        for pending in self._pending:
+            if not pending.future.done():
+                pending.future.set_exception(RuntimeError("Pose worker pool stopped"))
+        self._pending.clear()
+        self._pending_frames = 0
+        await asyncio.to_thread(self._executor.shutdown)
+        self._executor = None
+        for slot in self._slots:
+            slot.release()
+        self._slots = []
+
+    def stats(self) -> dict:
+        """Queue depth and batching counters."""
+        return {
+            "workers": self.workers,
+            "pending_frames": self._pending_frames,
+            "free_slots": self._free.qsize() if self._free else 0,
+            "batches": self.batches,
+            "frames": self.frames,
+            "avg_batch": self.frames / self.batches if self.batches else 0.0,
+            "restarts": self.restarts,
+        }
+
+    async def detect(
+            self,
+            frames: np.ndarray,
+            detail: DetailLevel = DetailLevel.NONE,
+    ) -> list[GestureResult]:
+        """
+        Detect gestures for validated (N, 33, 4) frames in the pool.
+
+        Results are the same as `detector.detect_batch(frames, detail)`.
+        """
+        loop = asyncio.get_running_loop()
+        futures = []
+        for start in range(0, len(frames), self.batch_max):
+            chunk = frames[start:start + self.batch_max]
+            future = loop.create_future()
+            self._pending.append(_Pending(chunk, future))
+            self._pending_frames += len(chunk)
+            futures.append(future)
+        self._wakeup.set()
+
+        outcomes = await asyncio.gather(*futures)
+        if len(outcomes) == 1:
+            codes, confidences = outcomes[0]
+        else:
+            codes = np.concatenate([codes for codes, _ in outcomes])
+            confidences = np.concatenate([confidences for _, confidences in outcomes])
+        return detector.batch_results(frames, codes, confidences, detail)
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # Spawn, not fork: the server process has threads (SQLite, TTS I/O)
+        return ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    async def _dispatch(self) -> None:
+        while True:
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            if self.max_wait and self._pending_frames < self.batch_max:
+                await asyncio.sleep(self.max_wait)
+            slot = await self._free.get()
+
+            batch: list[_Pending] = []
+            count = 0
+            while self._pending and count + len(self._pending[0].frames) <= self.batch_max:
+                pending = self._pending.popleft()
+                if pending.future.done():
+                    # Caller went away (cancelled request)
+                    self._pending_frames -= len(pending.frames)
+                    continue
+                slot.frames[count:count + len(pending.frames)] = pending.frames
+                count += len(pending.frames)
+                batch.append(pending)
+            self._pending_frames -= count
+
+            if not batch:
+                self._free.put_nowait(slot)
+                continue
+            task = asyncio.create_task(self._run_batch(self._executor, slot, batch, count))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _run_batch(
+            self,
+            executor: ProcessPoolExecutor,
+            slot: _Slot,
+            batch: list[_Pending],
+            count: int,
+    ) -> None:
+        try:
+            future: Future = executor.submit(_evaluate_slot, slot.shm.name, count, self.batch_max)
+            codes, confidences = await asyncio.wrap_future(future)
+        except Exception as e:
+            logger.error(f"Pose batch of {count} frames failed: {e}")
+            if isinstance(e, BrokenProcessPool) and executor is self._executor:
+                self._restart()
+            for pending in batch:
+                if not pending.future.done():
+                    pending.future.set_exception(e)
+            return
+        finally:
+            self._free.put_nowait(slot)
+
+        self.batches += 1
+        self.frames += count
+        offset = 0
+        for pending in batch:
+            end = offset + len(pending.frames)
+            if not pending.future.done():
+                pending.future.set_result((codes[offset:end], confidences[offset:end]))
+            offset = end
+
+    def _restart(self) -> None:
+        """Replace a pool whose worker died (e.g. killed by the OOM killer)."""
+        broken, self._executor = self._executor, self._new_executor()
+        broken.shutdown(wait=False)
+        self.restarts += 1
+
+
+def pool_enabled() -> bool:
+    """Whether POSE_EXECUTION selects the worker pool ("pool") over inline detection ("inline", default)."""
+    mode = os.getenv("POSE_EXECUTION", "inline").lower()
+    if mode not in ("inline", "pool"):
+        raise ValueError(f"Unknown POSE_EXECUTION '{mode}'")
+    return mode == "pool"
+
+
+# Shared pool, started in the app lifespan; None unless POSE_EXECUTION=pool
+pose_pool = PoseWorkerPool.from_env() if pool_enabled() else None
@@ -0,0 +1,274 @@
+"""
+Overload protection for calls to an upstream API.
+
+`AdaptiveLimiter` caps concurrent calls with an AIMD window: it grows by
+about one slot per window of fast successes and shrinks multiplicatively
+when latency exceeds the target or a call fails. `CircuitBreaker` stops
+calling an upstream that keeps failing and lets a few probe calls through
+after a cool-down. Both shed load with `UpstreamUnavailable`: the limiter
+lets a caller wait a moment for a slot in a short bounded queue, the
+breaker rejects at once, so a slow upstream cannot pile up waiting
+requests.
+
+Background work (pre-synthesis) runs in a share of the limiter's window
+and never waits, so it cannot take the slots of user requests.
+"""
+
+import asyncio
+import time
+from collections import deque
+from enum import Enum
+from typing import Callable
+
+
+class UpstreamUnavailable(Exception):
+    """The upstream call was rejected without being attempted."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdaptiveLimiter:
+    """Additive-increase / multiplicative-decrease concurrency limit."""
+
+    def __init__(
+            self,
+            initial_limit: int = 8,
+            min_limit: int = 1,
+            max_limit: int = 32,
+            latency_target: float = 2.0,
+            backoff: float = 0.7,
+            max_wait: float = 1.0,
+            max_queue: int | None = None,
+            background_share: float = 0.5,
+            clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            initial_limit: Starting concurrency window.
+            min_limit: The window never shrinks below this.
+            max_limit: The window never grows above this.
+            latency_target: Calls slower than this (seconds) count as congestion.
+            backoff: Factor the window is multiplied by on congestion.
+            max_wait: Seconds a caller may wait for a slot when the window
+                is full; 0 rejects at once.
+            max_queue: Most callers waiting at a time; defaults to `max_limit`.
+            background_share: Fraction of the window background calls may
+                use (rounded down, so none once the window is small).
+            clock: Monotonic time source.
+        """
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.backoff = backoff
+        self.max_wait = max_wait
+        self.max_queue = max_limit if max_queue is None else max_queue
+        self.background_share = background_share
+        self._clock = clock
+        self.limit = float(min(max(initial_limit, min_limit), max_limit))
+        self.in_flight = 0
+        self.background_in_flight = 0
+        self.rejected = 0
+        self.waited = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        # Calls started before the last decrease must not shrink the window again
+        self._decreased_at = float("-inf")
+
+    async def acquire(self, background: bool = False) -> float:
+        """
+        Take a slot, waiting up to `max_wait` for one when the window is full.
+
+        Background calls only start while nobody waits and their share of
+        the window has room; they never queue.
+
+        Returns:
+            Start time to pass back to `release`.
+
+        Raises:
+            UpstreamUnavailable: If no slot was free in time.
+        """
+        if background:
+            if (
+                    self._waiters
+                    or self.in_flight >= int(self.limit)
+                    or self.background_in_flight >= int(self.limit * self.background_share)
+            ):
+                self.rejected += 1
+                raise UpstreamUnavailable("Upstream concurrency limit reached", retry_after=1.0)
+            self.in_flight += 1
+            self.background_in_flight += 1
+            return self._clock()
+
+        if not self._waiters and self.in_flight < int(self.limit):
+            self.in_flight += 1
+            return self._clock()
+        if self.max_wait <= 0 or len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            raise UpstreamUnavailable("Upstream concurrency limit reached", retry_after=1.0)
+
+        # `release` hands the slot over by resolving the future
+        self.waited += 1
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # Handed a slot just as we gave up: pass it on
+                self.in_flight -= 1
+                self._wake()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.rejected += 1
+            raise UpstreamUnavailable("Upstream concurrency limit reached", retry_after=1.0)
+        return self._clock()
+
+    def release(self, started: float, success: bool | None, background: bool = False) -> None:
+        """
+        Return a slot and adjust the window from the call's outcome.
+
+        `success=None` (call not made or cancelled) frees the slot only.
+        """
+        self.in_flight -= 1
+        if background:
+            self.background_in_flight -= 1
+        if success is not None:
+            latency = self._clock() - started
+            if success and latency <= self.latency_target:
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            elif started >= self._decreased_at:
+                self.limit = max(self.min_limit, self.limit * self.backoff)
+                self._decreased_at = self._clock()
+        self._wake()
+
+    def _wake(self) -> None:
+        """Hand free slots to waiting callers, oldest first."""
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if waiter.done():
+                continue
+            self.in_flight += 1
+            waiter.set_result(None)
+
+    def stats(self) -> dict:
+        """Current window, usage, queue and rejection counts."""
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "background_in_flight": self.background_in_flight,
+            "queued": len(self._waiters),
+            "waited": self.waited,
+            "rejected": self.rejected,
+        }
+
+
+class BreakerState(str, Enum):
+    """Circuit breaker states."""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker with half-open probing.
+
+    After `failure_threshold` failures in a row the breaker opens and
+    rejects calls for `reset_timeout` seconds. It then lets up to
+    `half_open_probes` calls through: a success closes it, a failure opens
+    it again.
+    """
+
+    def __init__(
+            self,
+            failure_threshold: int = 5,
+            reset_timeout: float = 30.0,
+            half_open_probes: int = 1,
+            clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit.
+            reset_timeout: Seconds to stay open before probing.
+            half_open_probes: Concurrent probe calls allowed while half-open.
+            clock: Monotonic time source.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_probes = half_open_probes
+        self._clock = clock
+        self._state = BreakerState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> BreakerState:
+        """Current state; an open breaker turns half-open once its timeout passes."""
+        if self._state == BreakerState.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._state = BreakerState.HALF_OPEN
+            self._probes = 0
+        return self._state
+
+    def retry_after(self) -> float:
+        """Seconds until the breaker will let a probe through."""
+        if self.state != BreakerState.OPEN:
+            return 0.0
+        return max(0.0, self._opened_at + self.reset_timeout - self._clock())
+
+    def acquire(self) -> None:
+        """
+        Ask to make a call.
+
+        Raises:
+            UpstreamUnavailable: If the circuit is open or all probe slots
+                are taken.
+        """
+        state = self.state
+        if state == BreakerState.CLOSED:
+            return
+        if state == BreakerState.HALF_OPEN and self._probes < self.half_open_probes:
+            self._probes += 1
+            return
+        self.rejected += 1
+        raise UpstreamUnavailable(
+            "Upstream circuit open",
+            retry_after=self.retry_after() or 1.0,
+        )
+
+    def record(self, success: bool | None) -> None:
+        """
+        Report the outcome of a call allowed by `acquire`.
+
+        `success=None` (call cancelled) gives back a probe slot without
+        changing state.
+        """
+        if success is None:
+            if self._state == BreakerState.HALF_OPEN:
+                self._probes = max(0, self._probes - 1)
+            return
+        if success:
+            self._failures = 0
+            self._state = BreakerState.CLOSED
+            return
+
+        self._failures += 1
+        if self._state == BreakerState.HALF_OPEN or self._failures >= self.failure_threshold:
+            self._state = BreakerState.OPEN
+            self._opened_at = self._clock()
+
+    def stats(self) -> dict:
+        """State, failure streak and rejection count."""
+        return {
+            "state": self.state.value,
+            "consecutive_failures": self._failures,
+            "rejected": self.rejected,
+        }
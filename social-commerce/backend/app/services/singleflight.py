@@ -0,0 +1,60 @@
+"""
+Request coalescing ("single-flight") for asyncio.
+
+Concurrent callers asking for the same key share one in-flight execution
+instead of each starting their own.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one execution.
+
+    The work runs in its own task and every caller awaits it through
+    `asyncio.shield`, so:
+    - a result or exception is delivered to every waiter;
+    - cancelling one waiter never cancels the shared work or other waiters;
+    - the work still completes (e.g. to fill a cache) if every waiter leaves.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, asyncio.Task] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run `fn` for `key`, or join the call already in flight for it.
+
+        Args:
+            key: Identity of the work; equal keys share one execution.
+            fn: Zero-argument coroutine factory performing the work.
+
+        Returns:
+            The shared result.
+        """
+        task = self._calls.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        else:
+            self.coalesced += 1
+
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception as retrieved in case every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
@@ -1,11 +1,32 @@
+import asyncio
 import base64
+import hashlib
 import logging
+import os
+import time
+import unicodedata
+from dataclasses import dataclass
 from enum import Enum
 
 import httpx
 
+from app.services.metrics import metrics
+from app.services.resilience import AdaptiveLimiter, CircuitBreaker
+
 logger = logging.getLogger(__name__)
 
+# Upstream latency by (operation, outcome), looked up once here
+_UPSTREAM_SECONDS = {
+    (operation, outcome): metrics.histogram(
+        "tts_upstream_duration_seconds",
+        "Google TTS call latency by operation and outcome.",
+        operation=operation,
+        outcome=outcome,
+    )
+    for operation in ("synthesize", "list_voices")
+    for outcome in ("ok", "error", "cancelled")
+}
+
 
 class VietnameseVoice(str, Enum):
     """High-quality Vietnamese voices from Google Cloud TTS."""
@@ -27,15 +48,190 @@ class VietnameseVoice(str, Enum):
     STANDARD_D = "vi-VN-Standard-D"  # Male
 
 
+# Use male Neural2-D voice for witty, humorous character
+DEFAULT_VOICE = VietnameseVoice.NEURAL2_D
+
+
+@dataclass(frozen=True)
+class SynthesisParams:
+    """
+    Fully resolved synthesis request.
+
+    Presets and the default voice are applied and the text is normalized,
+    so requests that would produce the same audio compare (and hash) equal.
+    """
+
+    text: str
+    voice: VietnameseVoice
+    speaking_rate: float
+    pitch: float
+
+    @classmethod
+    def resolve(
+            cls,
+            text: str,
+            voice: VietnameseVoice | None = None,
+            preset: str | None = None,
+            speaking_rate: float = 1.0,
+            pitch: float = 0.0,
+    ) -> "SynthesisParams":
+        """
+        Resolve user-facing options into synthesis parameters.
+
+        A known preset supplies the voice (unless one is given) and always
+        overrides speaking rate and pitch.
+        """
+        if preset and preset in VOICE_PRESETS:
+            settings = VOICE_PRESETS[preset]
+            voice = voice or settings["voice"]
+            speaking_rate = settings["speaking_rate"]
+            pitch = settings["pitch"]
+
+        return cls(
+            text=unicodedata.normalize("NFC", " ".join(text.split())),
+            voice=voice or DEFAULT_VOICE,
+            speaking_rate=round(float(speaking_rate), 3),
+            pitch=round(float(pitch), 3),
+        )
+
+    @property
+    def cache_key(self) -> str:
+        """Stable content-addressed key (SHA-256 hex) for these parameters."""
+        raw = f"v1\x1f{self.voice.value}\x1f{self.speaking_rate!r}\x1f{self.pitch!r}\x1f{self.text}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
 class GoogleTTSService:
     """Google Cloud Text-to-Speech service for Vietnamese."""
 
     BASE_URL = "https://texttospeech.googleapis.com/v1"
 
-    def __init__(self, api_key: str):
+    def __init__(
+            self,
+            api_key: str,
+            client: httpx.AsyncClient | None = None,
+            base_url: str = BASE_URL,
+            max_in_flight: int = 32,
+            timeout: float = 30.0,
+            limiter: AdaptiveLimiter | None = None,
+            breaker: CircuitBreaker | None = None,
+    ):
+        """
+        Initialize the service.
+
+        The service is meant to live for the whole application: it owns one
+        pooled HTTP client so connections (and their TLS sessions) are
+        reused across requests. Call `aclose` on shutdown.
+
+        Upstream calls go through an adaptive concurrency limiter and a
+        circuit breaker; when either rejects a call, `UpstreamUnavailable`
+        is raised after at most a short wait for a slot, instead of queueing
+        behind a slow upstream.
+
+        Args:
+            api_key: Google Cloud API key.
+            client: Shared HTTP client; a pooled one is created when omitted.
+            base_url: API root, overridable to point at a local stub.
+            max_in_flight: Upper bound for the adaptive concurrency limit.
+            timeout: Per-request timeout for synthesis, in seconds.
+            limiter: Concurrency limiter; a default one is created when omitted.
+            breaker: Circuit breaker; a default one is created when omitted.
+        """
         self.api_key = api_key
-        # Use male Neural2-D voice for witty, humorous character
-        self.default_voice = VietnameseVoice.NEURAL2_D
+        self.default_voice = DEFAULT_VOICE
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self._client = client or create_http_client()
+        self.limiter = limiter or AdaptiveLimiter(
+            initial_limit=min(8, max_in_flight),
+            max_limit=max_in_flight,
+        )
+        self.breaker = breaker or CircuitBreaker()
+
+    @classmethod
+    def from_env(cls, api_key: str) -> "GoogleTTSService":
+        """
+        Build the service with pool settings from the environment.
+
+        Reads GOOGLE_TTS_BASE_URL, TTS_HTTP2, TTS_MAX_CONNECTIONS,
+        TTS_MAX_KEEPALIVE, TTS_KEEPALIVE_EXPIRY, TTS_MAX_IN_FLIGHT,
+        TTS_TIMEOUT_SECONDS, TTS_LATENCY_TARGET_SECONDS, TTS_LIMITER_WAIT_SECONDS,
+        TTS_PREFETCH_SHARE, TTS_BREAKER_FAILURES and TTS_BREAKER_RESET_SECONDS.
+        """
+        max_in_flight = int(os.getenv("TTS_MAX_IN_FLIGHT", "32"))
+        client = create_http_client(
+            http2=os.getenv("TTS_HTTP2", "true").lower() in ("1", "true", "yes"),
+            max_connections=int(os.getenv("TTS_MAX_CONNECTIONS", "20")),
+            max_keepalive=int(os.getenv("TTS_MAX_KEEPALIVE", "10")),
+            keepalive_expiry=float(os.getenv("TTS_KEEPALIVE_EXPIRY", "60")),
+        )
+        return cls(
+            api_key,
+            client=client,
+            base_url=os.getenv("GOOGLE_TTS_BASE_URL", cls.BASE_URL),
+            max_in_flight=max_in_flight,
+            timeout=float(os.getenv("TTS_TIMEOUT_SECONDS", "30")),
+            limiter=AdaptiveLimiter(
+                initial_limit=min(8, max_in_flight),
+                max_limit=max_in_flight,
+                latency_target=float(os.getenv("TTS_LATENCY_TARGET_SECONDS", "2")),
+                max_wait=float(os.getenv("TTS_LIMITER_WAIT_SECONDS", "1")),
+                background_share=float(os.getenv("TTS_PREFETCH_SHARE", "0.5")),
+            ),
+            breaker=CircuitBreaker(
+                failure_threshold=int(os.getenv("TTS_BREAKER_FAILURES", "5")),
+                reset_timeout=float(os.getenv("TTS_BREAKER_RESET_SECONDS", "30")),
+            ),
+        )
+
+    async def aclose(self) -> None:
+        """Close pooled connections."""
+        await self._client.aclose()
+
+    def stats(self) -> dict:
+        """Circuit breaker and concurrency limiter state."""
+        return {"breaker": self.breaker.stats(), "limiter": self.limiter.stats()}
+
+    async def _send(
+            self,
+            operation: str,
+            method: str,
+            url: str,
+            background: bool = False,
+            **kwargs,
+    ) -> httpx.Response:
+        """
+        Send one upstream request through the limiter and circuit breaker.
+
+        Transport errors, 429 and 5xx responses count as failures. Latency
+        of calls that reached upstream is recorded per operation and outcome.
+        Background calls run in the limiter's background share.
+
+        Raises:
+            UpstreamUnavailable: If the limiter or breaker rejects the call.
+        """
+        started = await self.limiter.acquire(background)
+        try:
+            self.breaker.acquire()
+        except BaseException:
+            self.limiter.release(started, None, background)
+            raise
+
+        healthy: bool | None = False
+        sent_at = time.perf_counter()
+        try:
+            response = await self._client.request(method, url, **kwargs)
+            healthy = response.status_code < 500 and response.status_code != 429
+            return response
+        except asyncio.CancelledError:
+            # The caller went away; says nothing about upstream health
+            healthy = None
+            raise
+        finally:
+            self.breaker.record(healthy)
+            self.limiter.release(started, healthy, background)
+            outcome = "cancelled" if healthy is None else "ok" if healthy else "error"
+            _UPSTREAM_SECONDS[operation, outcome].observe(time.perf_counter() - sent_at)
 
     async def synthesize(
             self,
@@ -43,6 +239,7 @@ class GoogleTTSService:
             voice: VietnameseVoice | None = None,
             speaking_rate: float = 1.0,
             pitch: float = 0.0,
+            background: bool = False,
     ) -> bytes:
         """
         Synthesize speech from text.
@@ -52,6 +249,8 @@ class GoogleTTSService:
             voice: Vietnamese voice to use (defaults to Neural2-A female)
             speaking_rate: Speed of speech (0.25 to 4.0, default 1.0)
             pitch: Voice pitch (-20.0 to 20.0 semitones, default 0.0)
+            background: Not serving a user request (pre-synthesis); shed
+                first under load
 
         Returns:
             MP3 audio bytes
@@ -73,32 +272,64 @@ class GoogleTTSService:
             },
         }
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{self.BASE_URL}/text:synthesize",
-                params={"key": self.api_key},
-                json=payload,
-                timeout=30.0,
-            )
-            response.raise_for_status()
+        response = await self._send(
+            "synthesize",
+            "POST",
+            f"{self.base_url}/text:synthesize",
+            background=background,
+            params={"key": self.api_key},
+            json=payload,
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
 
-            data = response.json()
-            audio_content = data.get("audioContent", "")
+        data = response.json()
+        audio_content = data.get("audioContent", "")
 
-            return base64.b64decode(audio_content)
+        return base64.b64decode(audio_content)
 
     async def list_voices(self) -> list[dict]:
         """List all available Vietnamese voices."""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.BASE_URL}/voices",
-                params={"key": self.api_key, "languageCode": "vi-VN"},
-                timeout=10.0,
-            )
-            response.raise_for_status()
-
-            data = response.json()
-            return data.get("voices", [])
+        response = await self._send(
+            "list_voices",
+            "GET",
+            f"{self.base_url}/voices",
+            params={"key": self.api_key, "languageCode": "vi-VN"},
+            timeout=10.0,
+        )
+        response.raise_for_status()
+
+        data = response.json()
+        return data.get("voices", [])
+
+
+def create_http_client(
+        http2: bool = True,
+        max_connections: int = 20,
+        max_keepalive: int = 10,
+        keepalive_expiry: float = 60.0,
+) -> httpx.AsyncClient:
+    """
+    Create a pooled keep-alive client for the Google APIs.
+
+    HTTP/2 needs the `h2` package (httpx[http2]); without it the client
+    falls back to pooled HTTP/1.1.
+    """
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("h2 not installed, using HTTP/1.1 for Google TTS")
+            http2 = False
+
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry,
+        ),
+    )
 
 
 # Voice presets for different moods/contexts
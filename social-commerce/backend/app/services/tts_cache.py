@@ -0,0 +1,436 @@
+"""
+Two-tier cache for synthesized TTS audio.
+
+Entries are keyed by `SynthesisParams.cache_key`, so identical
+(text, voice, rate, pitch) requests share one entry. The memory tier is an
+LRU bounded by total bytes; the optional disk tier survives restarts and
+is swept from time to time so it stays under its own byte budget. Both
+tiers expire entries after a TTL. The cache also remembers the parameters
+behind recent keys, so audio addressed by key alone can be re-synthesized
+after it has been evicted.
+
+The disk tier can be shared by several worker processes. Misses are then
+coalesced across processes too: the worker filling a key holds an
+advisory lock, and the others wait on that lock and read the result from
+disk instead of synthesizing the same audio again. All keys share one
+lock file, each locking a single byte at an offset derived from the key,
+so unrelated keys never wait on each other and no lock files pile up.
+"""
+
+import asyncio
+import errno
+import fcntl
+import logging
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable
+
+from app.services.singleflight import SingleFlight
+from app.services.tts import GoogleTTSService, SynthesisParams
+
+logger = logging.getLogger(__name__)
+
+# Lock file of the disk tier; each key locks one byte of it
+_LOCK_NAME = "fill.lock"
+
+
+class _MemoryTier:
+    """LRU of audio bytes bounded by total size, with per-entry expiry."""
+
+    def __init__(self, max_bytes: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, now: float) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, audio = entry
+        if expires_at <= now:
+            self._remove(key)
+            self.expirations += 1
+            return None
+
+        self._entries.move_to_end(key)
+        return audio
+
+    def put(self, key: str, audio: bytes, now: float) -> None:
+        if len(audio) > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        while self._entries and self.size + len(audio) > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+        self._entries[key] = (now + self.ttl, audio)
+        self.size += len(audio)
+
+    def _remove(self, key: str) -> None:
+        _, audio = self._entries.pop(key)
+        self.size -= len(audio)
+
+
+class _DiskTier:
+    """
+    One file per entry under a two-level fan-out directory; expiry by mtime.
+
+    Expired files are only noticed when read, so the directory is swept
+    after every `max_bytes // 10` bytes written: expired files are removed,
+    then the oldest ones until the tier is back under 90% of `max_bytes`.
+    The first write of a process sweeps too, picking up what earlier runs
+    left behind.
+    """
+
+    def __init__(self, directory: Path, ttl: float, max_bytes: int):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.sweeps = 0
+        self.lock_waits = 0
+        self._written = max_bytes // 10
+        self._sweeping = False
+        self._lock_fd: int | None = None
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.mp3"
+
+    @staticmethod
+    def _lock_offset(key: str) -> int:
+        # Keys are SHA-256 hex: 56 bits of one make collisions negligible
+        return int(key[:14], 16)
+
+    def _lock_file(self) -> int:
+        # One descriptor per process: POSIX locks belong to the process,
+        # and closing any descriptor of the file would drop all of them
+        if self._lock_fd is None:
+            self._lock_fd = os.open(self.directory / _LOCK_NAME, os.O_RDWR | os.O_CREAT, 0o644)
+        return self._lock_fd
+
+    def get(self, key: str, now: float) -> bytes | None:
+        path = self._path(key)
+        try:
+            if path.stat().st_mtime + self.ttl <= now:
+                path.unlink(missing_ok=True)
+                self.expirations += 1
+                return None
+            return path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+    @asynccontextmanager
+    async def lock(self, key: str, timeout: float, poll: float = 0.05) -> AsyncIterator[bool]:
+        """
+        Hold the cross-process fill lock of a key.
+
+        Polls a non-blocking byte-range lock, so waiting ties up no thread.
+        Gives up after `timeout` (a stuck holder must not block synthesis
+        forever). Locks of one process never conflict with each other;
+        within a process, fills of a key are already coalesced.
+
+        Yields:
+            Whether the lock was acquired.
+        """
+        offset = self._lock_offset(key)
+        try:
+            fd = self._lock_file()
+        except OSError as e:
+            logger.warning(f"TTS disk cache lock failed: {e}")
+            yield False
+            return
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                fcntl.lockf(fd, fcntl.LOCK_EX | fcntl.LOCK_NB, 1, offset)
+                acquired = True
+                break
+            except OSError as e:
+                if e.errno not in (errno.EACCES, errno.EAGAIN):
+                    logger.warning(f"TTS disk cache lock failed: {e}")
+                    acquired = False
+                    break
+                if time.monotonic() >= deadline:
+                    acquired = False
+                    break
+                self.lock_waits += 1
+                await asyncio.sleep(poll)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                fcntl.lockf(fd, fcntl.LOCK_UN, 1, offset)
+
+    def put(self, key: str, audio: bytes) -> None:
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        # Write then rename so readers never see a partial file
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(audio)
+            os.replace(tmp, path)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+        self._written += len(audio)
+        self.size += len(audio)
+
+    def sweep_due(self) -> bool:
+        """Whether enough has been written since the last sweep; claims the sweep."""
+        if self._sweeping or self._written < self.max_bytes // 10:
+            return False
+        self._sweeping = True
+        return True
+
+    def sweep(self, now: float) -> None:
+        """Remove expired files, then the oldest until under the low-water mark."""
+        try:
+            files = []
+            for entry in os.scandir(self.directory):
+                if entry.is_dir():
+                    for f in os.scandir(entry.path):
+                        if f.name.endswith((".mp3", ".tmp")):
+                            files.append(f)
+                        elif f.name.endswith(".lock"):
+                            # Lock file left by an older version
+                            Path(f.path).unlink(missing_ok=True)
+
+            live = []
+            for f in files:
+                try:
+                    stat = f.stat()
+                except FileNotFoundError:
+                    continue
+                # A .tmp file older than the TTL belongs to a writer that died
+                if stat.st_mtime + self.ttl <= now:
+                    Path(f.path).unlink(missing_ok=True)
+                    if f.name.endswith(".mp3"):
+                        self.expirations += 1
+                elif f.name.endswith(".mp3"):
+                    live.append((stat.st_mtime, stat.st_size, f.path))
+
+            size = sum(entry_size for _, entry_size, _ in live)
+            if size > self.max_bytes:
+                low_water = self.max_bytes * 9 // 10
+                live.sort()
+                for _, entry_size, path in live:
+                    if size <= low_water:
+                        break
+                    Path(path).unlink(missing_ok=True)
+                    size -= entry_size
+                    self.evictions += 1
+            self.size = size
+            self.sweeps += 1
+        finally:
+            self._written = 0
+            self._sweeping = False
+
+
+class TTSCache:
+    """
+    Synthesis cache with an in-memory LRU tier and an optional disk tier.
+
+    Disk hits are promoted into memory. Disk I/O runs in a worker thread so
+    it never blocks the event loop. Concurrent misses for the same key are
+    coalesced into a single synthesis.
+    """
+
+    def __init__(
+            self,
+            max_bytes: int = 64 * 1024 * 1024,
+            ttl: float = 24 * 3600,
+            disk_dir: str | Path | None = None,
+            disk_max_bytes: int = 1024 * 1024 * 1024,
+            clock: Callable[[], float] = time.time,
+            max_params: int = 10_000,
+            lock_timeout: float = 60.0,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Memory tier budget in bytes of audio.
+            ttl: Seconds an entry stays valid in either tier.
+            disk_dir: Directory for the disk tier; disabled when None.
+            disk_max_bytes: Disk tier budget in bytes of audio.
+            clock: Wall-clock time source (disk expiry uses file mtimes).
+            max_params: How many recent keys keep their synthesis parameters.
+            lock_timeout: Longest wait for another process filling the
+                same key before synthesizing anyway.
+        """
+        self._clock = clock
+        self._memory = _MemoryTier(max_bytes, ttl)
+        self._disk = _DiskTier(Path(disk_dir), ttl, disk_max_bytes) if disk_dir else None
+        self._flights = SingleFlight()
+        self._params: OrderedDict[str, SynthesisParams] = OrderedDict()
+        self._max_params = max_params
+        self._lock_timeout = lock_timeout
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> "TTSCache":
+        """Build a cache from TTS_CACHE_MAX_BYTES, TTS_CACHE_TTL_SECONDS, TTS_CACHE_DIR and TTS_CACHE_DISK_MAX_BYTES."""
+        return cls(
+            max_bytes=int(os.getenv("TTS_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+            ttl=float(os.getenv("TTS_CACHE_TTL_SECONDS", str(24 * 3600))),
+            disk_dir=os.getenv("TTS_CACHE_DIR") or None,
+            disk_max_bytes=int(os.getenv("TTS_CACHE_DISK_MAX_BYTES", str(1024 * 1024 * 1024))),
+        )
+
+    async def get(self, key: str) -> bytes | None:
+        """Look up audio by key in memory, then on disk."""
+        audio = await self._lookup(key)
+        if audio is None:
+            self.misses += 1
+        return audio
+
+    async def _lookup(self, key: str) -> bytes | None:
+        """Like `get`, counting hits but leaving misses to the caller."""
+        now = self._clock()
+        audio = self._memory.get(key, now)
+        if audio is not None:
+            self.memory_hits += 1
+            return audio
+
+        if self._disk is not None:
+            try:
+                audio = await asyncio.to_thread(self._disk.get, key, now)
+            except OSError as e:
+                logger.warning(f"TTS disk cache read failed: {e}")
+                audio = None
+            if audio is not None:
+                self.disk_hits += 1
+                self._memory.put(key, audio, now)
+                return audio
+        return None
+
+    async def put(self, key: str, audio: bytes) -> None:
+        """Store audio in every tier."""
+        now = self._clock()
+        self._memory.put(key, audio, now)
+        if self._disk is not None:
+            try:
+                await asyncio.to_thread(self._disk.put, key, audio)
+                if self._disk.sweep_due():
+                    await asyncio.to_thread(self._disk.sweep, now)
+            except OSError as e:
+                logger.warning(f"TTS disk cache write failed: {e}")
+
+    async def get_or_synthesize(
+            self,
+            key: str,
+            synthesize: Callable[[], Awaitable[bytes]],
+    ) -> bytes:
+        """
+        Return cached audio for key, synthesizing and storing it on a miss.
+
+        Callers that miss while a synthesis for the same key is in flight
+        wait for that synthesis instead of starting another one. Each call
+        counts as one hit or one miss.
+        """
+        audio = await self._lookup(key)
+        if audio is not None:
+            return audio
+        self.misses += 1
+
+        async def fill() -> bytes:
+            # A flight for this key may have finished since our lookup
+            audio = self._memory.get(key, self._clock())
+            if audio is not None:
+                return audio
+            if self._disk is None:
+                audio = await synthesize()
+                await self.put(key, audio)
+                return audio
+
+            async with self._disk.lock(key, self._lock_timeout):
+                # Another process may have filled it while we waited
+                now = self._clock()
+                try:
+                    audio = await asyncio.to_thread(self._disk.get, key, now)
+                except OSError:
+                    audio = None
+                if audio is not None:
+                    self._memory.put(key, audio, now)
+                    return audio
+                audio = await synthesize()
+                await self.put(key, audio)
+                return audio
+
+        return await self._flights.do(key, fill)
+
+    async def synthesize(self, service: GoogleTTSService, params: SynthesisParams) -> bytes:
+        """Return audio for params, synthesizing through service on a miss."""
+        self.remember(params)
+        return await self.get_or_synthesize(
+            params.cache_key,
+            lambda: service.synthesize(
+                text=params.text,
+                voice=params.voice,
+                speaking_rate=params.speaking_rate,
+                pitch=params.pitch,
+            ),
+        )
+
+    def remember(self, params: SynthesisParams) -> str:
+        """Record the parameters behind a key; returns the key."""
+        key = params.cache_key
+        self._params[key] = params
+        self._params.move_to_end(key)
+        while len(self._params) > self._max_params:
+            self._params.popitem(last=False)
+        return key
+
+    def params_for(self, key: str) -> SynthesisParams | None:
+        """Parameters last remembered for key, if still known."""
+        return self._params.get(key)
+
+    def stats(self) -> dict:
+        """Hit/miss/eviction counters and current memory usage."""
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "hits": hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "evictions": self._memory.evictions,
+            "expirations": self._memory.expirations + (self._disk.expirations if self._disk else 0),
+            "entries": len(self._memory),
+            "bytes": self._memory.size,
+            "max_bytes": self._memory.max_bytes,
+            "disk_enabled": self._disk is not None,
+            "disk_bytes": self._disk.size if self._disk else 0,
+            "disk_max_bytes": self._disk.max_bytes if self._disk else 0,
+            "disk_evictions": self._disk.evictions if self._disk else 0,
+            "disk_sweeps": self._disk.sweeps if self._disk else 0,
+            "disk_lock_waits": self._disk.lock_waits if self._disk else 0,
+            "in_flight": len(self._flights),
+            "coalesced": self._flights.coalesced,
+        }
+
+
+# Shared audio cache (configured from the environment)
+audio_cache = TTSCache.from_env()
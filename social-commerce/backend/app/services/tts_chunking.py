@@ -0,0 +1,109 @@
+"""
+Sentence-level chunking of Vietnamese text for streamed synthesis.
+
+Text is split at sentence punctuation, without breaking on common Vietnamese
+abbreviations (TP., ThS., v.v. ...) or on dots inside numbers such as
+1.000.000. Sentences longer than the chunk limit are split again at clause
+punctuation and, as a last resort, at word boundaries.
+"""
+
+import re
+
+# Abbreviations that end with a dot but rarely end a sentence (lowercased)
+VIETNAMESE_ABBREVIATIONS = frozenset({
+    "tp", "q", "p", "tx", "tt", "h", "ths", "ts", "pgs", "gs", "bs", "ks",
+    "cn", "ong", "ông", "bà", "st", "tr", "sdt", "sđt", "đt", "v.v", "vv",
+    "mr", "mrs", "ms", "dr", "no",
+})
+
+# Sentence end: terminators, optional closing quotes/brackets, then whitespace
+_SENTENCE_END = re.compile(r"(?:[.!?…]+|\.{3})[\"'”’»)\]]*(?=\s)")
+_CLAUSE_BREAK = re.compile(r"[,;:–—](?=\s)")
+
+
+def split_sentences(text: str, max_chars: int = 300, min_chars: int = 12) -> list[str]:
+    """
+    Split text into synthesis chunks at sentence boundaries.
+
+    Args:
+        text: Input text.
+        max_chars: Upper bound on chunk length.
+        min_chars: Sentences shorter than this are merged into the next one
+            so tiny fragments don't cost a request each.
+
+    Returns:
+        Non-empty chunks that join (with spaces) back into the text.
+    """
+    sentences: list[str] = []
+    start = 0
+    for match in _SENTENCE_END.finditer(text):
+        end = match.end()
+        if _ends_with_abbreviation(text[start:match.start() + 1]):
+            continue
+        sentences.append(text[start:end])
+        start = end
+    sentences.append(text[start:])
+
+    chunks: list[str] = []
+    pending = ""
+    for sentence in sentences:
+        sentence = " ".join(sentence.split())
+        if not sentence:
+            continue
+        sentence = f"{pending} {sentence}" if pending else sentence
+        if len(sentence) < min_chars:
+            pending = sentence
+            continue
+        pending = ""
+        chunks.extend(_split_long(sentence, max_chars))
+
+    if pending:
+        if chunks and len(chunks[-1]) + len(pending) < max_chars:
+            chunks[-1] = f"{chunks[-1]} {pending}"
+        else:
+            chunks.append(pending)
+    return chunks
+
+
+def _ends_with_abbreviation(segment: str) -> bool:
+    """Whether the word ending at the segment's final dot is a known abbreviation."""
+    if not segment.endswith("."):
+        return False
+    words = segment[:-1].split()
+    return bool(words) and words[-1].lower().lstrip("(\"'“") in VIETNAMESE_ABBREVIATIONS
+
+
+def _split_long(sentence: str, max_chars: int) -> list[str]:
+    """Break an over-long sentence at clause punctuation, then at spaces."""
+    if len(sentence) <= max_chars:
+        return [sentence]
+
+    parts: list[str] = []
+    current = ""
+    for clause in _split_keep(_CLAUSE_BREAK, sentence):
+        candidate = f"{current} {clause}".strip()
+        if len(candidate) <= max_chars:
+            current = candidate
+            continue
+        if current:
+            parts.append(current)
+        current = clause
+        while len(current) > max_chars:
+            cut = current.rfind(" ", 0, max_chars + 1)
+            cut = cut if cut > 0 else max_chars
+            parts.append(current[:cut].strip())
+            current = current[cut:].strip()
+    if current:
+        parts.append(current)
+    return parts
+
+
+def _split_keep(pattern: re.Pattern, text: str) -> list[str]:
+    """Split after each match, keeping the punctuation with its clause."""
+    pieces = []
+    start = 0
+    for match in pattern.finditer(text):
+        pieces.append(text[start:match.end()].strip())
+        start = match.end()
+    pieces.append(text[start:].strip())
+    return [p for p in pieces if p]
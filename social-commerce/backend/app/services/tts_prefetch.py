@@ -0,0 +1,167 @@
+"""
+Background pre-synthesis of feed greetings.
+
+Feed items are spoken the moment they scroll into view, so waiting for
+Google TTS at that point is user-visible latency. The prefetcher pushes
+greetings through the shared audio cache ahead of time, with a fixed number
+of workers and a request rate limit so a feed reload cannot flood the
+upstream API. Its calls are background calls: they only use a share of
+the upstream concurrency window and are shed before user requests.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable
+
+from app.services.resilience import UpstreamUnavailable
+from app.services.tts import GoogleTTSService, SynthesisParams
+from app.services.tts_cache import TTSCache, audio_cache
+
+logger = logging.getLogger(__name__)
+
+# Feed mood -> voice preset (same mapping the front-end uses)
+MOOD_PRESETS = {
+    "happy": "friendly",
+    "excited": "excited",
+    "curious": "friendly",
+    "sleepy": "sleepy",
+    "surprised": "surprised",
+    "love": "love",
+}
+
+
+def greeting_params(greeting: str, mood: str) -> SynthesisParams:
+    """Synthesis parameters for a feed greeting spoken in its mood's preset."""
+    return SynthesisParams.resolve(text=greeting, preset=MOOD_PRESETS.get(mood, "friendly"))
+
+
+class TTSPrefetcher:
+    """
+    Queue of synthesis jobs drained by background workers.
+
+    Jobs are deduplicated by cache key while pending. Audio already in the
+    cache costs no upstream request and no rate-limit slot.
+    """
+
+    def __init__(
+            self,
+            cache: TTSCache = audio_cache,
+            concurrency: int = 2,
+            rate: float = 5.0,
+            clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the prefetcher.
+
+        Args:
+            cache: Cache the audio is stored in.
+            concurrency: Number of worker tasks (max parallel syntheses).
+            rate: Maximum upstream syntheses started per second.
+            clock: Monotonic time source for rate limiting.
+        """
+        self.cache = cache
+        self.concurrency = concurrency
+        self.interval = 1.0 / rate
+        self._clock = clock
+        self._pending: OrderedDict[str, SynthesisParams] = OrderedDict()
+        self._wakeup: asyncio.Event | None = None
+        self._workers: list[asyncio.Task] = []
+        self._service: GoogleTTSService | None = None
+        self._next_slot = 0.0
+        self.completed = 0
+        self.failed = 0
+
+    @classmethod
+    def from_env(cls) -> "TTSPrefetcher":
+        """Build a prefetcher from TTS_PREFETCH_CONCURRENCY and TTS_PREFETCH_RATE."""
+        return cls(
+            concurrency=int(os.getenv("TTS_PREFETCH_CONCURRENCY", "2")),
+            rate=float(os.getenv("TTS_PREFETCH_RATE", "5")),
+        )
+
+    def schedule(self, params: Iterable[SynthesisParams]) -> int:
+        """
+        Queue audio for pre-synthesis.
+
+        Jobs can be queued before `start`; they run once workers exist.
+
+        Returns:
+            How many new jobs were queued.
+        """
+        queued = 0
+        for p in params:
+            key = self.cache.remember(p)
+            if key not in self._pending:
+                self._pending[key] = p
+                queued += 1
+        if queued and self._wakeup is not None:
+            self._wakeup.set()
+        return queued
+
+    def start(self, service: GoogleTTSService) -> None:
+        """Start the workers; call from inside the running event loop."""
+        self._service = service
+        self._wakeup = asyncio.Event()
+        if self._pending:
+            self._wakeup.set()
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+
+    async def stop(self) -> None:
+        """Cancel the workers; pending jobs stay queued."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._wakeup = None
+
+    def stats(self) -> dict:
+        """Queue length and job outcome counters."""
+        return {
+            "pending": len(self._pending),
+            "completed": self.completed,
+            "failed": self.failed,
+            "running": bool(self._workers),
+        }
+
+    async def _work(self) -> None:
+        while True:
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            key, params = self._pending.popitem(last=False)
+            try:
+                await self.cache.get_or_synthesize(key, lambda: self._synthesize(params))
+                self.completed += 1
+            except UpstreamUnavailable as e:
+                # Upstream is shedding load: requeue and back off
+                self._pending[key] = params
+                self._pending.move_to_end(key, last=False)
+                await asyncio.sleep(e.retry_after)
+            except Exception as e:
+                self.failed += 1
+                logger.warning(f"TTS prefetch failed for {key[:12]}: {e}")
+
+    async def _synthesize(self, params: SynthesisParams) -> bytes:
+        """Wait for a rate-limit slot, then call the upstream API."""
+        now = self._clock()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+        return await self._service.synthesize(
+            text=params.text,
+            voice=params.voice,
+            speaking_rate=params.speaking_rate,
+            pitch=params.pitch,
+            background=True,
+        )
+
+
+# Shared prefetcher, started in the app lifespan
+prefetcher = TTSPrefetcher.from_env()
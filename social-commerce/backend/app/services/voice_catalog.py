@@ -0,0 +1,133 @@
+"""
+In-process cache of the Google TTS voice catalog.
+
+The Vietnamese voice list almost never changes, so it is fetched once and
+then refreshed in the background (stale-while-revalidate): callers always
+get the cached catalog immediately, and a failed refresh keeps serving the
+last known one. Each snapshot carries its pre-serialized response body and
+a strong ETag derived from it.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from app.services.singleflight import SingleFlight
+from app.services.tts import VOICE_PRESETS
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """One fetched catalog with its serialized response and validator."""
+    voices: list[dict]
+    body: bytes
+    etag: str
+    fetched_at: float
+
+
+def build_snapshot(voices: list[dict], fetched_at: float) -> CatalogSnapshot:
+    """Serialize the voices endpoint payload and tag it with a content hash."""
+    payload = {
+        "success": True,
+        "data": {
+            "voices": voices,
+            "presets": list(VOICE_PRESETS.keys()),
+        },
+    }
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+    return CatalogSnapshot(voices=voices, body=body, etag=etag, fetched_at=fetched_at)
+
+
+class VoiceCatalog:
+    """Voice catalog with a refresh interval and stale-while-revalidate."""
+
+    def __init__(
+            self,
+            refresh_interval: float = 3600.0,
+            retry_interval: float = 60.0,
+            clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize the catalog.
+
+        Args:
+            refresh_interval: Seconds before a snapshot is refreshed.
+            retry_interval: Seconds to wait after a failed refresh before
+                trying upstream again.
+            clock: Monotonic time source.
+        """
+        self.refresh_interval = refresh_interval
+        self.retry_interval = retry_interval
+        self._clock = clock
+        self._snapshot: CatalogSnapshot | None = None
+        self._next_refresh = 0.0
+        self._flights = SingleFlight()
+        self._refresh_task: asyncio.Task | None = None
+        self.refreshes = 0
+        self.failures = 0
+
+    @classmethod
+    def from_env(cls) -> "VoiceCatalog":
+        """Build a catalog using TTS_VOICES_REFRESH_SECONDS."""
+        return cls(refresh_interval=float(os.getenv("TTS_VOICES_REFRESH_SECONDS", "3600")))
+
+    @property
+    def snapshot(self) -> CatalogSnapshot | None:
+        """Last successfully fetched catalog, if any."""
+        return self._snapshot
+
+    async def get(self, fetch: Callable[[], Awaitable[list[dict]]]) -> CatalogSnapshot:
+        """
+        Return the catalog, fetching it only when nothing is cached yet.
+
+        A due refresh runs in the background and the current snapshot is
+        returned right away.
+
+        Args:
+            fetch: Coroutine factory that loads the voice list upstream.
+
+        Raises:
+            Exception: Whatever `fetch` raised, if there is no snapshot to
+                fall back on.
+        """
+        if self._snapshot is None:
+            return await self._flights.do("voices", lambda: self._refresh(fetch))
+
+        if self._clock() >= self._next_refresh and self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh_in_background(fetch))
+        return self._snapshot
+
+    async def _refresh(self, fetch: Callable[[], Awaitable[list[dict]]]) -> CatalogSnapshot:
+        try:
+            voices = await fetch()
+        except Exception:
+            self.failures += 1
+            self._next_refresh = self._clock() + self.retry_interval
+            raise
+
+        now = self._clock()
+        snapshot = build_snapshot(voices, now)
+        self.refreshes += 1
+        self._next_refresh = now + self.refresh_interval
+        self._snapshot = snapshot
+        return snapshot
+
+    async def _refresh_in_background(self, fetch: Callable[[], Awaitable[list[dict]]]) -> None:
+        try:
+            await self._refresh(fetch)
+        except Exception as e:
+            logger.warning(f"Voice catalog refresh failed, serving last known catalog: {e}")
+        finally:
+            self._refresh_task = None
+
+
+# Shared voice catalog
+voice_catalog = VoiceCatalog.from_env()
@@ -0,0 +1,56 @@
+"""
+Fan-out latency of comment events to 10k subscribers in one process.
+
+Every subscriber is a task reading its subscription, just like an SSE
+response generator, minus the socket write. Reports the cost of one
+`publish` call and the delay until each subscriber has read the event.
+
+    python -m benchmarks.comment_fanout
+"""
+
+import asyncio
+import statistics
+import time
+
+from app.services.comment_events import CommentBroadcaster
+
+SUBSCRIBERS = 10_000
+EVENTS = 20
+INTERVAL = 0.05
+
+
+async def main() -> None:
+    broadcaster = CommentBroadcaster()
+    published_at: list[float] = []
+    delays: list[list[float]] = [[] for _ in range(EVENTS)]
+
+    async def subscriber() -> None:
+        subscription = broadcaster.subscribe("hot")
+        for i in range(EVENTS):
+            await subscription.next()
+            delays[i].append(time.perf_counter() - published_at[i])
+
+    tasks = [asyncio.create_task(subscriber()) for _ in range(SUBSCRIBERS)]
+    await asyncio.sleep(0.1)  # let every subscriber register
+
+    publish_costs = []
+    for i in range(EVENTS):
+        published_at.append(time.perf_counter())
+        broadcaster.publish("hot", "comment_created", {"id": str(i), "content": "Hay quá bà con ơi"})
+        publish_costs.append(time.perf_counter() - published_at[i])
+        await asyncio.sleep(INTERVAL)
+    await asyncio.gather(*tasks)
+
+    all_delays = sorted(d for event in delays for d in event)
+    last_delivery = [max(event) for event in delays]
+    print(f"{SUBSCRIBERS:,} subscribers, {EVENTS} events")
+    print(f"publish call      p50 {statistics.median(publish_costs) * 1e3:7.2f} ms")
+    print(
+        f"delivery          p50 {statistics.median(all_delays) * 1e3:7.2f} ms"
+        f"  p99 {all_delays[int(len(all_delays) * 0.99) - 1] * 1e3:7.2f} ms"
+    )
+    print(f"last subscriber   p50 {statistics.median(last_delivery) * 1e3:7.2f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,69 @@
+"""
+Comment write throughput under burst load: in-memory store vs SQLite (WAL)
+committing every insert on its own vs with group commit.
+
+    python -m benchmarks.comment_persistence
+"""
+
+import asyncio
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from app.schemas.comment import Comment
+from app.services.comment_sqlite import SQLiteCommentStore
+from app.services.comment_store import CommentStore, MemoryCommentStore
+
+INSERTS = 20_000
+CONCURRENCY = 500
+
+
+async def _burst(store: CommentStore) -> tuple[float, list[float]]:
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+    latencies: list[float] = []
+
+    async def one(i: int) -> None:
+        comment = Comment(
+            id=str(uuid.uuid4()),
+            feed_id=str(i % 8),
+            content="Hay quá bà con ơi",
+            creator="@chu_nam_saigon",
+            created_at=datetime.now(),
+        )
+        async with semaphore:
+            start = time.perf_counter()
+            await store.add(comment)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(INSERTS)))
+    return time.perf_counter() - start, latencies
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        cases = [
+            ("memory", MemoryCommentStore()),
+            ("sqlite, 1/commit", SQLiteCommentStore(Path(tmp) / "single.db", batch_max=1)),
+            ("sqlite, group", SQLiteCommentStore(Path(tmp) / "group.db", batch_max=256)),
+        ]
+        print(f"{INSERTS:,} inserts, {CONCURRENCY} concurrent")
+        for name, store in cases:
+            elapsed, latencies = await _burst(store)
+            ordered = sorted(latencies)
+            line = (
+                f"{name:<18} {INSERTS / elapsed:9.0f} inserts/s"
+                f"  p50 {statistics.median(ordered) * 1e3:7.2f} ms"
+                f"  p99 {ordered[int(len(ordered) * 0.99) - 1] * 1e3:7.2f} ms"
+            )
+            if isinstance(store, SQLiteCommentStore):
+                line += f"  avg batch {store.writes / store.batches:6.1f}"
+            print(line)
+            await store.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
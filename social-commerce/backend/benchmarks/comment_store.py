@@ -0,0 +1,105 @@
+"""
+Delete and list latency at 1M comments: the previous dict-of-lists store
+(linear scan to delete, sort on every read) vs `CommentRepository`, plus
+cursor page latency on a single hot feed item.
+
+    python -m benchmarks.comment_store
+"""
+
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from app.schemas.comment import Comment
+from app.services.comment_repository import CommentRepository
+
+TOTAL = 1_000_000
+FEEDS = 1_000
+DELETES = 50
+LISTS = 200
+HOT_FEED_COMMENTS = 100_000
+PAGE_SIZE = 50
+
+
+class _ListStore:
+    """Previous behaviour of the comments API."""
+
+    def __init__(self) -> None:
+        self.store: dict[str, list[Comment]] = {}
+
+    def add(self, comment: Comment) -> None:
+        self.store.setdefault(comment.feed_id, []).append(comment)
+
+    def list_comments(self, feed_id: str) -> list[Comment]:
+        return sorted(self.store.get(feed_id, []), key=lambda c: c.created_at, reverse=True)
+
+    def delete(self, comment_id: str) -> Comment | None:
+        for comments in self.store.values():
+            for i, comment in enumerate(comments):
+                if comment.id == comment_id:
+                    return comments.pop(i)
+        return None
+
+
+def _comments() -> list[Comment]:
+    start = datetime(2024, 1, 1)
+    return [
+        Comment.model_construct(
+            id=str(uuid.uuid4()),
+            feed_id=str(i % FEEDS),
+            content="Hay quá bà con ơi",
+            creator="@chu_nam_saigon",
+            created_at=start + timedelta(milliseconds=i),
+        )
+        for i in range(TOTAL)
+    ]
+
+
+def _time_each(fn, args) -> list[float]:
+    timings = []
+    for arg in args:
+        start = time.perf_counter()
+        fn(arg)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def _fmt(timings: list[float]) -> str:
+    return f"p50 {statistics.median(timings) * 1e3:9.3f} ms  max {max(timings) * 1e3:9.3f} ms"
+
+
+def main() -> None:
+    print(f"Building {TOTAL:,} comments over {FEEDS:,} feed items...")
+    comments = _comments()
+    rng = random.Random(42)
+    victims = [c.id for c in rng.sample(comments, DELETES)]
+    feeds = [str(rng.randrange(FEEDS)) for _ in range(LISTS)]
+
+    for name, store in (("dict of lists", _ListStore()), ("repository", CommentRepository())):
+        for comment in comments:
+            store.add(comment)
+        lists = _time_each(store.list_comments, feeds)
+        deletes = _time_each(store.delete, victims)
+        print(f"{name:<14} list   {_fmt(lists)}")
+        print(f"{'':<14} delete {_fmt(deletes)}")
+
+    # Hot item: full sorted read (previous GET) vs one cursor page
+    hot = _ListStore()
+    repository = CommentRepository()
+    for comment in comments[:HOT_FEED_COMMENTS]:
+        comment = comment.model_copy(update={"feed_id": "hot"})
+        hot.add(comment)
+        repository.add(comment)
+    cursors = [
+        (c.created_at, c.id)
+        for c in rng.sample(comments[:HOT_FEED_COMMENTS], LISTS)
+    ]
+    print(f"Hot feed item with {HOT_FEED_COMMENTS:,} comments")
+    print(f"{'sorted list':<14} get    {_fmt(_time_each(hot.list_comments, ['hot'] * LISTS))}")
+    print(f"{'cursor page':<14} get    {_fmt(_time_each(lambda c: repository.page('hot', PAGE_SIZE, c), cursors))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Cost of serving a feed page and of rescoring on comment activity as the
+catalog grows.
+
+    python -m benchmarks.feed_ranking
+"""
+
+import random
+import time
+from datetime import datetime, timedelta
+
+from app.schemas.feed import FeedItem
+from app.services.feed_ranking import FeedRanker
+
+SIZES = (1_000, 10_000, 100_000)
+PAGE_SIZE = 20
+ROUNDS = 2_000
+
+
+def _items(n: int) -> list[FeedItem]:
+    start = datetime(2025, 1, 1)
+    return [
+        FeedItem(
+            id=str(i),
+            title=f"Bài số {i}",
+            mood=random.choice(["happy", "excited", "curious", "surprised"]),
+            greeting="Sáng ra làm ly cà phê, ngồi ngẫm chuyện đời thấy cũng vui ha.",
+            creator="@chu_nam_saigon",
+            published_at=start + timedelta(minutes=random.randrange(60 * 24 * 30)),
+        )
+        for i in range(n)
+    ]
+
+
+def main() -> None:
+    print(f"page size {PAGE_SIZE}, {ROUNDS:,} rounds")
+    for size in SIZES:
+        ranker = FeedRanker()
+        ranker.load(_items(size))
+
+        # Walk into the middle of the feed, then time pages from there
+        cursor = None
+        for _ in range(size // PAGE_SIZE // 2):
+            entries, _ = ranker.page(PAGE_SIZE, after=cursor)
+            cursor = entries[-1].key
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            ranker.page(PAGE_SIZE, after=cursor)
+        page_cost = (time.perf_counter() - start) / ROUNDS
+
+        ids = [str(random.randrange(size)) for _ in range(ROUNDS)]
+        start = time.perf_counter()
+        for item_id in ids:
+            ranker.comment_added(item_id)
+        rescore_cost = (time.perf_counter() - start) / ROUNDS
+
+        print(
+            f"{size:>8,} items   page {page_cost * 1e6:7.2f} us"
+            f"   rescore on comment {rescore_cost * 1e6:7.2f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Requests per second on /pose/detect and /comments/{feed_id}: handlers
+returning models through FastAPI's default path (response_model
+validation, jsonable_encoder, json.dumps) vs the fast response layer
+(`app.api.responses`).
+
+Both apps have just these two routes with the same parameters and
+dependencies, run in-process without middleware, share one comment store
+holding PAGE_SIZE comments on the probed feed item, and are driven one
+request at a time, so the numbers are per-request CPU cost.
+
+    python -m benchmarks.json_responses
+"""
+
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import httpx
+from fastapi import APIRouter, Depends, FastAPI, Query
+
+from app.api.responses import FastJSONResponse
+from app.api.v1 import comments as comments_api, pose as pose_api
+from app.api.v1.comments import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    decode_cursor,
+    encode_cursor,
+    get_comment_store,
+)
+from app.api.v1.pose import DetailsQuery
+from app.schemas.comment import Comment, CommentsListResponse
+from app.schemas.pose import GestureResponse, PoseDetectionRequest, PoseDetectionResponse
+from app.services.comment_store import CommentStore, MemoryCommentStore
+from app.services.pose_detection import DetailLevel, detect_gesture
+from benchmarks.pose_offload import POSE_BODY
+
+ROUNDS = 5_000
+REPEATS = 5
+PAGE_SIZE = 50
+FEED_ID = "101"
+
+# The handlers as they were: return the model and let FastAPI validate and encode it
+legacy = APIRouter()
+
+
+@legacy.post("/v1/pose/detect", response_model=PoseDetectionResponse)
+async def legacy_detect(
+        request: PoseDetectionRequest,
+        details: DetailLevel = DetailsQuery,
+) -> PoseDetectionResponse:
+    result = detect_gesture([lm.model_dump() for lm in request.landmarks], details)
+    return PoseDetectionResponse(
+        success=True,
+        data=GestureResponse(**result),
+        message=f"Detected: {result['gesture']}",
+    )
+
+
+@legacy.get("/v1/comments/{feed_id}", response_model=CommentsListResponse)
+async def legacy_comments(
+        feed_id: str,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        before: str | None = Query(None),
+        store: CommentStore = Depends(get_comment_store),
+) -> CommentsListResponse:
+    cursor = decode_cursor(before) if before else None
+    comments, has_more = await store.page(feed_id, limit, before=cursor)
+    next_cursor = encode_cursor(comments[-1]) if has_more else None
+    return CommentsListResponse(success=True, data=comments, next_cursor=next_cursor)
+
+
+# The same two routes, served by the current handlers
+fast = APIRouter()
+fast.add_api_route(
+    "/v1/pose/detect", pose_api.detect_pose_gesture,
+    methods=["POST"], response_model=PoseDetectionResponse,
+)
+fast.add_api_route(
+    "/v1/comments/{feed_id}", comments_api.get_comments,
+    methods=["GET"], response_model=CommentsListResponse,
+)
+
+
+def _app(router: APIRouter, store: MemoryCommentStore, **kwargs) -> FastAPI:
+    app = FastAPI(**kwargs)
+    app.include_router(router, prefix="/api")
+    app.state.comment_store = store
+    return app
+
+
+async def _rate(client: httpx.AsyncClient, method: str, url: str, rounds: int, **kwargs) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await client.request(method, url, **kwargs)
+    return rounds / (time.perf_counter() - start)
+
+
+async def _compare(apps: dict[str, FastAPI], method: str, url: str, **kwargs) -> dict[str, float]:
+    """Best requests/s of each app; apps take turns so drift hits both alike."""
+    clients = {
+        name: httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+        for name, app in apps.items()
+    }
+    best = dict.fromkeys(apps, 0.0)
+    try:
+        for client in clients.values():
+            response = await client.request(method, url, **kwargs)
+            assert response.status_code == 200, response.text
+            await _rate(client, method, url, ROUNDS // 10, **kwargs)
+        for _ in range(REPEATS):
+            for name, client in clients.items():
+                best[name] = max(best[name], await _rate(client, method, url, ROUNDS // REPEATS, **kwargs))
+    finally:
+        for client in clients.values():
+            await client.aclose()
+    return best
+
+
+async def main() -> None:
+    store = MemoryCommentStore()
+    created = datetime(2026, 1, 1)
+    for i in range(PAGE_SIZE):
+        await store.add(Comment(
+            id=str(uuid.uuid4()),
+            feed_id=FEED_ID,
+            content=f"Bình luận số {i}, nghe giọng miền Tây thấy thương ghê!",
+            creator="@khach_quen",
+            created_at=created + timedelta(seconds=i),
+        ))
+
+    apps = {
+        "default": _app(legacy, store),
+        "fast": _app(fast, store, default_response_class=FastJSONResponse),
+    }
+    cases = [
+        ("POST /pose/detect", "POST", "/api/v1/pose/detect", {"json": POSE_BODY}),
+        (f"GET /comments ({PAGE_SIZE})", "GET", f"/api/v1/comments/{FEED_ID}?limit={PAGE_SIZE}", {}),
+    ]
+
+    print(f"{ROUNDS:,} sequential requests per app and case, best of {REPEATS} runs")
+    for name, method, url, kwargs in cases:
+        rates = await _compare(apps, method, url, **kwargs)
+        before, after = rates["default"], rates["fast"]
+        print(f"  {name:<22} default {before:7.0f} req/s   fast {after:7.0f} req/s   x{after / before:.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
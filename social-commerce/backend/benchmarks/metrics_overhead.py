@@ -0,0 +1,78 @@
+"""
+Cost of recording metrics: one histogram observation, one finished request,
+and the whole middleware around a trivial ASGI app.
+
+    python -m benchmarks.metrics_overhead
+"""
+
+import asyncio
+import time
+
+from app.api.metrics import MetricsMiddleware
+from app.services.metrics import MetricsRegistry
+
+ROUNDS = 200_000
+
+
+class _Route:
+    name = "detect_pose_gesture"
+
+
+async def _endpoint(scope, receive, send) -> None:
+    scope["route"] = _Route
+    await receive()
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b'{"success":true}'})
+
+
+async def _receive() -> dict:
+    return {"type": "http.request", "body": b'{"landmarks":[]}', "more_body": False}
+
+
+async def _send(message: dict) -> None:
+    pass
+
+
+def _per_call(fn, rounds: int = ROUNDS) -> float:
+    """Seconds per call, minus the cost of calling an empty lambda."""
+
+    def loop(f) -> float:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            f()
+        return time.perf_counter() - start
+
+    return (loop(fn) - loop(lambda: None)) / rounds
+
+
+async def _per_request(app, rounds: int) -> float:
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/api/v1/pose/detect",
+        "headers": [(b"host", b"localhost"), (b"content-type", b"application/json"), (b"content-length", b"16")],
+    }
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await app(dict(scope), _receive, _send)
+    return (time.perf_counter() - start) / rounds
+
+
+def main() -> None:
+    registry = MetricsRegistry()
+    histogram = registry.histogram("bench_seconds", "Benchmark.")
+
+    observe = _per_call(lambda: histogram.observe(0.0042))
+    record = _per_call(lambda: registry.record_request("detect_pose_gesture", "POST", 200, 0.0042, 1800, 120))
+
+    rounds = ROUNDS // 4
+    bare = asyncio.run(_per_request(_endpoint, rounds))
+    wrapped = asyncio.run(_per_request(MetricsMiddleware(_endpoint, registry), rounds))
+
+    print(f"Histogram.observe          {observe * 1e9:7.0f} ns")
+    print(f"record_request             {record * 1e9:7.0f} ns")
+    print(f"middleware per request     {(wrapped - bare) * 1e9:7.0f} ns  (bare app {bare * 1e9:.0f} ns)")
+
+
+if __name__ == "__main__":
+    main()
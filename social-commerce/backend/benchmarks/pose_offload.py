@@ -0,0 +1,135 @@
+"""
+Latency of unrelated endpoints while /pose/detect is saturated, with pose
+detection inline on the event loop vs in the worker pool.
+
+For each mode a real uvicorn server is started. A separate process keeps
+LOAD_CONCURRENCY pose requests in flight, while this process probes
+/health and /comments/{feed_id} one request at a time and reports their
+p50/p99, next to the same probes against an idle server.
+
+    python -m benchmarks.pose_offload
+"""
+
+import asyncio
+import multiprocessing
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+MODES = {
+    "inline": {"POSE_EXECUTION": "inline"},
+    "pool": {"POSE_EXECUTION": "pool", "POSE_POOL_WORKERS": str(max(os.cpu_count() or 1, 2))},
+}
+PROBES = ("/health", "/api/v1/comments/101?limit=20")
+LOAD_CONCURRENCY = 64
+DURATION = 10.0
+IDLE_DURATION = 2.0
+
+POSE_BODY = {
+    "landmarks": [
+        {"x": 0.3 + 0.4 * (i % 2), "y": 0.1 + 0.025 * i, "z": 0.0, "visibility": 0.99}
+        for i in range(33)
+    ]
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _serve(port: int, env: dict[str, str]) -> subprocess.Popen:
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env={**os.environ, "COMMENT_STORE": "memory", "GOOGLE_TTS_API_KEY": "", **env},
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health").status_code == 200:
+                return server
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("Server did not start")
+
+
+def _saturate(url: str, duration: float, done: multiprocessing.Queue) -> None:
+    """Keep LOAD_CONCURRENCY pose requests in flight (runs in its own process)."""
+
+    async def run() -> int:
+        completed = 0
+        stop_at = time.monotonic() + duration
+        limits = httpx.Limits(max_connections=LOAD_CONCURRENCY)
+        async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+
+            async def worker() -> None:
+                nonlocal completed
+                while time.monotonic() < stop_at:
+                    await client.post("/api/v1/pose/detect", json=POSE_BODY)
+                    completed += 1
+
+            await asyncio.gather(*(worker() for _ in range(LOAD_CONCURRENCY)))
+        return completed
+
+    done.put(asyncio.run(run()))
+
+
+async def _probe(url: str, path: str, duration: float) -> list[float]:
+    latencies = []
+    stop_at = time.monotonic() + duration
+    async with httpx.AsyncClient(base_url=url, timeout=30) as client:
+        while time.monotonic() < stop_at:
+            start = time.perf_counter()
+            await client.get(path)
+            latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(0.01)
+    return latencies
+
+
+async def _probe_all(url: str, duration: float) -> dict[str, list[float]]:
+    results = await asyncio.gather(*(_probe(url, path, duration) for path in PROBES))
+    return dict(zip(PROBES, results))
+
+
+def _row(label: str, latencies: list[float]) -> str:
+    p50 = statistics.median(latencies)
+    p99 = statistics.quantiles(latencies, n=100)[98] if len(latencies) > 1 else p50
+    return f"    {label:<48} p50 {p50 * 1e3:8.2f} ms  p99 {p99 * 1e3:8.2f} ms  ({len(latencies)} probes)"
+
+
+def main() -> None:
+    print(f"{LOAD_CONCURRENCY} concurrent /pose/detect for {DURATION:.0f} s, {os.cpu_count()} CPUs")
+    for mode, env in MODES.items():
+        port = _free_port()
+        url = f"http://127.0.0.1:{port}"
+        server = _serve(port, env)
+        try:
+            idle = asyncio.run(_probe_all(url, IDLE_DURATION))
+
+            done = multiprocessing.Queue()
+            load = multiprocessing.Process(target=_saturate, args=(url, DURATION, done))
+            load.start()
+            time.sleep(1.0)
+            loaded = asyncio.run(_probe_all(url, DURATION - 2.0))
+            pose_requests = done.get()
+            load.join()
+        finally:
+            server.terminate()
+            server.wait()
+
+        print(f"  {mode}: /pose/detect {pose_requests / DURATION:8.0f} req/s")
+        for path in PROBES:
+            print(_row(f"{path} idle", idle[path]))
+            print(_row(f"{path} under pose load", loaded[path]))
+
+
+if __name__ == "__main__":
+    main()
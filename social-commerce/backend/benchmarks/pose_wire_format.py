@@ -0,0 +1,54 @@
+"""
+Compare JSON and binary pose request bodies: bytes per frame and parse time.
+
+Run from the backend directory:
+
+    python -m benchmarks.pose_wire_format
+"""
+
+import json
+import timeit
+
+import numpy as np
+
+from app.schemas.pose import PoseDetectionRequest
+from app.services.pose_codec import FrameEncoding, decode_frames, encode_frames
+from app.services.pose_detection import parse_landmarks
+
+ROUNDS = 2_000
+
+
+def _random_frame(rng: np.random.Generator) -> np.ndarray:
+    frame = rng.random((33, 4))
+    frame[:, 2] = rng.uniform(-0.5, 0.5, 33)
+    return frame
+
+
+def main() -> None:
+    rng = np.random.default_rng(42)
+    frame = _random_frame(rng)
+
+    json_body = json.dumps({
+        "landmarks": [
+            {"x": x, "y": y, "z": z, "visibility": v}
+            for x, y, z, v in frame.tolist()
+        ]
+    }).encode()
+
+    def parse_json() -> None:
+        request = PoseDetectionRequest.model_validate_json(json_body)
+        parse_landmarks([lm.model_dump() for lm in request.landmarks])
+
+    cases = [("json", json_body, parse_json)]
+    for encoding in FrameEncoding:
+        body = encode_frames(frame, encoding)
+        cases.append((encoding.name.lower(), body, lambda body=body: decode_frames(body)))
+
+    print(f"{'format':<10} {'bytes/frame':>12} {'parse us':>10}")
+    for name, body, parse in cases:
+        seconds = min(timeit.repeat(parse, number=ROUNDS, repeat=5)) / ROUNDS
+        print(f"{name:<10} {len(body):>12} {seconds * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,514 @@
+"""
+Benchmark suite for the backend hot paths, with machine-readable output.
+
+Groups:
+
+- pose: dict -> Landmark parsing, `PoseGestureDetector.detect`,
+  `detect_gesture` and the batch path, over synthetic pose distributions;
+- comments: create / first page / delete latency for the memory and
+  SQLite stores at increasing store sizes;
+- feed: serializing a feed page with pydantic vs assembling it from
+  pre-encoded items, and building its compressed variants;
+- e2e: concurrent load against the ASGI app in-process, with the local
+  TTS stub (benchmarks.tts_stub) standing in for Google.
+
+Every result has a `value` (seconds per operation, or requests/s for
+throughput results) plus details. Results are written as JSON together
+with the git commit and environment. Pass a previous results file to
+--compare to print the change of every value and exit with status 1 if
+anything got worse by more than --tolerance.
+
+    python -m benchmarks.suite -o bench.json
+    python -m benchmarks.suite --quick --only pose,feed
+    python -m benchmarks.suite -o new.json --compare bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Iterator
+
+# The TTS router reads its API key at import time; the e2e group points the
+# service at the local stub, so any non-empty key will do.
+os.environ.setdefault("GOOGLE_TTS_API_KEY", "benchmark")
+os.environ["COMMENT_STORE"] = "memory"
+os.environ.pop("TTS_CACHE_DIR", None)
+
+import numpy as np
+
+from app.schemas.comment import Comment
+from app.schemas.feed import FeedItem, FeedResponse
+from app.services.comment_sqlite import SQLiteCommentStore
+from app.services.comment_store import CommentStore, MemoryCommentStore
+from app.services.feed_ranking import FeedRanker
+from app.services.pose_detection import (
+    LandmarkIndex as L,
+    PoseGestureDetector,
+    detect_gesture,
+    parse_landmarks,
+)
+from benchmarks.tts_stub import StubServer
+
+GROUPS = ("pose", "comments", "feed", "e2e")
+
+Result = dict[str, Any]
+
+
+# Measurement helpers
+
+def _per_call(fn: Callable[[], Any], number: int, repeat: int = 5) -> dict[str, float]:
+    """Seconds per call over `repeat` runs of `number` calls."""
+    runs = [t / number for t in timeit.repeat(fn, number=number, repeat=repeat)]
+    return {"value": statistics.median(runs), "min": min(runs), "max": max(runs)}
+
+
+def _percentiles(samples: list[float]) -> dict[str, float]:
+    ordered = sorted(samples)
+
+    def pick(q: float) -> float:
+        return ordered[min(int(len(ordered) * q), len(ordered) - 1)]
+
+    return {
+        "value": statistics.median(ordered),
+        "mean": statistics.fmean(ordered),
+        "p90": pick(0.90),
+        "p99": pick(0.99),
+        "max": ordered[-1],
+        "samples": len(ordered),
+    }
+
+
+def _result(group: str, name: str, stats: dict, unit: str = "s", **params: Any) -> Result:
+    return {"group": group, "name": name, "unit": unit, **stats, "params": params}
+
+
+# Pose
+
+def _frame(**points: tuple[float, float]) -> np.ndarray:
+    """A standing pose with arms at the sides; `points` overrides landmarks."""
+    frame = np.zeros((33, 4))
+    frame[:, :2] = 0.5
+    frame[:, 3] = 0.99
+    base = {
+        "NOSE": (0.5, 0.2),
+        "LEFT_SHOULDER": (0.4, 0.35), "RIGHT_SHOULDER": (0.6, 0.35),
+        "LEFT_ELBOW": (0.38, 0.48), "RIGHT_ELBOW": (0.62, 0.48),
+        "LEFT_WRIST": (0.38, 0.58), "RIGHT_WRIST": (0.62, 0.58),
+        "LEFT_HIP": (0.44, 0.62), "RIGHT_HIP": (0.56, 0.62),
+    }
+    for name, (x, y) in {**base, **points}.items():
+        frame[getattr(L, name), :2] = (x, y)
+    return frame
+
+
+def _pose_distributions(rng: np.random.Generator, n: int) -> dict[str, np.ndarray]:
+    """(n, 33, 4) frames per distribution."""
+    poses = {
+        "neutral": _frame(),
+        "hands_up": _frame(LEFT_WRIST=(0.38, 0.15), RIGHT_WRIST=(0.62, 0.15)),
+        "t_pose": _frame(
+            LEFT_ELBOW=(0.25, 0.35), RIGHT_ELBOW=(0.75, 0.35),
+            LEFT_WRIST=(0.1, 0.35), RIGHT_WRIST=(0.9, 0.35),
+        ),
+    }
+    distributions = {name: np.repeat(pose[None], n, axis=0) for name, pose in poses.items()}
+    # Neutral with camera noise: lands near rule thresholds
+    noisy = distributions["neutral"].copy()
+    noisy[..., :2] += rng.normal(0, 0.08, noisy[..., :2].shape)
+    distributions["jitter"] = np.clip(noisy, 0, 1)
+    uniform = rng.random((n, 33, 4))
+    uniform[..., 2] -= 0.5
+    distributions["uniform"] = uniform
+    return distributions
+
+
+def _as_dicts(frame: np.ndarray) -> list[dict]:
+    return [{"x": x, "y": y, "z": z, "visibility": v} for x, y, z, v in frame.tolist()]
+
+
+def bench_pose(quick: bool) -> list[Result]:
+    rng = np.random.default_rng(42)
+    frames_per_case = 64 if quick else 256
+    number = 200 if quick else 2_000
+    detector = PoseGestureDetector()
+    results = []
+
+    for name, frames in _pose_distributions(rng, frames_per_case).items():
+        payloads = [_as_dicts(frame) for frame in frames]
+        landmarks = [parse_landmarks(payload) for payload in payloads]
+        gestures = Counter(detector.detect(lms).gesture.value for lms in landmarks)
+        cycle = len(payloads)
+        i = 0
+
+        def next_index() -> int:
+            nonlocal i
+            i = (i + 1) % cycle
+            return i
+
+        cases = {
+            "parse_landmarks": lambda: parse_landmarks(payloads[next_index()]),
+            "detector.detect": lambda: detector.detect(landmarks[next_index()]),
+            "detect_gesture": lambda: detect_gesture(payloads[next_index()]),
+        }
+        for case, fn in cases.items():
+            results.append(_result(
+                "pose", f"{case}[{name}]", _per_call(fn, number),
+                distribution=name, gestures=dict(gestures),
+            ))
+
+        per_batch = _per_call(lambda: detector.detect_batch(frames), max(number // frames_per_case, 5))
+        results.append(_result(
+            "pose", f"detect_batch per frame[{name}]",
+            {key: value / frames_per_case for key, value in per_batch.items()},
+            distribution=name, batch=frames_per_case,
+        ))
+    return results
+
+
+# Comments
+
+def _comment(feed_id: str, created_at: datetime) -> Comment:
+    return Comment.model_construct(
+        id=str(uuid.uuid4()),
+        feed_id=feed_id,
+        content="Hay quá bà con ơi",
+        creator="@chu_nam_saigon",
+        created_at=created_at,
+    )
+
+
+def _seed_comments(size: int, hot_share: float = 0.1) -> Iterator[Comment]:
+    """`size` comments over 100 feed items; feed "hot" gets `hot_share` of them."""
+    start = datetime(2025, 1, 1)
+    for i in range(size):
+        feed_id = "hot" if random.random() < hot_share else str(i % 100)
+        yield _comment(feed_id, start + timedelta(seconds=i))
+
+
+def _seed_sqlite(path: Path, comments: Iterator[Comment]) -> None:
+    """Bulk insert outside the store, so seeding doesn't dominate the run."""
+    store = SQLiteCommentStore(path)
+    asyncio.run(store.aclose())
+    with sqlite3.connect(path) as conn:
+        conn.executemany(
+            "INSERT INTO comments (id, feed_id, content, creator, created_at) VALUES (?, ?, ?, ?, ?)",
+            (
+                (c.id, c.feed_id, c.content, c.creator, c.created_at.isoformat(timespec="microseconds"))
+                for c in comments
+            ),
+        )
+
+
+async def _timed(operation: Callable[[], Awaitable[Any]], rounds: int) -> list[float]:
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        await operation()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def _comment_ops(store: CommentStore, rounds: int) -> dict[str, list[float]]:
+    created: list[Comment] = []
+    clock = datetime(2026, 1, 1)
+
+    async def create() -> None:
+        created.append(await store.add(_comment("hot", clock + timedelta(microseconds=len(created)))))
+
+    async def first_page() -> None:
+        await store.page("hot", 50)
+
+    async def delete() -> None:
+        await store.delete(created.pop().id)
+
+    return {
+        "create": await _timed(create, rounds),
+        "list first page": await _timed(first_page, rounds),
+        "delete": await _timed(delete, rounds),
+    }
+
+
+def bench_comments(quick: bool) -> list[Result]:
+    sizes = (1_000, 10_000) if quick else (1_000, 10_000, 100_000)
+    rounds = 100 if quick else 500
+    results = []
+    random.seed(7)
+
+    for size in sizes:
+        memory = MemoryCommentStore()
+        for comment in _seed_comments(size):
+            memory.repository.add(comment)
+        samples = asyncio.run(_comment_ops(memory, rounds))
+        for op, latencies in samples.items():
+            results.append(_result("comments", f"memory {op}", _percentiles(latencies), store="memory", size=size))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "comments.db"
+            _seed_sqlite(path, _seed_comments(size))
+
+            async def run() -> dict[str, list[float]]:
+                store = SQLiteCommentStore(path)
+                try:
+                    return await _comment_ops(store, rounds)
+                finally:
+                    await store.aclose()
+
+            samples = asyncio.run(run())
+            for op, latencies in samples.items():
+                results.append(_result("comments", f"sqlite {op}", _percentiles(latencies), store="sqlite", size=size))
+    return results
+
+
+# Feed
+
+def _feed_items(n: int) -> list[FeedItem]:
+    start = datetime(2025, 1, 1)
+    return [
+        FeedItem(
+            id=str(i),
+            title=f"Bài số {i} 😄",
+            mood=("happy", "excited", "curious", "surprised")[i % 4],
+            greeting="Sáng ra làm ly cà phê, ngồi ngẫm chuyện đời thấy cũng vui ha.",
+            creator="@chu_nam_saigon",
+            audio_url=f"/api/v1/tts/audio/{uuid.uuid4().hex * 2}",
+            published_at=start + timedelta(minutes=i),
+        )
+        for i in range(n)
+    ]
+
+
+def bench_feed(quick: bool) -> list[Result]:
+    from app.api.http_cache import EncodedBody
+    from app.api.v1 import feed as feed_api
+
+    number = 200 if quick else 2_000
+    results = []
+    for catalog in (8, 1_000) if quick else (8, 1_000, 100_000):
+        items = _feed_items(catalog)
+        ranker = FeedRanker()
+        ranker.load(items)
+        page_size = min(catalog, feed_api.DEFAULT_PAGE_SIZE)
+        page_items = [entry.item for entry in ranker.page(page_size)[0]]
+
+        feed_api.feed_ranker, previous = ranker, feed_api.feed_ranker
+        try:
+            cases = {
+                "pydantic model_dump_json": lambda: FeedResponse(success=True, data=page_items).model_dump_json(),
+                "ranker.page": lambda: ranker.page(page_size),
+                "assemble + compress page": lambda: feed_api._encode_page(page_size, None),
+            }
+            for case, fn in cases.items():
+                results.append(_result("feed", case, _per_call(fn, number), catalog=catalog, page_size=page_size))
+        finally:
+            feed_api.feed_ranker = previous
+
+        body = EncodedBody.from_model(FeedResponse(success=True, data=page_items))
+        results.append(_result(
+            "feed", "page bytes",
+            {"value": len(body.variants["identity"][0])},
+            unit="bytes", catalog=catalog,
+            **{coding: len(data) for coding, (data, _) in body.variants.items()},
+        ))
+    return results
+
+
+# End to end
+
+@contextmanager
+def _stubbed_tts(delay: float) -> Iterator[StubServer]:
+    with StubServer(delay) as stub:
+        previous = os.environ.get("GOOGLE_TTS_BASE_URL")
+        os.environ["GOOGLE_TTS_BASE_URL"] = stub.url
+        try:
+            yield stub
+        finally:
+            if previous is None:
+                os.environ.pop("GOOGLE_TTS_BASE_URL", None)
+            else:
+                os.environ["GOOGLE_TTS_BASE_URL"] = previous
+
+
+async def _load(
+        client: Any,
+        request: Callable[[Any, int], Awaitable[Any]],
+        total: int,
+        concurrency: int,
+) -> dict[str, Any]:
+    """Run `total` requests, `concurrency` at a time."""
+    latencies: list[float] = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker() -> None:
+        nonlocal errors
+        for i in counter:
+            start = time.perf_counter()
+            response = await request(client, i)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "throughput": total / elapsed,
+        "latency": _percentiles(latencies),
+        "errors": errors,
+    }
+
+
+def bench_e2e(quick: bool) -> list[Result]:
+    import httpx
+
+    total = 300 if quick else 2_000
+    concurrency = 32
+    # Uncached synthesis is held to the TTS limiter's window; more would be shed with 503
+    tts_concurrency = 8
+    upstream_delay = 0.02
+    pose_body = {"landmarks": _as_dicts(_frame(LEFT_WRIST=(0.38, 0.15), RIGHT_WRIST=(0.62, 0.15)))}
+
+    # name -> (request, concurrency)
+    scenarios: dict[str, tuple[Callable[[Any, int], Awaitable[Any]], int]] = {
+        "GET /feed": (lambda c, i: c.get("/api/v1/feed"), concurrency),
+        "POST /pose/detect": (lambda c, i: c.post("/api/v1/pose/detect", json=pose_body), concurrency),
+        "comments create+list": (
+            lambda c, i: (
+                c.post("/api/v1/comments", json={"feed_id": "101", "content": f"Bình luận {i}", "creator": "@bench"})
+                if i % 2 else c.get("/api/v1/comments/101?limit=20")
+            ),
+            concurrency,
+        ),
+        "POST /tts/synthesize cached": (
+            lambda c, i: c.post("/api/v1/tts/synthesize", json={"text": "Xin chào bà con cô bác"}),
+            concurrency,
+        ),
+        "POST /tts/synthesize uncached": (
+            lambda c, i: c.post("/api/v1/tts/synthesize", json={"text": f"Câu số {i} {uuid.uuid4().hex[:8]}"}),
+            tts_concurrency,
+        ),
+    }
+
+    async def run() -> list[Result]:
+        from app.main import app
+
+        results = []
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                for name, (request, workers) in scenarios.items():
+                    await _load(client, request, min(total, 50), workers)  # warm up
+                    outcome = await _load(client, request, total, workers)
+                    results.append(_result(
+                        "e2e", f"{name} throughput",
+                        {"value": outcome["throughput"], "errors": outcome["errors"]},
+                        unit="req/s", requests=total, concurrency=workers,
+                    ))
+                    results.append(_result(
+                        "e2e", f"{name} latency", outcome["latency"],
+                        requests=total, concurrency=workers, upstream_delay=upstream_delay,
+                    ))
+        return results
+
+    with _stubbed_tts(upstream_delay) as stub:
+        results = asyncio.run(run())
+        results.append(_result("e2e", "upstream TTS requests", {"value": stub.requests}, unit="count"))
+    return results
+
+
+# Runner
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _environment(quick: bool) -> dict[str, Any]:
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+        "quick": quick,
+    }
+
+
+def _compare(results: list[Result], baseline_path: Path, tolerance: float) -> bool:
+    """Print the change of every value; True if nothing regressed past tolerance."""
+    baseline = {
+        (r["group"], r["name"], json.dumps(r["params"], sort_keys=True)): r
+        for r in json.loads(baseline_path.read_text())["results"]
+    }
+    ok = True
+    for result in results:
+        old = baseline.get((result["group"], result["name"], json.dumps(result["params"], sort_keys=True)))
+        if old is None or not old["value"] or result["unit"] in ("bytes", "count"):
+            continue
+        change = result["value"] / old["value"] - 1
+        # Lower is better, except for throughput
+        worse = -change if result["unit"] == "req/s" else change
+        flag = ""
+        if worse > tolerance:
+            flag = "  REGRESSION"
+            ok = False
+        print(f"{result['group']:<9} {result['name']:<48} {change:+8.1%}{flag}", file=sys.stderr)
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-o", "--output", type=Path, help="Write results JSON here (default: stdout)")
+    parser.add_argument("--only", default=",".join(GROUPS), help=f"Comma-separated groups: {', '.join(GROUPS)}")
+    parser.add_argument("--quick", action="store_true", help="Smaller sizes and fewer rounds")
+    parser.add_argument("--compare", type=Path, help="Previous results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed slowdown for --compare")
+    args = parser.parse_args()
+    # Keep shed-load warnings etc. out of the report
+    logging.getLogger("app").setLevel(logging.ERROR)
+
+    benches = {"pose": bench_pose, "comments": bench_comments, "feed": bench_feed, "e2e": bench_e2e}
+    results: list[Result] = []
+    for group in args.only.split(","):
+        group = group.strip()
+        if group not in benches:
+            parser.error(f"Unknown group: {group}")
+        start = time.perf_counter()
+        results.extend(benches[group](args.quick))
+        print(f"{group}: done in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+    report = json.dumps({"environment": _environment(args.quick), "results": results}, indent=2, ensure_ascii=False)
+    if args.output:
+        args.output.write_text(report + "\n")
+    else:
+        print(report)
+
+    if args.compare and not _compare(results, args.compare, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
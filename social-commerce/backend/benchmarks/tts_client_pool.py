@@ -0,0 +1,79 @@
+"""
+Latency and connection count: a new httpx client per call vs the pooled
+app-lifetime client in GoogleTTSService.
+
+Runs against a local plain-HTTP stub, so the numbers show TCP connect and
+pool overhead only; against Google every avoided connection also skips DNS
+and a TLS handshake, and HTTP/2 multiplexes requests over fewer sockets.
+
+    python -m benchmarks.tts_client_pool
+"""
+
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from app.services.tts import GoogleTTSService, create_http_client
+from benchmarks.tts_stub import StubServer
+
+REQUESTS = 400
+CONCURRENCY = 16
+
+
+class _ClientPerCallService(GoogleTTSService):
+    """Previous behaviour: open and close a client for every synthesis."""
+
+    async def synthesize(self, *args, **kwargs) -> bytes:
+        async with httpx.AsyncClient() as client:
+            service = GoogleTTSService(self.api_key, client=client, base_url=self.base_url)
+            return await service.synthesize(*args, **kwargs)
+
+
+async def _run(service: GoogleTTSService) -> list[float]:
+    latencies: list[float] = []
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await service.synthesize(f"xin chào {i}")
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one(i) for i in range(REQUESTS)))
+    return latencies
+
+
+def _report(name: str, latencies: list[float], stub: StubServer, elapsed: float) -> None:
+    ordered = sorted(latencies)
+    p99 = ordered[int(len(ordered) * 0.99) - 1]
+    print(
+        f"{name:<16} p50 {statistics.median(ordered) * 1e3:7.2f} ms"
+        f"  p99 {p99 * 1e3:7.2f} ms"
+        f"  {len(latencies) / elapsed:8.0f} req/s"
+        f"  connections {len(stub.connections)}"
+    )
+
+
+async def main() -> None:
+    with StubServer() as stub:
+        cases = [
+            ("client-per-call", _ClientPerCallService("key", base_url=stub.url)),
+            ("pooled", GoogleTTSService(
+                "key",
+                client=create_http_client(max_connections=CONCURRENCY),
+                base_url=stub.url,
+            )),
+        ]
+        for name, service in cases:
+            await _run(service)  # warm up
+            stub.reset()
+            start = time.perf_counter()
+            latencies = await _run(service)
+            _report(name, latencies, stub, time.perf_counter() - start)
+            await service.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,106 @@
+"""
+Load shedding against a deliberately slow TTS upstream.
+
+Phase 1 sends a burst of concurrent syntheses to a stub that takes
+SLOW_DELAY seconds per request, with and without the adaptive limiter.
+Without it every request waits on the upstream (which also sees the full
+burst); with it excess requests fail fast with `UpstreamUnavailable`.
+
+Phase 2 makes the stub return 503s and shows the circuit breaker opening,
+rejecting calls without touching the upstream, then closing again after a
+successful half-open probe.
+
+    python -m benchmarks.tts_load_shedding
+"""
+
+import asyncio
+import statistics
+import time
+
+from app.services.resilience import AdaptiveLimiter, BreakerState, CircuitBreaker, UpstreamUnavailable
+from app.services.tts import GoogleTTSService, create_http_client
+from benchmarks.tts_stub import StubServer
+
+BURST = 200
+SLOW_DELAY = 1.5
+LATENCY_TARGET = 0.5
+
+
+async def _burst(service: GoogleTTSService) -> tuple[list[float], list[float]]:
+    served: list[float] = []
+    shed: list[float] = []
+
+    async def one(i: int) -> None:
+        start = time.perf_counter()
+        try:
+            await service.synthesize(f"xin chào {i}")
+            served.append(time.perf_counter() - start)
+        except UpstreamUnavailable:
+            shed.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one(i) for i in range(BURST)))
+    return served, shed
+
+
+def _ms(values: list[float]) -> str:
+    return f"{statistics.median(values) * 1e3:8.1f} ms" if values else "       -   "
+
+
+async def _shedding(stub: StubServer) -> None:
+    print(f"Burst of {BURST} requests, upstream takes {SLOW_DELAY:.1f} s each")
+    cases = [
+        ("unbounded", AdaptiveLimiter(initial_limit=BURST, max_limit=BURST, latency_target=60)),
+        ("adaptive", AdaptiveLimiter(initial_limit=8, max_limit=32, latency_target=LATENCY_TARGET)),
+    ]
+    for name, limiter in cases:
+        service = GoogleTTSService(
+            "key",
+            client=create_http_client(max_connections=BURST),
+            base_url=stub.url,
+            limiter=limiter,
+        )
+        stub.reset()
+        served, shed = await _burst(service)
+        print(
+            f"  {name:<10} served {len(served):4d} (p50 {_ms(served)})"
+            f"  shed {len(shed):4d} (p50 {_ms(shed)})"
+            f"  upstream peak {stub.peak_in_flight:4d}"
+            f"  limit after {limiter.limit:5.2f}"
+        )
+        await service.aclose()
+
+
+async def _breaker(stub: StubServer) -> None:
+    print("Upstream returning 503")
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=0.5)
+    service = GoogleTTSService("key", base_url=stub.url, breaker=breaker)
+    stub.delay = 0.0
+    stub.fail_status = 503
+    stub.reset()
+
+    rejected = 0
+    for i in range(50):
+        try:
+            await service.synthesize(f"lỗi {i}")
+        except UpstreamUnavailable:
+            rejected += 1
+        except Exception:
+            pass
+    print(f"  50 calls: {stub.requests} reached upstream, {rejected} rejected, state {breaker.state.value}")
+
+    stub.fail_status = None
+    await asyncio.sleep(breaker.reset_timeout)
+    assert breaker.state == BreakerState.HALF_OPEN
+    await service.synthesize("thử lại")
+    print(f"  after {breaker.reset_timeout:.1f} s and one probe: state {breaker.state.value}")
+    await service.aclose()
+
+
+async def main() -> None:
+    with StubServer(delay=SLOW_DELAY) as stub:
+        await _shedding(stub)
+        await _breaker(stub)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,96 @@
+"""
+Local stand-in for the Google Cloud TTS REST API, used by benchmarks.
+
+    with StubServer(delay=0.02) as stub:
+        service = GoogleTTSService("key", base_url=stub.url)
+"""
+
+import asyncio
+import base64
+import socket
+import threading
+import time
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+# ~3 s of 32 kbps MP3
+FAKE_AUDIO = b"ID3" + bytes(12_000)
+
+
+class StubServer:
+    """Runs the stub API on a free localhost port in a background thread."""
+
+    def __init__(self, delay: float = 0.0):
+        """
+        Args:
+            delay: Seconds each synthesis request takes upstream.
+        """
+        self.delay = delay
+        # Status code returned by synthesis instead of audio, when set
+        self.fail_status: int | None = None
+        self.requests = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.connections: set[tuple[str, int]] = set()
+        self.url = ""
+        self._server: uvicorn.Server | None = None
+        self._thread: threading.Thread | None = None
+
+    def _app(self) -> Starlette:
+        async def synthesize(request: Request) -> JSONResponse:
+            self.requests += 1
+            self.connections.add(tuple(request.scope["client"]))
+            payload = await request.json()
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            try:
+                if self.delay:
+                    await asyncio.sleep(self.delay)
+            finally:
+                self.in_flight -= 1
+            if self.fail_status is not None:
+                return JSONResponse({"error": "stub failure"}, status_code=self.fail_status)
+            audio = FAKE_AUDIO + payload["input"]["text"].encode()
+            return JSONResponse({"audioContent": base64.b64encode(audio).decode()})
+
+        async def voices(request: Request) -> JSONResponse:
+            self.requests += 1
+            self.connections.add(tuple(request.scope["client"]))
+            return JSONResponse({"voices": [
+                {"languageCodes": ["vi-VN"], "name": "vi-VN-Neural2-D", "ssmlGender": "MALE"},
+                {"languageCodes": ["vi-VN"], "name": "vi-VN-Wavenet-B", "ssmlGender": "MALE"},
+            ]})
+
+        return Starlette(routes=[
+            Route("/text:synthesize", synthesize, methods=["POST"]),
+            Route("/voices", voices, methods=["GET"]),
+        ])
+
+    def reset(self) -> None:
+        self.requests = 0
+        self.peak_in_flight = 0
+        self.connections.clear()
+
+    def __enter__(self) -> "StubServer":
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+        sock.close()
+
+        config = uvicorn.Config(self._app(), host="127.0.0.1", port=port, log_level="warning")
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+
+        self.url = f"http://127.0.0.1:{port}"
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.should_exit = True
+        self._thread.join()
@@ -0,0 +1,71 @@
+"""
+Batch pose detection matches single-frame detection frame for frame.
+
+Run from social-commerce/backend:
+
+    python -m pytest tests
+"""
+
+import numpy as np
+import pytest
+
+from app.services.pose_detection import (
+    LANDMARK_COUNT,
+    LANDMARK_FIELDS,
+    detector,
+    landmarks_from_array,
+)
+
+FRAMES = 5_000
+SHAPE = (LANDMARK_COUNT, LANDMARK_FIELDS)
+
+
+def random_frames(seed: int) -> np.ndarray:
+    """Landmarks anywhere in the unit square."""
+    return np.random.default_rng(seed).random((FRAMES, *SHAPE))
+
+
+def grid_frames(seed: int) -> np.ndarray:
+    """Landmarks on a 0.05 grid, so points tie and differences land on the threshold."""
+    return np.round(np.random.default_rng(seed).random((FRAMES, *SHAPE)) * 20) / 20
+
+
+def edge_frames() -> np.ndarray:
+    """Degenerate poses: every point in one place, on the borders, or a threshold apart."""
+    frames = [np.full(SHAPE, value) for value in (0.0, 0.1, 0.5, 0.9, 1.0)]
+    # Every landmark stacked on one spot except one axis of one landmark,
+    # stepped across the threshold band
+    for index in range(LANDMARK_COUNT):
+        for axis in (0, 1):
+            for value in (0.3, 0.4 - 1e-12, 0.4, 0.4 + 1e-12, 0.5, 0.6, 0.7):
+                frame = np.full(SHAPE, 0.5)
+                frame[index, axis] = value
+                frames.append(frame)
+    return np.stack(frames)
+
+
+def scalar(frames: np.ndarray) -> list[tuple]:
+    return [
+        (result.gesture, result.confidence)
+        for result in (detector.detect(landmarks_from_array(frame)) for frame in frames)
+    ]
+
+
+def batch(frames: np.ndarray) -> list[tuple]:
+    return [(result.gesture, result.confidence) for result in detector.detect_batch(frames)]
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+@pytest.mark.parametrize("frames", [
+    pytest.param(random_frames(1), id="random"),
+    pytest.param(grid_frames(2), id="grid"),
+    pytest.param(edge_frames(), id="edges"),
+])
+def test_batch_matches_scalar(frames, dtype):
+    frames = frames.astype(dtype)
+    assert batch(frames) == scalar(frames)
+
+
+def test_random_frames_reach_every_gesture():
+    seen = {gesture for gesture, _ in batch(random_frames(1))}
+    assert seen == set(detector.plan.outcomes)
@@ -0,0 +1,131 @@
+"""
+Load shedding of upstream TTS calls.
+
+Run from social-commerce/backend:
+
+    python -m pytest tests
+"""
+
+import asyncio
+import base64
+
+import httpx
+import pytest
+
+from app.services.resilience import AdaptiveLimiter, UpstreamUnavailable
+from app.services.tts import GoogleTTSService
+
+AUDIO = b"ID3-fake-mp3"
+
+
+def slow_upstream(delay: float) -> httpx.MockTransport:
+    """Google TTS stand-in answering every synthesis after `delay` seconds."""
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(delay)
+        return httpx.Response(200, json={"audioContent": base64.b64encode(AUDIO).decode()})
+
+    return httpx.MockTransport(handler)
+
+
+def service(limiter: AdaptiveLimiter, delay: float = 0.2) -> GoogleTTSService:
+    return GoogleTTSService(
+        "test-key",
+        client=httpx.AsyncClient(transport=slow_upstream(delay)),
+        limiter=limiter,
+    )
+
+
+async def outcomes(calls) -> list[str]:
+    """Run calls concurrently; "ok" or "shed" per call, in order."""
+    results = await asyncio.gather(*calls, return_exceptions=True)
+    for result in results:
+        if isinstance(result, Exception) and not isinstance(result, UpstreamUnavailable):
+            raise result
+    return ["shed" if isinstance(result, UpstreamUnavailable) else "ok" for result in results]
+
+
+def test_full_window_sheds_after_bounded_wait():
+    async def run():
+        limiter = AdaptiveLimiter(initial_limit=2, max_wait=0.05)
+        tts = service(limiter)
+        results = await outcomes([tts.synthesize(f"xin chào {i}") for i in range(6)])
+        await tts.aclose()
+        return results, limiter
+
+    results, limiter = asyncio.run(run())
+    assert results.count("ok") == 2
+    assert results.count("shed") == 4
+    assert limiter.rejected == 4
+    assert limiter.in_flight == 0
+
+
+def test_waiting_caller_gets_the_released_slot():
+    async def run():
+        limiter = AdaptiveLimiter(initial_limit=2, max_wait=1.0)
+        tts = service(limiter, delay=0.05)
+        results = await outcomes([tts.synthesize(f"xin chào {i}") for i in range(4)])
+        await tts.aclose()
+        return results, limiter
+
+    results, limiter = asyncio.run(run())
+    assert results == ["ok"] * 4
+    assert limiter.waited == 2
+    assert limiter.rejected == 0
+
+
+def test_queue_is_bounded():
+    async def run():
+        limiter = AdaptiveLimiter(initial_limit=1, max_wait=1.0, max_queue=1)
+        tts = service(limiter, delay=0.05)
+        results = await outcomes([tts.synthesize(f"xin chào {i}") for i in range(3)])
+        await tts.aclose()
+        return results
+
+    assert asyncio.run(run()) == ["ok", "ok", "shed"]
+
+
+def test_background_calls_cannot_crowd_out_users():
+    async def run():
+        limiter = AdaptiveLimiter(initial_limit=4, max_wait=0.05, background_share=0.5)
+        tts = service(limiter)
+        prefetch = [tts.synthesize(f"lời chào {i}", background=True) for i in range(4)]
+        users = [tts.synthesize(f"bình luận {i}") for i in range(2)]
+        results = await outcomes(prefetch + users)
+        await tts.aclose()
+        return results[:4], results[4:], limiter
+
+    prefetch, users, limiter = asyncio.run(run())
+    assert prefetch == ["ok", "ok", "shed", "shed"]
+    assert users == ["ok", "ok"]
+    assert limiter.background_in_flight == 0
+
+
+def test_background_calls_never_queue():
+    async def run():
+        limiter = AdaptiveLimiter(initial_limit=2, max_wait=1.0, background_share=1.0)
+        await limiter.acquire()
+        await limiter.acquire()
+        with pytest.raises(UpstreamUnavailable):
+            await limiter.acquire(background=True)
+        return limiter
+
+    limiter = asyncio.run(run())
+    assert limiter.waited == 0
+    assert limiter.rejected == 1
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def run():
+        limiter = AdaptiveLimiter(initial_limit=1, max_wait=1.0)
+        started = await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        limiter.release(started, True)
+        return limiter
+
+    limiter = asyncio.run(run())
+    assert limiter.stats()["queued"] == 0
+    assert limiter.in_flight == 0
@@ -1,3 +1,4 @@
+import {useState} from "react";
 import {motion, AnimatePresence} from "motion/react";
 
 import type {Comment} from "@/types/comment";
@@ -5,8 +6,15 @@ import type {Comment} from "@/types/comment";
 interface CommentsListProps {
     comments: Comment[];
     isLoading?: boolean;
+    // Older comments exist beyond the loaded pages
+    hasMore?: boolean;
+    isLoadingMore?: boolean;
+    onLoadMore?: () => void;
 }
 
+// Comments shown before the list is expanded
+const COLLAPSED_COUNT = 5;
+
 function formatTime(dateString: string): string {
     const date = new Date(dateString);
     const now = new Date();
@@ -20,7 +28,15 @@ function formatTime(dateString: string): string {
     return date.toLocaleDateString("vi-VN");
 }
 
-export default function CommentsList({comments, isLoading}: CommentsListProps) {
+export default function CommentsList({
+    comments,
+    isLoading,
+    hasMore = false,
+    isLoadingMore = false,
+    onLoadMore,
+}: CommentsListProps) {
+    const [expanded, setExpanded] = useState(false);
+
     if (isLoading) {
         return (
             <div className="flex justify-center py-2">
@@ -36,7 +52,7 @@ export default function CommentsList({comments, isLoading}: CommentsListProps) {
     return (
         <div className="space-y-2 max-h-32 overflow-y-auto scrollbar-hide">
             <AnimatePresence mode="popLayout">
-                {comments.slice(0, 5).map((comment) => (
+                {(expanded ? comments : comments.slice(0, COLLAPSED_COUNT)).map((comment) => (
                     <motion.div
                         key={comment.id}
                         initial={{opacity: 0, x: -20}}
@@ -66,10 +82,30 @@ export default function CommentsList({comments, isLoading}: CommentsListProps) {
                 ))}
             </AnimatePresence>
 
-            {comments.length > 5 && (
-                <p className="text-white/60 text-xs text-center">
-                    +{comments.length - 5} bình luận khác
-                </p>
+            {!expanded && (comments.length > COLLAPSED_COUNT || hasMore) && (
+                <button
+                    type="button"
+                    onClick={() => {
+                        setExpanded(true);
+                        if (comments.length <= COLLAPSED_COUNT) onLoadMore?.();
+                    }}
+                    className="block w-full text-white/60 text-xs text-center"
+                >
+                    {hasMore
+                        ? "Xem thêm bình luận"
+                        : `+${comments.length - COLLAPSED_COUNT} bình luận khác`}
+                </button>
+            )}
+
+            {expanded && hasMore && (
+                <button
+                    type="button"
+                    onClick={onLoadMore}
+                    disabled={isLoadingMore}
+                    className="block w-full text-white/60 text-xs text-center disabled:opacity-50"
+                >
+                    {isLoadingMore ? "Đang tải..." : "Xem bình luận cũ hơn"}
+                </button>
             )}
         </div>
     );
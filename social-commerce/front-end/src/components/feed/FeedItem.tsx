@@ -21,7 +21,14 @@ interface FeedItemProps {
 
 export default function FeedItem({item, isActive, dogId, onDogChange}: FeedItemProps) {
     const {speakWithMood, stop, isSpeaking, isLoading} = useTextToSpeech();
-    const {comments, isLoading: commentsLoading, addComment} = useComments(item.id);
+    const {
+        comments,
+        isLoading: commentsLoading,
+        hasMore: hasMoreComments,
+        isLoadingMore: loadingMoreComments,
+        loadMore: loadMoreComments,
+        addComment,
+    } = useComments(item.id);
     const [showBubble, setShowBubble] = useState(false);
     const hasSpokenRef = useRef(false);
 
@@ -33,7 +40,7 @@ export default function FeedItem({item, isActive, dogId, onDogChange}: FeedItemP
             const timer = setTimeout(() => {
                 setShowBubble(true);
                 // Use mood-based TTS with Google Cloud voices
-                speakWithMood(item.greeting, item.mood);
+                speakWithMood(item.greeting, item.mood, {audioUrl: item.audio_url});
             }, 400);
 
             return () => clearTimeout(timer);
@@ -44,7 +51,7 @@ export default function FeedItem({item, isActive, dogId, onDogChange}: FeedItemP
             setShowBubble(false);
             stop();
         }
-    }, [isActive, item.greeting, item.mood, speakWithMood, stop]);
+    }, [isActive, item.greeting, item.mood, item.audio_url, speakWithMood, stop]);
 
     // Hide bubble after speaking finishes (with delay)
     useEffect(() => {
@@ -92,7 +99,13 @@ export default function FeedItem({item, isActive, dogId, onDogChange}: FeedItemP
             <div className="absolute bottom-0 left-0 right-0 p-6 bg-gradient-to-t from-black/50 to-transparent">
                 {/* Comments list */}
                 <div className="mb-4">
-                    <CommentsList comments={comments} isLoading={commentsLoading}/>
+                    <CommentsList
+                        comments={comments}
+                        isLoading={commentsLoading}
+                        hasMore={hasMoreComments}
+                        isLoadingMore={loadingMoreComments}
+                        onLoadMore={loadMoreComments}
+                    />
                 </div>
 
                 {/* Creator info */}
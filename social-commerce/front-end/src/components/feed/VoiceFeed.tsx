@@ -1,4 +1,4 @@
-import {useCallback, useEffect, useRef, useState} from "react";
+import {useCallback, useEffect, useMemo, useRef, useState} from "react";
 
 import FeedItem from "@/components/feed/FeedItem";
 import PoseIndicator from "@/components/feed/PoseIndicator";
@@ -7,16 +7,23 @@ import {useDogSelection} from "@/hooks/useDogSelection";
 import {useGestureControl} from "@/hooks/useGestureControl";
 
 export default function VoiceFeed() {
-    const {data, isLoading, error} = useFeed();
+    const {data, isLoading, error, hasNextPage, isFetchingNextPage, fetchNextPage} = useFeed();
     const {dogId, setDogId} = useDogSelection();
     const containerRef = useRef<HTMLDivElement>(null);
     const [activeIndex, setActiveIndex] = useState(0);
     const itemRefs = useRef<Map<number, HTMLDivElement>>(new Map());
 
     // Feed items - no duplication needed for true infinite loop
-    const feedItems = data?.data ?? [];
+    const feedItems = useMemo(() => data?.pages.flatMap((page) => page.data) ?? [], [data]);
     const totalItems = feedItems.length;
 
+    // Load the next page a few items before the end is reached
+    useEffect(() => {
+        if (hasNextPage && !isFetchingNextPage && activeIndex >= totalItems - 3) {
+            fetchNextPage();
+        }
+    }, [activeIndex, totalItems, hasNextPage, isFetchingNextPage, fetchNextPage]);
+
     // Scroll to specific index with smooth animation
     const scrollToIndex = useCallback((index: number) => {
         const container = containerRef.current;
@@ -38,14 +45,15 @@ export default function VoiceFeed() {
         scrollToIndex(newIndex);
     }, [activeIndex, totalItems, scrollToIndex]);
 
-    // Scroll down (next feed) - loop to first item if at last
+    // Scroll down (next feed) - loop to first item if at last and nothing more to load
     const scrollDown = useCallback(() => {
         if (totalItems === 0) return;
+        if (activeIndex === totalItems - 1 && hasNextPage) return;
 
         const newIndex = activeIndex === totalItems - 1 ? 0 : activeIndex + 1;
         setActiveIndex(newIndex);
         scrollToIndex(newIndex);
-    }, [activeIndex, totalItems, scrollToIndex]);
+    }, [activeIndex, totalItems, hasNextPage, scrollToIndex]);
 
     // Gesture control integration
     const {
@@ -1,33 +1,92 @@
-import {useQuery, useMutation, useQueryClient} from "@tanstack/react-query";
+import {useCallback, useEffect} from "react";
+import {
+    useInfiniteQuery,
+    useMutation,
+    useQueryClient,
+    type InfiniteData,
+    type QueryClient,
+} from "@tanstack/react-query";
 
 import {api} from "@/lib/api";
 import type {
+    Comment,
     CommentCreate,
     CommentResponse,
     CommentsListResponse,
 } from "@/types/comment";
 
-async function fetchComments(feedId: string): Promise<CommentsListResponse> {
-    return api.get<CommentsListResponse>(`/api/v1/comments/${feedId}`);
+async function fetchComments(feedId: string, before: string | null): Promise<CommentsListResponse> {
+    const query = before ? `?before=${encodeURIComponent(before)}` : "";
+    return api.get<CommentsListResponse>(`/api/v1/comments/${feedId}${query}`);
 }
 
 async function createComment(data: CommentCreate): Promise<CommentResponse> {
     return api.post<CommentResponse>("/api/v1/comments", data);
 }
 
+type CommentPages = InfiniteData<CommentsListResponse, string | null>;
+
+function updatePages(
+    queryClient: QueryClient,
+    feedId: string,
+    update: (comments: Comment[], pageIndex: number) => Comment[]
+) {
+    queryClient.setQueryData<CommentPages>(["comments", feedId], (old) =>
+        old
+            ? {...old, pages: old.pages.map((page, i) => ({...page, data: update(page.data, i)}))}
+            : old
+    );
+}
+
+function prependComment(queryClient: QueryClient, feedId: string, comment: Comment) {
+    const pages = queryClient.getQueryData<CommentPages>(["comments", feedId])?.pages ?? [];
+    if (pages.some((page) => page.data.some((c) => c.id === comment.id))) return;
+    // New comments belong on the newest page; older pages keep their cursors
+    updatePages(queryClient, feedId, (comments, i) => (i === 0 ? [comment, ...comments] : comments));
+}
+
+function removeComment(queryClient: QueryClient, feedId: string, id: string) {
+    updatePages(queryClient, feedId, (comments) => comments.filter((c) => c.id !== id));
+}
+
 export function useComments(feedId: string) {
     const queryClient = useQueryClient();
 
-    const commentsQuery = useQuery({
+    const commentsQuery = useInfiniteQuery({
         queryKey: ["comments", feedId],
-        queryFn: () => fetchComments(feedId),
+        queryFn: ({pageParam}) => fetchComments(feedId, pageParam),
+        initialPageParam: null as string | null,
+        getNextPageParam: (lastPage) => lastPage.next_cursor,
         enabled: !!feedId,
+        // Kept current by the event stream below, so never refetch on a timer/focus
+        staleTime: Infinity,
     });
 
+    // Live deltas pushed by the server (Server-Sent Events)
+    useEffect(() => {
+        if (!feedId) return;
+
+        const source = new EventSource(
+            `${import.meta.env.VITE_API_URL || ""}/api/v1/comments/${feedId}/events`
+        );
+        source.addEventListener("comment_created", (event) => {
+            prependComment(queryClient, feedId, JSON.parse((event as MessageEvent).data));
+        });
+        source.addEventListener("comment_deleted", (event) => {
+            removeComment(queryClient, feedId, JSON.parse((event as MessageEvent).data).id);
+        });
+        // We fell behind and were disconnected: refetch, EventSource reconnects
+        source.addEventListener("reset", () => {
+            queryClient.invalidateQueries({queryKey: ["comments", feedId]});
+        });
+
+        return () => source.close();
+    }, [feedId, queryClient]);
+
     const addCommentMutation = useMutation({
         mutationFn: createComment,
-        onSuccess: () => {
-            queryClient.invalidateQueries({queryKey: ["comments", feedId]});
+        onSuccess: (response) => {
+            if (response.data) prependComment(queryClient, feedId, response.data);
         },
     });
 
@@ -39,10 +98,18 @@ export function useComments(feedId: string) {
         });
     };
 
+    const {hasNextPage, isFetchingNextPage, fetchNextPage} = commentsQuery;
+    const loadMore = useCallback(() => {
+        if (hasNextPage && !isFetchingNextPage) fetchNextPage();
+    }, [hasNextPage, isFetchingNextPage, fetchNextPage]);
+
     return {
-        comments: commentsQuery.data?.data ?? [],
+        comments: commentsQuery.data?.pages.flatMap((page) => page.data) ?? [],
         isLoading: commentsQuery.isLoading,
         error: commentsQuery.error,
+        hasMore: hasNextPage,
+        isLoadingMore: isFetchingNextPage,
+        loadMore,
         addComment,
         isAddingComment: addCommentMutation.isPending,
     };
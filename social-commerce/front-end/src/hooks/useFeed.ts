@@ -1,16 +1,19 @@
-import {useQuery} from "@tanstack/react-query";
+import {useInfiniteQuery} from "@tanstack/react-query";
 
 import {api} from "@/lib/api";
 import type {FeedResponse} from "@/types/feed";
 
-async function fetchFeed(): Promise<FeedResponse> {
-    return api.get<FeedResponse>("/api/v1/feed");
+async function fetchFeed(after: string | null): Promise<FeedResponse> {
+    const query = after ? `?after=${encodeURIComponent(after)}` : "";
+    return api.get<FeedResponse>(`/api/v1/feed${query}`);
 }
 
 export function useFeed() {
-    return useQuery({
+    return useInfiniteQuery({
         queryKey: ["feed"],
-        queryFn: fetchFeed,
+        queryFn: ({pageParam}) => fetchFeed(pageParam),
+        initialPageParam: null as string | null,
+        getNextPageParam: (lastPage) => lastPage.next_cursor,
         staleTime: 5 * 60 * 1000, // 5 minutes
     });
 }
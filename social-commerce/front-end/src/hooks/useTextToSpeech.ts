@@ -12,6 +12,8 @@ interface TTSOptions {
     lang?: string;
     preset?: VoicePreset;
     provider?: TTSProvider;
+    // Pre-synthesized audio (e.g. feed greetings); skips the synthesize call
+    audioUrl?: string | null;
 }
 
 function findVietnameseVoice(voices: SpeechSynthesisVoice[]): SpeechSynthesisVoice | null {
@@ -88,9 +90,12 @@ export function useTextToSpeech() {
         try {
             abortControllerRef.current = new AbortController();
 
-            const response = await fetch(
-                `${import.meta.env.VITE_API_URL || "http://localhost:8000"}/api/v1/tts/synthesize`,
-                {
+            const apiUrl = import.meta.env.VITE_API_URL || "http://localhost:8000";
+            const response = options.audioUrl
+                ? await fetch(`${apiUrl}${options.audioUrl}`, {
+                    signal: abortControllerRef.current.signal,
+                })
+                : await fetch(`${apiUrl}/api/v1/tts/synthesize`, {
                     method: "POST",
                     headers: {"Content-Type": "application/json"},
                     body: JSON.stringify({
@@ -100,8 +105,7 @@ export function useTextToSpeech() {
                         pitch: options.pitch,
                     }),
                     signal: abortControllerRef.current.signal,
-                }
-            );
+                });
 
             if (!response.ok) {
                 throw new Error("Google TTS không khả dụng");
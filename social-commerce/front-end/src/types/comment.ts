@@ -21,4 +21,6 @@ export interface CommentResponse {
 export interface CommentsListResponse {
     success: boolean;
     data: Comment[];
+    // Pass as `before` to load older comments; null on the last page
+    next_cursor?: string | null;
 }
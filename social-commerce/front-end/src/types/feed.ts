@@ -7,9 +7,12 @@ export interface FeedItem {
     background_color: string;
     greeting: string;
     creator: string;
+    audio_url?: string | null;
+    published_at: string;
 }
 
 export interface FeedResponse {
     success: boolean;
     data: FeedItem[];
+    next_cursor: string | null;
 }